@@ -0,0 +1,52 @@
+"""
+Compares the default PIL putpixel path of TileGenerator against the NumPy backed canvas path.
+
+Run from the project root with: python -m benchmarks.bench_canvas
+"""
+import argparse
+import tempfile
+import time
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def render(size, canvas, output_directory):
+    """
+    Builds a tile with a background, a repeated randomly cut shape and a plain shape.
+
+    Args:
+        size (int): The width and height of the tile.
+        canvas (bool): Whether the TileGenerator uses the NumPy backed canvas.
+        output_directory (str): Where the TileGenerator is allowed to create its directory.
+
+    Returns:
+        tuple: the elapsed seconds and the rendered image bytes.
+    """
+
+    start = time.perf_counter()
+    tile = TileGenerator(array = (size, size), background_color = (30, 60, 90), output_file = "bench.png", output_directory = output_directory, canvas = canvas)
+    shape = PixelShape(tile, [(0, 0), (1, 0), (0, 1), (1, 1)], (200, 40, 40))
+    shape.repeat(size // 4, size // 4, (4, 4), (0, 0), True, 0.5, (0, 0, 0), seed = 0)
+    shape.draw()
+    data = tile.getImage().tobytes()
+    return time.perf_counter() - start, data
+
+def main():
+    """
+    Runs the benchmark for each size and prints the timings and speedup.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark the PIL and canvas render paths.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [32, 256, 1024])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        print(f"{'size':>6} {'pil (s)':>10} {'canvas (s)':>11} {'speedup':>8}")
+        for size in args.sizes:
+            pil_time, pil_data = render(size, False, output_directory)
+            canvas_time, canvas_data = render(size, True, output_directory)
+            if pil_data != canvas_data:
+                raise AssertionError(f"canvas output differs from the PIL output at {size}x{size}")
+            print(f"{size:>6} {pil_time:>10.4f} {canvas_time:>11.4f} {pil_time / canvas_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
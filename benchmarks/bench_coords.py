@@ -0,0 +1,50 @@
+"""
+Compares the memory held by a list of (x, y) tuples with the packed coordinate buffer PixelShape keeps.
+
+Run from the project root with: python -m benchmarks.bench_coords
+"""
+import argparse
+import tempfile
+import tracemalloc
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def measure(build):
+    """
+    Measures how many bytes stay allocated by the object build returns.
+
+    Args:
+        build (callable): makes the object to measure.
+
+    Returns:
+        tuple: the object and the bytes allocated for it.
+    """
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def main():
+    """
+    Builds the same points as tuples and as a PixelShape and prints the bytes per point of both.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark the memory of PixelShape coordinate storage.")
+    parser.add_argument("--points", type = int, default = 1_000_000)
+    parser.add_argument("--width", type = int, default = 4096)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        tile = TileGenerator(array = (1, 1), output_file = "bench.png", output_directory = output_directory)
+        tuples, tuple_bytes = measure(lambda: [(i % args.width, i // args.width) for i in range(args.points)])
+        shape, packed_bytes = measure(lambda: PixelShape(tile, tuples, (255, 0, 0)))
+        print(f"{'storage':>16} {'bytes':>12} {'bytes/point':>12}")
+        print(f"{'list of tuples':>16} {tuple_bytes:>12} {tuple_bytes / args.points:>12.1f}")
+        print(f"{'packed buffer':>16} {packed_bytes:>12} {packed_bytes / args.points:>12.1f}")
+        print(f"{tuple_bytes / packed_bytes:.1f}x smaller, stored as {shape._coords.dtype}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Renders and saves growing large tiles and reports the time taken and the peak resident memory of the process, which
+should stay flat as the tiles grow.
+
+Run from the project root with: python -m benchmarks.bench_large --sizes 4096 16384 32768
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def render(size, output_directory):
+    """
+    Fills a large tile, repeats a randomly cut shape over all of it and saves it as a PNG.
+
+    Args:
+        size (int): The width and height of the tile.
+        output_directory (str): Where the tile and its scratch files are written.
+
+    Returns:
+        tuple: the fill, repeat and save seconds and the size of the PNG in bytes.
+    """
+
+    start = time.perf_counter()
+    tile = TileGenerator(array = (size, size), background_color = (30, 60, 90), output_file = "large.png", output_directory = output_directory, large = True)
+    filled = time.perf_counter()
+    shape = PixelShape(tile, [(0, 0), (1, 1)], (200, 40, 40))
+    shape.repeat(size // 16, size // 16, (16, 16), (0, 0), True, 0.5, (0, 0, 0), seed = 0)
+    shape.draw()
+    repeated = time.perf_counter()
+    tile.saveImage()
+    saved = time.perf_counter()
+    return filled - start, repeated - filled, saved - repeated, os.path.getsize(os.path.join(tile.output_directory, "large.png"))
+
+def main():
+    """
+    Runs the benchmark for each size, smallest first, and prints the timings and peak resident memory.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark memory mapped large tiles.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [2048, 8192, 16384])
+    args = parser.parse_args()
+
+    scale = 1024 if sys.platform != "darwin" else 1024 * 1024
+    with tempfile.TemporaryDirectory() as output_directory:
+        config.SCRATCH_DIRECTORY = output_directory
+        print(f"{'size':>6} {'pixels':>14} {'fill (s)':>9} {'repeat (s)':>11} {'save (s)':>9} {'png bytes':>12} {'peak rss (MB)':>14}")
+        for size in sorted(args.sizes):
+            fill, repeat, save, png = render(size, output_directory)
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale
+            print(f"{size:>6} {size * size:>14} {fill:>9.2f} {repeat:>11.2f} {save:>9.2f} {png:>12} {peak:>14}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Measures the file size and encode time of every encoding profile on a set of pixel art tiles.
+
+Run from the project root with: python -m benchmarks.bench_profiles
+"""
+import argparse
+import random
+import tempfile
+import time
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+PALETTE = [(30, 120, 30), (20, 90, 20), (90, 60, 30), (60, 40, 20), (120, 120, 130), (80, 80, 90), (200, 180, 90),
+           (40, 60, 160), (20, 30, 110), (230, 230, 240), (160, 40, 40), (0, 0, 0)]
+
+def tileSet(sizes, count, output_directory):
+    """
+    Renders count tiles of every size, each a background with a few repeated, randomly cut shapes in colors of a
+    small palette. Every fourth tile has a transparent background.
+
+    Args:
+        sizes (list of int): the tile sizes.
+        count (int): how many tiles of each size.
+        output_directory (str): where the TileGenerators are allowed to create their directory.
+
+    Returns:
+        list of Image: the rendered tiles.
+    """
+
+    choose = random.Random(0)
+    images = []
+    for size in sizes:
+        for index in range(count):
+            background = None if index % 4 == 3 else choose.choice(PALETTE)
+            tile = TileGenerator(array = (size, size), background_color = background, output_file = "bench.png", output_directory = output_directory, canvas = True)
+            for _ in range(3):
+                coords = [(choose.randrange(3), choose.randrange(3)) for _ in range(4)]
+                spacing = choose.choice([2, 3, 4, 6])
+                shape = PixelShape(tile, coords, choose.choice(PALETTE))
+                shape.repeat(size // spacing, size // spacing, (spacing, spacing), (0, 0), True, 0.4, choose.choice(PALETTE), seed = choose.randrange(1 << 30))
+                shape.draw()
+            images.append(tile.getImage())
+    return images
+
+def main():
+    """
+    Encodes the tile set with every profile and output format and prints the total size and time.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark the encoding profiles.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = [16, 32, 64, 128, 256])
+    parser.add_argument("--count", type = int, default = 20, help = "tiles of every size")
+    parser.add_argument("--formats", nargs = "+", default = [".png", ".gif", ".bmp"])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as output_directory:
+        images = tileSet(args.sizes, args.count, output_directory)
+    print(f"{len(images)} tiles of {', '.join(map(str, args.sizes))} pixels")
+    print(f"{'format':>6} {'profile':>8} {'bytes':>10} {'vs default':>10} {'encode (s)':>11}")
+    for ext in args.formats:
+        baseline = None
+        for profile in config.ENCODING_PROFILES:
+            start = time.perf_counter()
+            size = sum(len(TileGenerator.encodeAs(image, f"bench{ext}", profile)) for image in images)
+            seconds = time.perf_counter() - start
+            baseline = baseline or size
+            print(f"{ext:>6} {profile:>8} {size:>10} {size / baseline:>9.2f}x {seconds:>11.4f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Reproducible benchmark suite for the rendering and save hot paths.
+
+Run from the project root with:
+
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --output results.json --compare baseline.json --threshold 0.1
+
+Every case is timed several times and the median is kept. With --compare the results are checked against a stored
+baseline and any case slower than the baseline by more than the threshold is flagged, the exit status is then 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import PIL
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+SIZES = [32, 128, 512, 1024, 4096]
+BACKGROUND = (30, 60, 90)
+COLOR = (200, 40, 40)
+
+def newTile(size, canvas, output_directory, output_file = "bench.png"):
+    """
+    Creates the TileGenerator every case starts from.
+
+    Args:
+        size (int): width and height of the tile.
+        canvas (bool): whether the NumPy backed canvas is used.
+        output_directory (str): where the tile is saved.
+        output_file (str): the output file name, its extension picks the format.
+
+    Returns:
+        TileGenerator: the new tile.
+    """
+
+    return TileGenerator(array = (size, size), background_color = BACKGROUND, output_file = output_file, output_directory = output_directory, canvas = canvas)
+
+def newShape(tile, size):
+    """
+    Creates a sparse lattice shape, one pixel in every 8x8 block of the tile.
+
+    Args:
+        tile (TileGenerator): the tile to draw on.
+        size (int): width and height of the tile.
+
+    Returns:
+        PixelShape: the new shape.
+    """
+
+    return PixelShape(tile, [(x, y) for y in range(0, size, 8) for x in range(0, size, 8)], COLOR)
+
+def cases(size, canvas, output_directory):
+    """
+    Builds the cases for one tile size and render path. Each case is a (name, setup, run) triple, setup makes the
+    objects run needs and only run is timed.
+
+    Args:
+        size (int): width and height of the tile.
+        canvas (bool): whether the NumPy backed canvas is used.
+        output_directory (str): where tiles are saved.
+
+    Returns:
+        list of tuple: the cases.
+    """
+
+    path = "canvas" if canvas else "pil"
+    prefix = f"{path}/{size}"
+    count = max(1, size // 8)
+
+    def repeatSetup():
+        tile = newTile(size, canvas, output_directory)
+        return (PixelShape(tile, [(0, 0), (1, 0), (0, 1)], COLOR),)
+
+    found = [
+        (f"{prefix}/init", lambda: (), lambda: newTile(size, canvas, output_directory)),
+        (f"{prefix}/apply_background", lambda: (newTile(size, canvas, output_directory),), lambda tile: tile._applyBackground()),
+        (f"{prefix}/draw", lambda: (newShape(newTile(size, canvas, output_directory), size),), lambda shape: shape.draw()),
+        (f"{prefix}/repeat", repeatSetup, lambda shape: shape.repeat(count, count, (8, 8), (0, 0))),
+        (f"{prefix}/repeat_random_cut", repeatSetup, lambda shape: shape.repeat(count, count, (8, 8), (0, 0), True, 0.5, (0, 0, 0), seed = 0)),
+    ]
+    for ext in config.VALID_IMG_FILE_EXT:
+        def saveSetup(ext = ext):
+            tile = newTile(size, canvas, output_directory, f"bench{ext}")
+            newShape(tile, size).draw()
+            tile.getImage()
+            return (tile,)
+        found.append((f"{prefix}/save{ext}", saveSetup, lambda tile: tile.saveImage()))
+    return found
+
+def timeCase(setup, run, repeats):
+    """
+    Times a case repeats times, with a fresh setup before every run.
+
+    Args:
+        setup (callable): makes the arguments of run.
+        run (callable): the code being measured.
+        repeats (int): how many times to time it.
+
+    Returns:
+        dict: the median, min and max seconds and the number of runs.
+    """
+
+    times = []
+    for _ in range(repeats):
+        args = setup()
+        start = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - start)
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "runs": repeats}
+
+def runSuite(sizes, paths, repeats, pattern = None):
+    """
+    Runs every case for every size and render path.
+
+    Args:
+        sizes (list of int): the tile sizes.
+        paths (list of str): "pil" and/or "canvas".
+        repeats (int): how many times each case is timed.
+        pattern (str): if given, only cases whose name contains it are run.
+
+    Returns:
+        dict: the meta data of the run and a results dictionary of case name to timings.
+    """
+
+    results = {}
+    with tempfile.TemporaryDirectory() as output_directory:
+        for size in sizes:
+            for path in paths:
+                for name, setup, run in cases(size, path == "canvas", output_directory):
+                    if pattern and pattern not in name:
+                        continue
+                    results[name] = timeCase(setup, run, repeats)
+                    print(f"{name:<36} {results[name]['median'] * 1000:>10.3f} ms")
+    meta = {"python": platform.python_version(), "numpy": np.__version__, "pillow": PIL.__version__,
+            "platform": platform.platform(), "processor": platform.processor(), "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeats": repeats}
+    return {"meta": meta, "results": results}
+
+def compare(results, baseline, threshold, noise = 0.0005):
+    """
+    Compares results with a baseline, cases missing from either side are skipped.
+
+    Args:
+        results (dict): the results of runSuite.
+        baseline (dict): results of an earlier runSuite.
+        threshold (float): how much slower than the baseline a case may be, 0.1 is 10%.
+        noise (float): slowdowns smaller than this many seconds are never flagged, it keeps timer jitter on tiny cases out.
+
+    Returns:
+        list of tuple: the (name, baseline seconds, current seconds, ratio) of every regression.
+    """
+
+    regressions = []
+    for name, timing in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None or before["median"] <= 0:
+            continue
+        ratio = timing["median"] / before["median"]
+        slower = ratio > 1 + threshold and timing["median"] - before["median"] > noise
+        marker = "REGRESSION" if slower else ("faster" if ratio < 1 - threshold else "")
+        print(f"{name:<36} {before['median'] * 1000:>10.3f} -> {timing['median'] * 1000:>10.3f} ms {ratio:>6.2f}x {marker}")
+        if marker == "REGRESSION":
+            regressions.append((name, before["median"], timing["median"], ratio))
+    return regressions
+
+def main():
+    """
+    Parses the command line, runs the suite, writes the JSON results and compares them with a baseline if asked.
+
+    Returns:
+        int: the exit status, 1 when a regression was found.
+    """
+
+    parser = argparse.ArgumentParser(description = "Benchmark the rendering and save hot paths.")
+    parser.add_argument("--sizes", type = int, nargs = "+", default = SIZES, help = "tile sizes, 32 to 4096 by default")
+    parser.add_argument("--paths", nargs = "+", choices = ["pil", "canvas"], default = ["pil", "canvas"], help = "render paths to measure")
+    parser.add_argument("--repeats", type = int, default = 5, help = "timed runs per case, the median is kept")
+    parser.add_argument("--filter", default = None, help = "only run cases whose name contains this")
+    parser.add_argument("--output", default = None, help = "JSON file the results are written to")
+    parser.add_argument("--compare", default = None, help = "JSON baseline to compare against")
+    parser.add_argument("--threshold", type = float, default = 0.1, help = "allowed slowdown against the baseline, 0.1 is 10%%")
+    parser.add_argument("--noise", type = float, default = 0.0005, help = "slowdowns under this many seconds are never flagged")
+    args = parser.parse_args()
+
+    results = runSuite(args.sizes, args.paths, args.repeats, args.filter)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent = 1)
+        print(f"Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as stored:
+            regressions = compare(results, json.load(stored), args.threshold, args.noise)
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%}.")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
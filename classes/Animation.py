@@ -0,0 +1,362 @@
+import io
+import struct
+import numpy as np
+from classes import config
+from classes.LargeCanvas import LargeCanvas
+from PIL import GifImagePlugin, Image
+class Animation:
+    """
+    A sequence of frames exported as one animated GIF or APNG.
+
+    Only the first frame is kept whole. Every later frame is kept as the smallest rectangle that changed since the frame
+    before it, and a frame that changes nothing lengthens the one before it. Palettes, encodes and file sizes therefore
+    grow with the change between frames, not with the frame count times the canvas size. All frames share one global
+    palette.
+
+    Attributes:
+        size (tuple): The (width, height) of every frame.
+        duration (int): How many milliseconds a frame is shown when addFrame is given no duration.
+        loop (int): How many times the animation plays, 0 loops forever.
+        frames (list): The (box, duration) of every stored frame.
+    """
+
+    def __init__(self, size, duration = 100, loop = 0):
+        """
+        Initializes a new, empty Animation object.
+
+        Args:
+            size (tuple): The (width, height) of every frame.
+            duration (int): How many milliseconds a frame is shown when addFrame is given no duration.
+            loop (int): How many times the animation plays, 0 loops forever.
+        """
+
+        if not isinstance(size, (tuple, list)) or len(size) != 2 or not all(isinstance(value, int) and value > 0 for value in size):
+            raise ValueError(f"size must be a (width, height) of positive integers, got {size}")
+        if not isinstance(duration, int) or duration < 0 or not isinstance(loop, int) or loop < 0:
+            raise ValueError(f"duration and loop must be integers of 0 or more, got {duration} and {loop}")
+        self._size = tuple(size)
+        self._duration = duration
+        self._loop = loop
+        self._frames = []
+        self._last = None
+
+    def __str__(self):
+        """
+        Provides a string representation of the Animation object.
+
+        Returns:
+            str: A description of the Animation object.
+        """
+
+        changed = sum((right - left) * (bottom - top) for (left, top, right, bottom), _ in self.frames[1:])
+        return f"A {self._size[0]}x{self._size[1]} animation of {len(self._frames)} frames, {changed} pixels change after the first frame."
+
+    def __len__(self):
+        """
+        Gets how many frames are stored.
+
+        Returns:
+            int: The number of frames.
+        """
+
+        return len(self._frames)
+
+    @property
+    def size(self):
+        """
+        Gets the size of the frames.
+
+        Returns:
+            tuple: The (width, height) of every frame.
+        """
+
+        return self._size
+
+    @property
+    def duration(self):
+        """
+        Gets the default frame duration.
+
+        Returns:
+            int: The duration in milliseconds.
+        """
+
+        return self._duration
+
+    @property
+    def loop(self):
+        """
+        Gets how many times the animation plays.
+
+        Returns:
+            int: The loop count, 0 loops forever.
+        """
+
+        return self._loop
+
+    @property
+    def frames(self):
+        """
+        Gets the rectangle and duration of every stored frame.
+
+        Returns:
+            list of tuples: the (left, top, right, bottom) box that changed and the duration in milliseconds of each frame.
+        """
+
+        return [(frame["box"], frame["duration"]) for frame in self._frames]
+
+    def addFrame(self, pixels, duration = None):
+        """
+        Adds a frame after the last one, only the rectangle that changed since the last frame is copied.
+
+        Args:
+            pixels (numpy.ndarray or Image): the (height, width, 3 or 4) uint8 pixels of the frame, or a PIL Image.
+            duration (int): how many milliseconds the frame is shown, if None the animation's duration is used.
+
+        Returns:
+            tuple: the (left, top, right, bottom) box that changed, or None when nothing did and the last frame was lengthened.
+        """
+
+        pixels = self._asPixels(pixels)
+        duration = self._duration if duration is None else duration
+        if not isinstance(duration, int) or duration < 0:
+            raise ValueError(f"duration must be an integer of 0 or more, got {duration}")
+        if self._last is None:
+            self._last = pixels.copy()
+            self._frames.append({"box": (0, 0) + self._size, "pixels": self._last.copy(), "duration": duration, "cleared": False})
+            return (0, 0) + self._size
+        box = self.changedBox(self._last, pixels)
+        if box is None:
+            self._frames[-1]["duration"] += duration
+            return None
+        left, top, right, bottom = box
+        crop = pixels[top:bottom, left:right].copy()
+        previous = self._last[top:bottom, left:right]
+        cleared = bool(np.any((crop[..., 3] == 0) & (previous[..., 3] != 0)))
+        previous[...] = crop
+        self._frames.append({"box": box, "pixels": crop, "duration": duration, "cleared": cleared})
+        return box
+
+    def encode(self, ext, profile = "default"):
+        """
+        Encodes the frames as an animated GIF or APNG.
+
+        Args:
+            ext (str): ".gif" or ".png".
+            profile (str): the name of a profile in config.ENCODING_PROFILES, its PNG options are used for APNG frames.
+
+        Returns:
+            bytes: the encoded file.
+        """
+
+        if not self._frames:
+            raise ValueError("an animation needs at least one frame")
+        ext = ext.lower()
+        if ext == ".gif":
+            return self._encodeGIF()
+        if ext == ".png":
+            options = {key: value for key, value in config.ENCODING_PROFILES.get(profile, {}).get(ext, {}).items() if key != "palette"}
+            return self._encodeAPNG(options)
+        raise ValueError(f"animations can only be saved as .gif or .png, not {ext}")
+
+    def save(self, path, profile = "default"):
+        """
+        Encodes the frames in the format of a file name's extension and writes them to it.
+
+        Args:
+            path (str): the file to write, ending in .gif or .png.
+            profile (str): the name of a profile in config.ENCODING_PROFILES.
+        """
+
+        data = self.encode(path[path.rfind("."):] if "." in path else "", profile)
+        with open(path, "wb") as output:
+            output.write(data)
+
+    def _asPixels(self, pixels):
+        """
+        Turns a frame into a contiguous (height, width, 4) uint8 RGBA array of the animation's size.
+
+        Args:
+            pixels (numpy.ndarray or Image): the frame.
+
+        Returns:
+            numpy.ndarray: the RGBA pixels.
+        """
+
+        if isinstance(pixels, Image.Image):
+            pixels = np.asarray(pixels.convert("RGBA"))
+        pixels = np.asarray(pixels, dtype = np.uint8)
+        if pixels.shape[:2] != (self._size[1], self._size[0]) or pixels.ndim != 3 or pixels.shape[2] not in (3, 4):
+            raise ValueError(f"a frame must be {self._size[0]}x{self._size[1]} RGB or RGBA pixels, got shape {pixels.shape}")
+        if pixels.shape[2] == 3:
+            pixels = np.concatenate((pixels, np.full(pixels.shape[:2] + (1,), 255, dtype = np.uint8)), axis = 2)
+        return np.ascontiguousarray(pixels)
+
+    @staticmethod
+    def changedBox(previous, current):
+        """
+        A static method that gets the smallest rectangle holding every pixel that differs between two frames.
+
+        Args:
+            previous (numpy.ndarray): the (height, width, 4) uint8 pixels of one frame.
+            current (numpy.ndarray): the (height, width, 4) uint8 pixels of the other frame.
+
+        Returns:
+            tuple: the (left, top, right, bottom) rectangle, right and bottom exclusive, or None if the frames are equal.
+        """
+
+        changed = previous.view(np.uint32)[..., 0] != current.view(np.uint32)[..., 0]
+        rows = np.flatnonzero(changed.any(axis = 1))
+        if not len(rows):
+            return None
+        columns = np.flatnonzero(changed[rows[0]:rows[-1] + 1].any(axis = 0))
+        return (int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+
+    def _replay(self):
+        """
+        Rebuilds every frame whole, in order, by pasting each stored rectangle over the frame before it.
+
+        Returns:
+            generator: yields the index, the stored frame and the whole pixels after it, the pixels are one reused buffer.
+        """
+
+        current = None
+        for i, frame in enumerate(self._frames):
+            if current is None:
+                current = frame["pixels"].copy()
+            else:
+                left, top, right, bottom = frame["box"]
+                current[top:bottom, left:right] = frame["pixels"]
+            yield i, frame, current
+
+    def _encodeGIF(self):
+        """
+        Encodes the frames as an animated GIF with one global palette. Up to 256 colors are kept exactly, more are
+        quantized to a median cut palette built from at most config.ANIMATION_PALETTE_SAMPLE of the stored pixels.
+        GIF transparency is on or off, pixels with an alpha of 0 are transparent and every other pixel is opaque.
+
+        Returns:
+            bytes: the GIF file.
+        """
+
+        transparent = any(np.any(frame["pixels"][..., 3] == 0) for frame in self._frames)
+        colors = np.unique(np.concatenate([np.unique(self._packRGB(frame["pixels"])) for frame in self._frames]))
+        if len(colors) + transparent <= 256:
+            palette = np.stack(((colors >> 16) & 255, (colors >> 8) & 255, colors & 255), axis = 1).astype(np.uint8)
+            quantizer = None
+        else:
+            total = sum(frame["pixels"][..., 0].size for frame in self._frames)
+            step = -(-total // config.ANIMATION_PALETTE_SAMPLE)
+            sample = np.concatenate([frame["pixels"].reshape(-1, 4)[::step, :3] for frame in self._frames])
+            quantizer = Image.fromarray(sample.reshape(-1, 1, 3), "RGB").quantize(256 - transparent, method = Image.Quantize.MEDIANCUT)
+            palette = np.frombuffer(bytes(quantizer.getpalette()), dtype = np.uint8).reshape(-1, 3)
+        index = len(palette) if transparent else None
+        bits = max(1, int(np.ceil(np.log2(len(palette) + transparent))))
+        table = np.zeros((1 << bits, 3), dtype = np.uint8)
+        table[:len(palette)] = palette
+        width, height = self._size
+        output = io.BytesIO()
+        output.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80 | (bits - 1) << 4 | (bits - 1), 0, 0) + table.tobytes())
+        output.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", min(self._loop, 65535)) + b"\x00")
+        for i, frame, current in self._replay():
+            clears_next = i + 1 < len(self._frames) and self._frames[i + 1]["cleared"]
+            if clears_next or frame["cleared"]:
+                box, pixels = (0, 0) + self._size, current
+            else:
+                box, pixels = frame["box"], frame["pixels"]
+            if quantizer is None:
+                indices = np.searchsorted(colors, self._packRGB(pixels)).astype(np.uint8)
+            else:
+                indices = np.asarray(Image.fromarray(np.ascontiguousarray(pixels[..., :3]), "RGB").quantize(palette = quantizer, dither = Image.Dither.NONE)).copy()
+            if transparent:
+                indices[pixels[..., 3] == 0] = index
+            params = {"duration": min(frame["duration"], 655350), "disposal": 2 if clears_next else 1}
+            if transparent:
+                params["transparency"] = index
+            for data in GifImagePlugin.getdata(Image.fromarray(indices, "P"), box[:2], **params):
+                output.write(data)
+        output.write(b";")
+        return output.getvalue()
+
+    def _encodeAPNG(self, options):
+        """
+        Encodes the frames as an APNG. Up to 256 RGBA colors are written as one shared indexed palette, more are written
+        as RGBA, both exactly. Every frame replaces only its rectangle, so unchanged pixels are never encoded again.
+
+        Args:
+            options (dict): the options Image.save gets for every PNG frame.
+
+        Returns:
+            bytes: the APNG file.
+        """
+
+        colors = np.unique(np.concatenate([np.unique(frame["pixels"].view(np.uint32)) for frame in self._frames]))
+        palette = colors.view(np.uint8).reshape(-1, 4) if len(colors) <= 256 else None
+        output = io.BytesIO()
+        output.write(b"\x89PNG\r\n\x1a\n")
+        sequence = 0
+        for i, frame in enumerate(self._frames):
+            pixels = frame["pixels"]
+            if palette is not None:
+                img = Image.fromarray(np.searchsorted(colors, pixels.view(np.uint32)[..., 0]).astype(np.uint8), "P")
+                img.putpalette(palette[:, :3].tobytes())
+                if np.any(palette[:, 3] != 255):
+                    img.info["transparency"] = palette[:, 3].tobytes()
+            else:
+                img = Image.fromarray(pixels, "RGBA")
+            buffer = io.BytesIO()
+            img.save(buffer, format = "PNG", **options)
+            left, top, right, bottom = frame["box"]
+            control = struct.pack(">IIIIIHHBB", sequence, right - left, bottom - top, left, top, min(frame["duration"], 65535), 1000, 0, 0)
+            sequence += 1
+            for kind, data in self._chunks(buffer.getvalue()):
+                if kind == b"IHDR" and i == 0:
+                    LargeCanvas._writeChunk(output, kind, data)
+                    LargeCanvas._writeChunk(output, b"acTL", struct.pack(">II", len(self._frames), self._loop))
+                elif kind == b"IDAT" and i == 0:
+                    if control is not None:
+                        LargeCanvas._writeChunk(output, b"fcTL", control)
+                        control = None
+                    LargeCanvas._writeChunk(output, kind, data)
+                elif kind == b"IDAT":
+                    if control is not None:
+                        LargeCanvas._writeChunk(output, b"fcTL", control)
+                        control = None
+                    LargeCanvas._writeChunk(output, b"fdAT", struct.pack(">I", sequence) + data)
+                    sequence += 1
+                elif i == 0 and kind != b"IEND":
+                    LargeCanvas._writeChunk(output, kind, data)
+        LargeCanvas._writeChunk(output, b"IEND", b"")
+        return output.getvalue()
+
+    @staticmethod
+    def _packRGB(pixels):
+        """
+        A static method that packs the red, green and blue of pixels into one integer each.
+
+        Args:
+            pixels (numpy.ndarray): (..., 4) uint8 pixels.
+
+        Returns:
+            numpy.ndarray: uint32 values of red << 16 | green << 8 | blue.
+        """
+
+        return pixels[..., 0].astype(np.uint32) << 16 | pixels[..., 1].astype(np.uint32) << 8 | pixels[..., 2]
+
+    @staticmethod
+    def _chunks(data):
+        """
+        A static method that splits an encoded PNG into its chunks.
+
+        Args:
+            data (bytes): the PNG file.
+
+        Returns:
+            generator: yields the type and data of every chunk.
+        """
+
+        position = 8
+        while position < len(data):
+            length, kind = struct.unpack(">I4s", data[position:position + 8])
+            yield kind, data[position + 8:position + 8 + length]
+            position += 12 + length
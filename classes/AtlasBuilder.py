@@ -0,0 +1,205 @@
+import json
+import os
+import numpy as np
+from PIL import Image
+from classes import config
+from .TileGenerator import TileGenerator
+class AtlasBuilder:
+    """
+    A class to pack many tiles into one or more power of two texture atlases with a JSON index of their rects.
+
+    Attributes:
+        max_size (int): The largest width or height a sheet may have, must be a power of two.
+        padding (int): Transparent pixels left around every tile.
+        extrude (int): How many times the edge pixels of every tile are repeated outwards, stops bleeding when sampling.
+    """
+
+    def __init__(self, max_size = 4096, padding = 0, extrude = 0):
+        """
+        Initializes a new AtlasBuilder object.
+
+        Args:
+            max_size (int): The largest width or height a sheet may have, must be a power of two.
+            padding (int): Transparent pixels left around every tile.
+            extrude (int): How many times the edge pixels of every tile are repeated outwards.
+        """
+
+        if not isinstance(max_size, int) or max_size < 1 or max_size & (max_size - 1):
+            raise ValueError(f"{max_size} must be a power of two")
+        if not isinstance(padding, int) or padding < 0 or not isinstance(extrude, int) or extrude < 0:
+            raise ValueError(f"{padding} and {extrude} must be integers greater than or equal to 0")
+        self._max_size = max_size
+        self._padding = padding
+        self._extrude = extrude
+        self._tiles = {}
+
+    def __str__(self):
+        """
+        Provides a string representation of the AtlasBuilder object.
+
+        Returns:
+            str: A description of the AtlasBuilder object.
+        """
+
+        return f"An atlas of {len(self._tiles)} tiles on sheets of up to {self._max_size}x{self._max_size} with {self._padding} padding and {self._extrude} extrusion."
+
+    @property
+    def max_size(self):
+        """
+        Gets the largest width or height a sheet may have.
+
+        Returns:
+            int: The largest sheet size.
+        """
+
+        return self._max_size
+
+    @property
+    def padding(self):
+        """
+        Gets the transparent padding around every tile.
+
+        Returns:
+            int: The padding in pixels.
+        """
+
+        return self._padding
+
+    @property
+    def extrude(self):
+        """
+        Gets how far the edge pixels of every tile are extruded.
+
+        Returns:
+            int: The extrusion in pixels.
+        """
+
+        return self._extrude
+
+    def addImage(self, name, img):
+        """
+        Adds a PIL Image to the atlas.
+
+        Args:
+            name (str): The name of the tile in the JSON index.
+            img (Image): The image to add.
+        """
+
+        self._tiles[name] = np.asarray(img if img.mode == "RGBA" else img.convert("RGBA"))
+
+    def addGenerator(self, name, tile_generator):
+        """
+        Adds the rendered pixels of a TileGenerator to the atlas, nothing is saved or decoded.
+
+        Args:
+            name (str): The name of the tile in the JSON index.
+            tile_generator (TileGenerator): The TileGenerator to add.
+        """
+
+        if not isinstance(tile_generator, TileGenerator):
+            raise ValueError(f"{tile_generator} must be a TileGenerator")
+        if tile_generator._canvas is not None and tile_generator._canvas.mode == "RGBA":
+            self._tiles[name] = tile_generator._canvas.pixels.copy()
+        else:
+            self.addImage(name, tile_generator.getImage())
+
+    def addDirectory(self, path):
+        """
+        Adds every image in a directory with an extension found in the config file, named after the file.
+
+        Args:
+            path (str): The directory to read.
+        """
+
+        for file_name in sorted(os.listdir(path)):
+            if file_name.lower().endswith(tuple(config.VALID_IMG_FILE_EXT.keys())):
+                with Image.open(os.path.join(path, file_name)) as img:
+                    self.addImage(file_name, img)
+
+    def pack(self):
+        """
+        Places every tile with a shelf packer, tallest tiles first, opening a new sheet whenever one is full.
+
+        Returns:
+            tuple: a list of (width, height) sheet sizes, both powers of two, and a dictionary of tile name to (sheet, x, y, width, height).
+        """
+
+        if not self._tiles:
+            return [], {}
+        border = self._padding + self._extrude
+        order = sorted(self._tiles, key = lambda name: (-self._tiles[name].shape[0], -self._tiles[name].shape[1], name))
+        area = 0
+        for name in order:
+            height, width = self._tiles[name].shape[:2]
+            if width + 2 * border > self._max_size or height + 2 * border > self._max_size:
+                raise ValueError(f"{name} is {width}x{height} and does not fit in a {self._max_size} sheet with {border} border")
+            area += (width + 2 * border) * (height + 2 * border)
+        widest = max((self._tiles[name].shape[1] + 2 * border for name in order), default = 1)
+        sheet_width = min(self._max_size, self.nextPowerOfTwo(max(widest, int(area ** 0.5))))
+
+        sheets = []
+        placements = {}
+        x = y = shelf_height = used_width = 0
+        for name in order:
+            height, width = self._tiles[name].shape[:2]
+            cell_width, cell_height = width + 2 * border, height + 2 * border
+            if x + cell_width > sheet_width:
+                x, y, shelf_height = 0, y + shelf_height, 0
+            if y + cell_height > self._max_size:
+                sheets.append((used_width, y))
+                x = y = shelf_height = used_width = 0
+            placements[name] = (len(sheets), x + border, y + border, width, height)
+            x += cell_width
+            shelf_height = max(shelf_height, cell_height)
+            used_width = max(used_width, x)
+        sheets.append((used_width, y + shelf_height))
+        return [(self.nextPowerOfTwo(width), self.nextPowerOfTwo(height)) for width, height in sheets], placements
+
+    def build(self, output_directory, name = "atlas"):
+        """
+        Packs the tiles and writes the sheets as {name}_{index}.png along with {name}.json holding the pixel and UV rect of every tile.
+
+        Args:
+            output_directory (str): The directory the sheets and index are written to, it is made if it does not exist.
+            name (str): The base name of the sheet and index files.
+
+        Returns:
+            dict: the JSON index that was written.
+        """
+
+        output_directory = os.path.join(os.getcwd(), output_directory)
+        os.makedirs(output_directory, exist_ok = True)
+        sizes, placements = self.pack()
+        sheets = [np.zeros((height, width, 4), dtype = np.uint8) for width, height in sizes]
+        index = {"sheets": [], "tiles": {}}
+        for tile_name, (sheet, x, y, width, height) in placements.items():
+            pixels = self._tiles[tile_name]
+            if self._extrude:
+                extrude = self._extrude
+                sheets[sheet][y - extrude:y + height + extrude, x - extrude:x + width + extrude] = np.pad(pixels, ((extrude, extrude), (extrude, extrude), (0, 0)), mode = "edge")
+            else:
+                sheets[sheet][y:y + height, x:x + width] = pixels
+            sheet_width, sheet_height = sizes[sheet]
+            index["tiles"][tile_name] = {"sheet": sheet, "x": x, "y": y, "width": width, "height": height,
+                                         "uv": [x / sheet_width, y / sheet_height, (x + width) / sheet_width, (y + height) / sheet_height]}
+        for sheet, pixels in enumerate(sheets):
+            file_name = f"{name}_{sheet}.png"
+            Image.fromarray(pixels).save(os.path.join(output_directory, file_name))
+            index["sheets"].append({"file": file_name, "width": pixels.shape[1], "height": pixels.shape[0]})
+        with open(os.path.join(output_directory, f"{name}.json"), "w") as output:
+            json.dump(index, output, indent = 1)
+        return index
+
+    @staticmethod
+    def nextPowerOfTwo(value):
+        """
+        A static method that rounds a size up to the next power of two.
+
+        Args:
+            value (int): the size to round.
+
+        Returns:
+            int: the smallest power of two greater than or equal to value, at least 1.
+        """
+
+        return 1 << max(0, int(value) - 1).bit_length()
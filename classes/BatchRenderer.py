@@ -0,0 +1,214 @@
+import json
+import os
+import time
+from classes import config
+from concurrent.futures import ProcessPoolExecutor
+from .TileGenerator import TileGenerator
+from .PixelShape import PixelShape
+from .RenderCache import RenderCache
+class BatchRenderer:
+    """
+    A class to render many tiles described by a JSON manifest without any prompts, spread over a pool of processes.
+
+    The manifest is a JSON object with a "tiles" list, each tile holds the fields asked for by the create prompts,
+    "variants" and "variant_seed" make each of the copies its own random cut. A top level "profile" is the encoding
+    profile of every tile that does not name its own:
+
+        {"profile": "small", "tiles": [{"name": "grass", "width": 32, "height": 32, "background_color": [30, 120, 30],
+                    "line_color": [0, 0, 0], "output_file": "grass.png", "output_directory": "assets", "copies": 1,
+                    "shapes": [{"coords": [[1, 0], [1, 1]], "color": [20, 90, 20],
+                                "repeat": {"count_x": 8, "count_y": 8, "spacing": [4, 4], "starting": [0, 0],
+                                           "random_cut": true, "cut_chance": 0.5, "cut_color": [30, 120, 30], "seed": 7}}]}]}
+
+    Attributes:
+        tiles (list of dict): The tile definitions to render.
+        jobs (int): How many worker processes to render with.
+        cache (RenderCache): Cache of encoded tiles, a tile whose key is already cached is neither rendered nor encoded.
+        profile (str): Encoding profile every tile is saved with, or None to keep the profile of each tile.
+    """
+
+    def __init__(self, tiles, jobs = None, cache = None, profile = None):
+        """
+        Initializes a new BatchRenderer object.
+
+        Args:
+            tiles (list of dict): The tile definitions to render.
+            jobs (int): How many worker processes to render with, if None one per core is used.
+            cache (RenderCache): Cache of encoded tiles, or None to always render.
+            profile (str): Encoding profile in config.ENCODING_PROFILES every tile is saved with, or None to keep the profile of each tile.
+        """
+
+        if profile is not None and profile not in config.ENCODING_PROFILES:
+            raise ValueError(f"{profile} is not an encoding profile, choose from {', '.join(config.ENCODING_PROFILES)}")
+        self._tiles = tiles if isinstance(tiles, list) else []
+        self._jobs = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)
+        self._cache = cache if isinstance(cache, RenderCache) else None
+        self._profile = profile
+
+    def __str__(self):
+        """
+        Provides a string representation of the BatchRenderer object.
+
+        Returns:
+            str: A description of the BatchRenderer object.
+        """
+
+        return f"A batch of {len(self._tiles)} tiles rendered with {self._jobs} jobs and the {self._profile or 'per tile'} encoding profile."
+
+    @property
+    def tiles(self):
+        """
+        Gets the tile definitions of the BatchRenderer.
+
+        Returns:
+            list of dict: The tile definitions.
+        """
+
+        return self._tiles
+
+    @property
+    def jobs(self):
+        """
+        Gets how many worker processes the BatchRenderer uses.
+
+        Returns:
+            int: The number of worker processes.
+        """
+
+        return self._jobs
+
+    @property
+    def cache(self):
+        """
+        Gets the RenderCache of the BatchRenderer.
+
+        Returns:
+            RenderCache: The cache, or None.
+        """
+
+        return self._cache
+
+    @property
+    def profile(self):
+        """
+        Gets the encoding profile every tile is saved with.
+
+        Returns:
+            str: The profile, or None when each tile keeps its own.
+        """
+
+        return self._profile
+
+    @classmethod
+    def fromManifest(cls, path, jobs = None, cache = None, profile = None):
+        """
+        Creates a BatchRenderer from a manifest file.
+
+        Args:
+            path (str): Path of the JSON manifest.
+            jobs (int): How many worker processes to render with, if None one per core is used.
+            cache (RenderCache): Cache of encoded tiles, or None to always render.
+            profile (str): Encoding profile every tile is saved with, overriding the manifest, or None.
+
+        Returns:
+            BatchRenderer: the new BatchRenderer object.
+        """
+
+        with open(path) as manifest:
+            data = json.load(manifest)
+        tiles = data.get("tiles") if isinstance(data, dict) else None
+        if not isinstance(tiles, list):
+            raise ValueError(f"{path} must hold a JSON object with a tiles list")
+        for index, tile in enumerate(tiles):
+            tile.setdefault("name", f"tile_{index}")
+            tile.setdefault("canvas", True)
+            tile.setdefault("profile", data.get("profile", "default"))
+        return cls(tiles, jobs, cache, profile)
+
+    def run(self):
+        """
+        Renders and saves every tile, a failing tile is reported and does not stop the others.
+
+        Returns:
+            list of dict: one result per tile in manifest order, holding name, seconds, files, error (None on success)
+                and cache ("hit", "miss" or None when the tile was not looked up).
+        """
+
+        tiles = [dict(tile, profile = self._profile) for tile in self._tiles] if self._profile else self._tiles
+        settings = [(self._cache.directory, self._cache.max_bytes) if self._cache else None] * len(self._tiles)
+        if self._jobs == 1 or len(self._tiles) <= 1:
+            results = [renderTile(tile, setting) for tile, setting in zip(tiles, settings)]
+        else:
+            chunksize = max(1, len(self._tiles) // (self._jobs * 4))
+            with ProcessPoolExecutor(max_workers = self._jobs) as executor:
+                results = list(executor.map(renderTile, tiles, settings, chunksize = chunksize))
+        if self._cache:
+            self._cache.refresh()
+            self._cache.evict()
+            self._cache.record(hits = sum(result["cache"] == "hit" for result in results), misses = sum(result["cache"] == "miss" for result in results))
+        return results
+
+_CACHES = {}
+
+def openCache(settings):
+    """
+    Opens the RenderCache described by settings once per process, so worker processes reuse it between tiles.
+
+    Args:
+        settings (tuple): the (directory, max_bytes) of the cache, or None.
+
+    Returns:
+        RenderCache: the cache, or None.
+    """
+
+    if settings is None:
+        return None
+    if settings not in _CACHES:
+        _CACHES[settings] = RenderCache(*settings)
+    return _CACHES[settings]
+
+def renderTile(spec, cache_settings = None):
+    """
+    Renders and saves a single tile definition, kept at module level so worker processes can pickle it.
+    When a cache is given and already holds the tile, the cached bytes are written without rendering or encoding.
+
+    Args:
+        spec (dict): The tile definition.
+        cache_settings (tuple): the (directory, max_bytes) of a RenderCache, or None.
+
+    Returns:
+        dict: name, seconds, files, error (None on success) and cache of the render.
+    """
+
+    start = time.perf_counter()
+    result = {"name": spec.get("name"), "seconds": 0.0, "files": [], "error": None, "cache": None}
+    try:
+        cache = openCache(cache_settings)
+        copies = spec.get("copies", 1)
+        variants = copies > 1 and spec.get("variants", False)
+        output_file = spec.get("output_file", "temp_output.png")
+        output_directory = os.path.join(os.getcwd(), spec.get("output_directory", "temp_assets"))
+        names = [f"{i}_{output_file}" for i in range(1, copies + 1)] if copies > 1 else [output_file]
+        key = RenderCache.keyFor(spec) if cache and not variants and output_file.endswith(tuple(config.VALID_IMG_FILE_EXT.keys())) else None
+        data = cache.get(key) if key else None
+        if data is not None:
+            result["cache"] = "hit"
+            os.makedirs(output_directory, exist_ok = True)
+            for name in names:
+                with open(os.path.join(output_directory, name), "wb") as output:
+                    output.write(data)
+            result["files"] = [os.path.join(output_directory, name) for name in names]
+        else:
+            result["cache"] = "miss" if key else None
+            tile_generator = TileGenerator.fromSpec(spec)
+            for shape_spec in spec.get("shapes", []):
+                PixelShape.fromSpec(tile_generator, shape_spec, draw = True)
+            tile_generator.saveImage(multiples = copies > 1, count = copies, variants = variants, seed = spec.get("variant_seed"), jobs = 1, cache = cache)
+            result["files"] = [os.path.join(tile_generator.output_directory, name) for name in names]
+            if key and tile_generator.cacheKey() != key:
+                with open(result["files"][0], "rb") as saved:
+                    cache.put(key, saved.read())
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+    result["seconds"] = time.perf_counter() - start
+    return result
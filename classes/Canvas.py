@@ -0,0 +1,188 @@
+import numpy as np
+from PIL import Image
+class Canvas:
+    """
+    A NumPy backed pixel buffer used by a TileGenerator in place of per-pixel PIL writes.
+
+    Attributes:
+        mode (str): The PIL image mode the canvas represents, i.e. RGBA or YCbCr.
+        size (tuple): The (width, height) of the canvas.
+        pixels (numpy.ndarray): The raw (height, width, bands) uint8 pixel buffer.
+    """
+
+    def __init__(self, mode, size, color = None):
+        """
+        Initializes a new Canvas object.
+
+        Args:
+            mode (str): The PIL image mode to represent.
+            size (tuple): The (width, height) of the canvas.
+            color (tuple): The color to initially fill the canvas with, if None the canvas will be zeroed.
+        """
+
+        self._mode = mode
+        self._bands = Image.getmodebands(mode)
+        width, height = size
+        self._pixels = np.zeros((height, width, self._bands), dtype = np.uint8)
+        if color is not None:
+            self.fill(color)
+
+    def __str__(self):
+        """
+        Provides a string representation of the Canvas object.
+
+        Returns:
+            str: A description of the Canvas object.
+        """
+
+        return f"A {self._mode} canvas of {self.size[0]}x{self.size[1]} pixels."
+
+    @property
+    def mode(self):
+        """
+        Gets the PIL image mode of the Canvas.
+
+        Returns:
+            str: The PIL image mode of the Canvas.
+        """
+
+        return self._mode
+
+    @property
+    def size(self):
+        """
+        Gets the size of the Canvas.
+
+        Returns:
+            tuple: The (width, height) of the Canvas.
+        """
+
+        return (self._pixels.shape[1], self._pixels.shape[0])
+
+    @property
+    def pixels(self):
+        """
+        Gets the raw pixel buffer of the Canvas.
+
+        Returns:
+            numpy.ndarray: The (height, width, bands) uint8 pixel buffer.
+        """
+
+        return self._pixels
+
+    def normalizeColor(self, color):
+        """
+        Converts a color tuple into the band layout of the canvas the same way PIL's putpixel does,
+        missing alpha is filled with 255 and extra values are dropped. A uint8 array of RGBA colors, one per pixel,
+        is cut down to the bands of the canvas.
+
+        Args:
+            color(tuple): an RGB or RGBA color tuple, or a (..., 4) numpy array of colors.
+
+        Returns:
+            numpy.ndarray: the color as a uint8 array with one value per band.
+        """
+
+        if isinstance(color, np.ndarray):
+            return color[..., :self._bands]
+        if not isinstance(color, tuple):
+            raise TypeError("color must be int or tuple")
+        values = list(color[:self._bands])
+        while len(values) < self._bands:
+            values.append(255)
+        return np.array(values, dtype = np.uint8)
+
+    def fill(self, color):
+        """
+        Fills the whole canvas with a single color.
+
+        Args:
+            color(tuple): the RGB or RGBA color to fill with.
+        """
+
+        self._pixels[...] = self.normalizeColor(color)
+
+    def putPixels(self, xs, ys, color):
+        """
+        Writes a single color to many pixels at once. Indexing follows PIL's putpixel,
+        negative values wrap around and anything else outside the canvas raises an IndexError.
+
+        Args:
+            xs(array like): the x coordinates of the pixels.
+            ys(array like): the y coordinates of the pixels.
+            color(tuple): the RGB or RGBA color to write, or an (n, 4) array with a color for every pixel.
+        """
+
+        xs = np.asarray(xs, dtype = np.int64)
+        ys = np.asarray(ys, dtype = np.int64)
+        if xs.size == 0:
+            return
+        width, height = self.size
+        if xs.min() < -width or xs.max() >= width or ys.min() < -height or ys.max() >= height:
+            raise IndexError("image index out of range")
+        self._pixels[ys, xs] = self.normalizeColor(color)
+
+    def fillMask(self, left, top, mask, color):
+        """
+        Writes a single color to every pixel set in a boolean mask, the mask must lie inside the canvas.
+        Four band pixels are written as one 32 bit word each so the write runs at memory speed.
+
+        Args:
+            left(int): the x the first mask column lands on.
+            top(int): the y the first mask row lands on.
+            mask(numpy.ndarray): a (height, width) boolean array of the pixels to write.
+            color(tuple): the RGB or RGBA color to write, or a (height, width, 4) array with a color for every pixel.
+        """
+
+        region = self._pixels[top:top + mask.shape[0], left:left + mask.shape[1]]
+        value = self.normalizeColor(color)
+        if mask.all():
+            region[...] = value
+        elif self._bands == 4:
+            np.copyto(region.view(np.uint32)[..., 0], np.ascontiguousarray(value).view(np.uint32)[..., 0], where = mask)
+        else:
+            np.copyto(region, value, where = mask[..., None])
+
+    def toImage(self):
+        """
+        Converts the canvas into a PIL Image.
+
+        Returns:
+            Image: a new PIL Image holding a copy of the canvas pixels.
+        """
+
+        return Image.frombytes(self._mode, self.size, self._pixels.tobytes())
+
+    @classmethod
+    def fromImage(cls, img):
+        """
+        Creates a canvas holding a copy of the pixels of a PIL Image.
+
+        Args:
+            img(Image): the PIL Image to copy.
+
+        Returns:
+            Canvas: a new Canvas with the same mode, size and pixels as img.
+        """
+
+        canvas = cls(img.mode, img.size)
+        canvas._pixels[...] = np.asarray(img).reshape(canvas._pixels.shape)
+        return canvas
+
+    @classmethod
+    def fromArray(cls, mode, pixels):
+        """
+        Creates a canvas over an existing (height, width, bands) uint8 array without copying it, such as a copy on
+        write memory map of a saved session whose pages are only read when touched.
+
+        Args:
+            mode(str): the PIL image mode the pixels are in.
+            pixels(numpy.ndarray): the pixel buffer the canvas will use.
+
+        Returns:
+            Canvas: a new Canvas backed by pixels.
+        """
+
+        canvas = cls(mode, (0, 0))
+        canvas._pixels = pixels
+        return canvas
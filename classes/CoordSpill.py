@@ -0,0 +1,124 @@
+import os
+import tempfile
+import weakref
+import numpy as np
+class CoordSpill:
+    """
+    Collects the coordinate chunks of a repeat in order, packed in memory or, for a LargeCanvas, appended to one
+    scratch file that is mapped back read only, so the coords of huge repeats live on disk instead of the heap.
+
+    Attributes:
+        spill (bool): Whether the chunks are written to a scratch file.
+        count (int): How many coords have been added.
+    """
+
+    def __init__(self, spill = False, directory = None):
+        """
+        Initializes a new CoordSpill object.
+
+        Args:
+            spill (bool): Whether the chunks are written to a scratch file, otherwise they are kept packed in memory.
+            directory (str): Where the scratch file is made, if None the system temporary directory is used.
+        """
+
+        self._spill = spill
+        self._parts = []
+        self._count = 0
+        self._file = tempfile.NamedTemporaryFile(prefix = "coords_", suffix = ".raw", dir = directory, delete = False) if spill else None
+
+    @property
+    def spill(self):
+        """
+        Gets whether the chunks are written to a scratch file.
+
+        Returns:
+            bool: True when the coords live on disk.
+        """
+
+        return self._spill
+
+    @property
+    def count(self):
+        """
+        Gets how many coords have been added.
+
+        Returns:
+            int: The number of coords.
+        """
+
+        return self._count
+
+    def add(self, coords):
+        """
+        Adds a chunk of coords after the ones added before.
+
+        Args:
+            coords (numpy.ndarray): an (n, 2) integer array.
+        """
+
+        from .PixelShape import PixelShape
+
+        coords = np.asarray(coords).reshape(-1, 2)
+        if self._spill:
+            self._file.write(coords.astype(np.int32).data)
+            self._parts.append((self._count, self._count + len(coords)))
+        else:
+            self._parts.append(PixelShape.packCoords(coords))
+        self._count += len(coords)
+
+    def parts(self):
+        """
+        Finishes the spill and gets every chunk on its own, in the order they were added.
+
+        Returns:
+            list of numpy.ndarray: one (n, 2) array per add.
+        """
+
+        if not self._spill:
+            return list(self._parts)
+        mapped = self._map()
+        return [mapped[first:last] for first, last in self._parts]
+
+    def joined(self):
+        """
+        Finishes the spill and gets every chunk as one array, in the order they were added.
+
+        Returns:
+            numpy.ndarray: an (n, 2) array of all the coords.
+        """
+
+        from .PixelShape import PixelShape
+
+        if not self._spill:
+            return PixelShape.packCoords(np.concatenate(self._parts) if self._parts else None)
+        return self._map()
+
+    def _map(self):
+        """
+        Closes the scratch file and maps it back read only, the file is removed once the mapping is garbage collected.
+
+        Returns:
+            numpy.ndarray: the (n, 2) int32 coords in the file.
+        """
+
+        self._file.close()
+        if self._count == 0:
+            os.remove(self._file.name)
+            return np.empty((0, 2), dtype = np.int32)
+        mapped = np.memmap(self._file.name, dtype = np.int32, mode = "r", shape = (self._count, 2))
+        weakref.finalize(mapped, CoordSpill._remove, self._file.name)
+        return mapped
+
+    @staticmethod
+    def _remove(path):
+        """
+        A static method that removes a scratch file, a file that is already gone or still mapped elsewhere is left alone.
+
+        Args:
+            path(str): the scratch file.
+        """
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
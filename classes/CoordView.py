@@ -0,0 +1,99 @@
+from collections.abc import Sequence
+import numpy as np
+class CoordView(Sequence):
+    """
+    A read only sequence of (x, y) tuples over a packed (n, 2) coordinate buffer, handed out by PixelShape.coords so
+    existing callers can keep indexing, iterating and comparing coords like a list without a tuple per point being stored.
+
+    Attributes:
+        buffer (numpy.ndarray): The read only (n, 2) integer buffer the view reads from.
+    """
+
+    __slots__ = ("_buffer",)
+
+    def __init__(self, buffer):
+        """
+        Initializes a new CoordView object.
+
+        Args:
+            buffer (numpy.ndarray): The (n, 2) integer buffer to view.
+        """
+
+        self._buffer = buffer.view()
+        self._buffer.flags.writeable = False
+
+    def __repr__(self):
+        """
+        Provides the same representation a list of tuples would have.
+
+        Returns:
+            str: The coords written as a list of tuples.
+        """
+
+        return repr(list(self))
+
+    def __len__(self):
+        """
+        Gets how many coords are in the view.
+
+        Returns:
+            int: The number of coords.
+        """
+
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        """
+        Gets a coordinate, or a view of a slice of coordinates.
+
+        Args:
+            index (int or slice): the position or slice to get.
+
+        Returns:
+            tuple or CoordView: the (x, y) tuple at index, or a CoordView of the slice.
+        """
+
+        if isinstance(index, slice):
+            return CoordView(self._buffer[index])
+        x, y = self._buffer[index].tolist()
+        return (x, y)
+
+    def __iter__(self):
+        """
+        Iterates over the coords as (x, y) tuples, converting the buffer a block at a time.
+
+        Returns:
+            iterator: the (x, y) tuples in order.
+        """
+
+        for start in range(0, len(self._buffer), 65536):
+            for x, y in self._buffer[start:start + 65536].tolist():
+                yield (x, y)
+
+    def __eq__(self, other):
+        """
+        Compares the coords with another CoordView or any sequence of (x, y) pairs.
+
+        Args:
+            other (Sequence): the coords to compare with.
+
+        Returns:
+            bool: True if both hold the same coords in the same order.
+        """
+
+        if isinstance(other, CoordView):
+            return np.array_equal(self._buffer, other._buffer)
+        if isinstance(other, (list, tuple)):
+            return len(other) == len(self) and all(tuple(a) == b for a, b in zip(other, self))
+        return NotImplemented
+
+    @property
+    def buffer(self):
+        """
+        Gets the read only coordinate buffer of the view.
+
+        Returns:
+            numpy.ndarray: The (n, 2) integer buffer.
+        """
+
+        return self._buffer
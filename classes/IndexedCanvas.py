@@ -0,0 +1,296 @@
+import numpy as np
+from PIL import Image
+from classes.Canvas import Canvas
+class IndexedCanvas(Canvas):
+    """
+    A Canvas whose pixels are indices into a palette of up to 256 colors, so recoloring changes the palette and
+    never touches a pixel.
+
+    Every color written gets a palette slot the first time it is used, and later writes of the same color reuse it.
+    When the palette is full, slots no pixel points at any more are given out again. Reading pixels expands the indices
+    through the palette, writes go through fill, putPixels and fillMask.
+
+    Attributes:
+        mode (str): The PIL image mode the palette colors are in, i.e. RGBA.
+        size (tuple): The (width, height) of the canvas.
+        pixels (numpy.ndarray): A (height, width, bands) uint8 copy of the pixels, expanded through the palette.
+        indices (numpy.ndarray): The raw (height, width) uint8 palette indices.
+        palette (numpy.ndarray): The (256, bands) uint8 palette, only the slots in use mean anything.
+    """
+
+    def __init__(self, mode, size, color = None):
+        """
+        Initializes a new IndexedCanvas object, slot 0 starts as the zeroed color.
+
+        Args:
+            mode (str): The PIL image mode to represent.
+            size (tuple): The (width, height) of the canvas.
+            color (tuple): The color to initially fill the canvas with, if None the canvas will be zeroed.
+        """
+
+        self._mode = mode
+        self._bands = Image.getmodebands(mode)
+        width, height = size
+        self._indices = np.zeros((height, width), dtype = np.uint8)
+        self._palette = np.zeros((256, self._bands), dtype = np.uint8)
+        self._live = np.zeros(256, dtype = bool)
+        self._live[0] = True
+        self._pinned = np.zeros(256, dtype = bool)
+        self._slots = {self._palette[0].tobytes(): 0}
+        if color is not None:
+            self.fill(color)
+
+    def __str__(self):
+        """
+        Provides a string representation of the IndexedCanvas object.
+
+        Returns:
+            str: A description of the IndexedCanvas object.
+        """
+
+        return f"An indexed {self._mode} canvas of {self.size[0]}x{self.size[1]} pixels using {int(self._live.sum())} of 256 palette slots."
+
+    @property
+    def size(self):
+        """
+        Gets the size of the IndexedCanvas.
+
+        Returns:
+            tuple: The (width, height) of the IndexedCanvas.
+        """
+
+        return (self._indices.shape[1], self._indices.shape[0])
+
+    @property
+    def pixels(self):
+        """
+        Gets the pixels expanded through the palette, writing to them does not change the canvas.
+
+        Returns:
+            numpy.ndarray: A (height, width, bands) uint8 copy of the pixels.
+        """
+
+        return self._palette[self._indices]
+
+    @property
+    def indices(self):
+        """
+        Gets the raw palette indices of the IndexedCanvas.
+
+        Returns:
+            numpy.ndarray: The (height, width) uint8 index buffer.
+        """
+
+        return self._indices
+
+    @property
+    def palette(self):
+        """
+        Gets the palette of the IndexedCanvas.
+
+        Returns:
+            numpy.ndarray: The (256, bands) uint8 palette.
+        """
+
+        return self._palette
+
+    def slot(self, color):
+        """
+        Gets the palette slot of a color, giving it a free slot if it has none.
+
+        Args:
+            color(tuple): an RGB or RGBA color tuple.
+
+        Returns:
+            int: the slot.
+        """
+
+        value = self.normalizeColor(color)
+        key = value.tobytes()
+        if key in self._slots:
+            return self._slots[key]
+        if self._live.all():
+            self._live[:] = (np.bincount(self._indices.ravel(), minlength = 256) > 0) | self._pinned
+            self._slots = {key: slot for key, slot in self._slots.items() if self._live[slot]}
+        if self._live.all():
+            raise ValueError("an indexed canvas holds at most 256 colors at once")
+        slot = int(np.argmin(self._live))
+        self._live[slot] = True
+        self._palette[slot] = value
+        self._slots[key] = slot
+        return slot
+
+    def fill(self, color):
+        """
+        Fills the whole canvas with a single color, every other palette slot is freed.
+
+        Args:
+            color(tuple): the RGB or RGBA color to fill with.
+        """
+
+        self._live[:] = False
+        self._slots = {}
+        self._indices[...] = self.slot(color)
+
+    def putPixels(self, xs, ys, color):
+        """
+        Writes a single color to many pixels at once. Indexing follows PIL's putpixel,
+        negative values wrap around and anything else outside the canvas raises an IndexError.
+
+        Args:
+            xs(array like): the x coordinates of the pixels.
+            ys(array like): the y coordinates of the pixels.
+            color(tuple): the RGB or RGBA color to write, or an (n, 4) array with a color for every pixel.
+        """
+
+        xs = np.asarray(xs, dtype = np.int64)
+        ys = np.asarray(ys, dtype = np.int64)
+        if xs.size == 0:
+            return
+        width, height = self.size
+        if xs.min() < -width or xs.max() >= width or ys.min() < -height or ys.max() >= height:
+            raise IndexError("image index out of range")
+        self._indices[ys, xs] = self._slotsOf(color)
+
+    def fillMask(self, left, top, mask, color):
+        """
+        Writes a single color to every pixel set in a boolean mask, the mask must lie inside the canvas.
+
+        Args:
+            left(int): the x the first mask column lands on.
+            top(int): the y the first mask row lands on.
+            mask(numpy.ndarray): a (height, width) boolean array of the pixels to write.
+            color(tuple): the RGB or RGBA color to write, or a (height, width, 4) array with a color for every pixel.
+        """
+
+        region = self._indices[top:top + mask.shape[0], left:left + mask.shape[1]]
+        value = self._slotsOf(color)
+        if mask.all():
+            region[...] = value
+        else:
+            np.copyto(region, value, where = mask)
+
+    def recolor(self, mapping):
+        """
+        Replaces colors in the palette, every pixel of an old color shows the new one. Costs one pass over the palette.
+
+        Args:
+            mapping(dict): new RGB or RGBA color tuples by the old color tuples they replace.
+        """
+
+        self._palette[...] = self.recolored(mapping)
+        self._slots = {}
+        for slot in np.flatnonzero(self._live)[::-1]:
+            self._slots[self._palette[slot].tobytes()] = int(slot)
+
+    def recolored(self, mapping):
+        """
+        Gets the palette with colors replaced, leaving the canvas as it is.
+
+        Args:
+            mapping(dict): new RGB or RGBA color tuples by the old color tuples they replace.
+
+        Returns:
+            numpy.ndarray: a (256, bands) uint8 copy of the palette.
+        """
+
+        palette = self._palette.copy()
+        for old, new in mapping.items():
+            palette[self._live & np.all(self._palette == self.normalizeColor(tuple(old)), axis = 1)] = self.normalizeColor(tuple(new))
+        return palette
+
+    def toImage(self, palette = None):
+        """
+        Converts the canvas into a PIL Image.
+
+        Args:
+            palette(numpy.ndarray): a (256, bands) palette to expand the indices through, if None the canvas palette.
+
+        Returns:
+            Image: a new PIL Image holding the expanded pixels.
+        """
+
+        pixels = (self._palette if palette is None else palette)[self._indices]
+        return Image.frombytes(self._mode, self.size, pixels.tobytes())
+
+    def toIndexedImage(self, palette = None):
+        """
+        Converts the canvas into a P mode PIL Image sharing the indices, alpha is kept as a per slot transparency table.
+        Only RGB and RGBA canvases have palettes PIL can hold.
+
+        Args:
+            palette(numpy.ndarray): a (256, bands) palette to use, if None the canvas palette.
+
+        Returns:
+            Image: the P mode image, or None for other modes.
+        """
+
+        if self._mode not in ("RGB", "RGBA"):
+            return None
+        palette = self._palette if palette is None else palette
+        img = Image.fromarray(self._indices, "P")
+        img.putpalette(palette[:, :3].tobytes())
+        if self._bands == 4 and np.any(palette[:, 3] != 255):
+            img.info["transparency"] = palette[:, 3].tobytes()
+        return img
+
+    @classmethod
+    def fromArray(cls, mode, indices, palette = None):
+        """
+        Creates a canvas over an existing (height, width) uint8 index array without copying it.
+
+        Args:
+            mode(str): the PIL image mode the palette is in.
+            indices(numpy.ndarray): the index buffer the canvas will use.
+            palette(list): the palette colors by slot, the slots it holds are the ones in use.
+
+        Returns:
+            IndexedCanvas: a new IndexedCanvas backed by indices.
+        """
+
+        canvas = cls(mode, (0, 0))
+        canvas._indices = indices
+        if palette:
+            canvas._live[:] = False
+            canvas._slots = {}
+            for slot, color in enumerate(palette):
+                canvas._palette[slot] = canvas.normalizeColor(tuple(color))
+                canvas._live[slot] = True
+            canvas.recolor({})
+        return canvas
+
+    def paletteColors(self):
+        """
+        Gets the colors of the slots in use, in slot order, as fromArray takes them.
+
+        Returns:
+            list of list: the color of every slot up to the last one in use.
+        """
+
+        return self._palette[:int(np.flatnonzero(self._live)[-1]) + 1].tolist() if self._live.any() else []
+
+    def _slotsOf(self, color):
+        """
+        Gets the slot of a color, or the slot of every color of a per pixel color array.
+
+        Args:
+            color(tuple): an RGB or RGBA color tuple, or a (..., 4) uint8 array of colors.
+
+        Returns:
+            int or numpy.ndarray: the slot, or a uint8 array of slots shaped like the colors without their bands.
+        """
+
+        if not isinstance(color, np.ndarray):
+            return self.slot(color)
+        colors = np.ascontiguousarray(self.normalizeColor(color))
+        packed = np.zeros(colors.shape[:-1] + (4,), dtype = np.uint8)
+        packed[..., :self._bands] = colors
+        unique, inverse = np.unique(packed.view(np.uint32)[..., 0], return_inverse = True)
+        lookup = np.zeros(len(unique), dtype = np.uint8)
+        try:
+            for i, value in enumerate(unique.view(np.uint8).reshape(-1, 4)[:, :self._bands].tolist()):
+                lookup[i] = self.slot(tuple(value))
+                self._pinned[lookup[i]] = True
+        finally:
+            self._pinned[:] = False
+        return lookup[inverse].reshape(colors.shape[:-1])
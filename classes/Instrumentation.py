@@ -0,0 +1,190 @@
+import functools
+import json
+import random
+import threading
+import time
+class Instrumentation:
+    """
+    Opt in timing of the hot paths of TileGenerator and PixelShape. While disabled a tracked call only costs one flag check.
+
+    Every tracked operation records its call count, total and percentile latencies, the pixels it touched and the bytes it wrote.
+    Records are kept under a lock, so calls tracked on the SaveQueue worker threads add up with those of the caller.
+
+    Attributes:
+        enabled (bool): Whether tracked calls are being recorded.
+    """
+
+    enabled = False
+    SAMPLES = 10000
+    _stats = {}
+    _random = random.Random(0)
+    _lock = threading.Lock()
+
+    @classmethod
+    def enable(cls):
+        """
+        Starts recording tracked calls.
+        """
+
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        """
+        Stops recording tracked calls, what was recorded so far is kept.
+        """
+
+        cls.enabled = False
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets everything recorded so far.
+        """
+
+        with cls._lock:
+            cls._stats = {}
+
+    @classmethod
+    def track(cls, name):
+        """
+        A decorator that records the latency of every call to the decorated function under name while enabled.
+
+        Args:
+            name (str): the name the calls are recorded under, i.e. TileGenerator.saveImage.
+
+        Returns:
+            callable: the decorator.
+        """
+
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    cls._record(name, time.perf_counter() - start)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def count(cls, name, pixels = 0, bytes_written = 0):
+        """
+        Adds the pixels touched and bytes written by a tracked operation, callers check enabled first.
+
+        Args:
+            name (str): the name the operation is recorded under.
+            pixels (int): pixels the operation touched.
+            bytes_written (int): bytes the operation wrote to disk.
+        """
+
+        with cls._lock:
+            entry = cls._entry(name)
+            entry["pixels"] += int(pixels)
+            entry["bytes"] += int(bytes_written)
+
+    @classmethod
+    def snapshot(cls):
+        """
+        Summarizes everything recorded so far.
+
+        Returns:
+            dict: for each operation its calls, total, mean, p50, p90, p99 and max seconds, pixels and bytes.
+        """
+
+        summary = {}
+        with cls._lock:
+            stats = {name: dict(entry, samples = list(entry["samples"])) for name, entry in cls._stats.items()}
+        for name, entry in sorted(stats.items()):
+            samples = sorted(entry["samples"])
+            summary[name] = {"calls": entry["calls"], "total": entry["total"],
+                             "mean": entry["total"] / entry["calls"] if entry["calls"] else 0.0,
+                             "p50": cls._percentile(samples, 0.5), "p90": cls._percentile(samples, 0.9),
+                             "p99": cls._percentile(samples, 0.99), "max": entry["max"],
+                             "pixels": entry["pixels"], "bytes": entry["bytes"]}
+        return summary
+
+    @classmethod
+    def exportJSON(cls, path):
+        """
+        Writes the snapshot to a JSON file.
+
+        Args:
+            path (str): the file to write.
+        """
+
+        with open(path, "w") as output:
+            json.dump(cls.snapshot(), output, indent = 1)
+
+    @classmethod
+    def format(cls):
+        """
+        Formats the snapshot as a table.
+
+        Returns:
+            str: one line per operation.
+        """
+
+        lines = [f"{'operation':<32} {'calls':>7} {'total ms':>10} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'pixels':>12} {'bytes':>12}"]
+        for name, entry in cls.snapshot().items():
+            lines.append(f"{name:<32} {entry['calls']:>7} {entry['total'] * 1000:>10.3f} {entry['p50'] * 1000:>9.3f} {entry['p90'] * 1000:>9.3f} "
+                         f"{entry['p99'] * 1000:>9.3f} {entry['pixels']:>12} {entry['bytes']:>12}")
+        return "\n".join(lines)
+
+    @classmethod
+    def _entry(cls, name):
+        """
+        Gets the record of an operation, making it on first use.
+
+        Args:
+            name (str): the name of the operation.
+
+        Returns:
+            dict: the record.
+        """
+
+        if name not in cls._stats:
+            cls._stats[name] = {"calls": 0, "total": 0.0, "max": 0.0, "samples": [], "pixels": 0, "bytes": 0}
+        return cls._stats[name]
+
+    @classmethod
+    def _record(cls, name, seconds):
+        """
+        Records one call, latencies beyond SAMPLES calls are kept by reservoir sampling so memory stays bounded.
+
+        Args:
+            name (str): the name of the operation.
+            seconds (float): how long the call took.
+        """
+
+        with cls._lock:
+            entry = cls._entry(name)
+            entry["calls"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            if len(entry["samples"]) < cls.SAMPLES:
+                entry["samples"].append(seconds)
+            else:
+                slot = cls._random.randrange(entry["calls"])
+                if slot < cls.SAMPLES:
+                    entry["samples"][slot] = seconds
+
+    @staticmethod
+    def _percentile(samples, fraction):
+        """
+        A static method that picks a percentile out of sorted samples by nearest rank.
+
+        Args:
+            samples (list of float): sorted latencies.
+            fraction (float): the percentile as a fraction, i.e. 0.9.
+
+        Returns:
+            float: the percentile, 0 when there are no samples.
+        """
+
+        if not samples:
+            return 0.0
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
@@ -0,0 +1,239 @@
+import mmap
+import os
+import struct
+import tempfile
+import weakref
+import zlib
+import numpy as np
+from PIL import Image
+from classes import config
+from .Canvas import Canvas
+class LargeCanvas(Canvas):
+    """
+    A Canvas whose pixels live in a memory mapped scratch file instead of the heap, for tiles larger than RAM.
+
+    Fills and bulk writes are done a bounded horizontal strip at a time and the pages of every strip are handed back
+    to the operating system once written, so resident memory stays flat however large the canvas grows. The image is
+    written out strip by strip with writePNG or writeBMP, toImage still works but builds the whole image in memory.
+
+    Attributes:
+        mode (str): The PIL image mode the canvas represents, i.e. RGBA.
+        size (tuple): The (width, height) of the canvas.
+        pixels (numpy.memmap): The (height, width, bands) uint8 pixel buffer, mapped from the scratch file.
+        strip_rows (int): How many rows a strip holds, set by config.STRIP_BYTES.
+        path (str): The scratch file, removed once the canvas is garbage collected.
+    """
+
+    PNG_COLOR_TYPES = {"L": 0, "RGB": 2, "RGBA": 6}
+
+    def __init__(self, mode, size, color = None, directory = None):
+        """
+        Initializes a new LargeCanvas object, the scratch file starts out sparse so an unfilled canvas takes no disk space.
+
+        Args:
+            mode (str): The PIL image mode to represent.
+            size (tuple): The (width, height) of the canvas.
+            color (tuple): The color to initially fill the canvas with, if None the canvas will be zeroed.
+            directory (str): Where the scratch file is made, if None the system temporary directory is used.
+        """
+
+        self._mode = mode
+        self._bands = Image.getmodebands(mode)
+        width, height = size
+        handle, self._path = tempfile.mkstemp(prefix = "large_canvas_", suffix = ".raw", dir = directory)
+        os.close(handle)
+        self._map = np.memmap(self._path, dtype = np.uint8, mode = "w+", shape = (max(height, 1), max(width, 1), self._bands))
+        self._pixels = self._map[:height, :width]
+        weakref.finalize(self, self._remove, self._path)
+        self._strip_rows = max(1, config.STRIP_BYTES // max(1, width * self._bands))
+        if color is not None:
+            self.fill(color)
+
+    def __str__(self):
+        """
+        Provides a string representation of the LargeCanvas object.
+
+        Returns:
+            str: A description of the LargeCanvas object.
+        """
+
+        return f"A memory mapped {self._mode} canvas of {self.size[0]}x{self.size[1]} pixels in {self._path}, {self._strip_rows} rows a strip."
+
+    @property
+    def strip_rows(self):
+        """
+        Gets how many rows a strip of the LargeCanvas holds.
+
+        Returns:
+            int: The rows in a strip.
+        """
+
+        return self._strip_rows
+
+    @property
+    def path(self):
+        """
+        Gets the scratch file of the LargeCanvas.
+
+        Returns:
+            str: The path of the scratch file.
+        """
+
+        return self._path
+
+    def strips(self, top = 0, bottom = None):
+        """
+        Splits a run of rows into strips of at most strip_rows rows.
+
+        Args:
+            top (int): the first row.
+            bottom (int): one past the last row, None is the bottom of the canvas.
+
+        Returns:
+            list of tuple: the (top, bottom) rows of every strip.
+        """
+
+        bottom = self.size[1] if bottom is None else bottom
+        return [(start, min(start + self._strip_rows, bottom)) for start in range(top, bottom, self._strip_rows)]
+
+    def release(self, top = 0, bottom = None):
+        """
+        Hands the resident pages of a run of rows back to the operating system, they stay in the scratch file and are
+        read back in when touched again.
+
+        Args:
+            top (int): the first row.
+            bottom (int): one past the last row, None is the bottom of the canvas.
+        """
+
+        mapping = self._map._mmap
+        if not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        bottom = self.size[1] if bottom is None else bottom
+        row = self._pixels.strides[0]
+        start = top * row // mmap.PAGESIZE * mmap.PAGESIZE
+        end = min(len(mapping), bottom * row)
+        if end > start:
+            mapping.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+    def fill(self, color):
+        """
+        Fills the whole canvas with a single color, a strip at a time.
+
+        Args:
+            color(tuple): the RGB or RGBA color to fill with.
+        """
+
+        color = self.normalizeColor(color)
+        for top, bottom in self.strips():
+            self._pixels[top:bottom] = color
+            self.release(top, bottom)
+
+    def putPixels(self, xs, ys, color):
+        """
+        Writes a single color to many pixels at once, row ordered a strip at a time so every page is touched once.
+        Indexing follows PIL's putpixel, negative values wrap around and anything else outside the canvas raises an IndexError.
+
+        Args:
+            xs(array like): the x coordinates of the pixels.
+            ys(array like): the y coordinates of the pixels.
+            color(tuple): the RGB or RGBA color to write, or an (n, 4) array with a color for every pixel.
+        """
+
+        xs = np.asarray(xs, dtype = np.int64)
+        ys = np.asarray(ys, dtype = np.int64)
+        if xs.size == 0:
+            return
+        width, height = self.size
+        if xs.min() < -width or xs.max() >= width or ys.min() < -height or ys.max() >= height:
+            raise IndexError("image index out of range")
+        ys = ys % height
+        order = np.argsort(ys, kind = "stable")
+        xs, ys = xs[order], ys[order]
+        color = self.normalizeColor(color)
+        colors = color[order] if color.ndim > 1 else None
+        for top, bottom in self.strips(int(ys[0]), int(ys[-1]) + 1):
+            first, last = np.searchsorted(ys, (top, bottom))
+            self._pixels[ys[first:last], xs[first:last]] = color if colors is None else colors[first:last]
+            self.release(top, bottom)
+
+    def writePNG(self, path, compress_level = 6):
+        """
+        Writes the canvas to a PNG file a strip at a time, only one strip is ever held in memory.
+
+        Args:
+            path(str): the file to write.
+            compress_level(int): the zlib level, 0 to 9.
+        """
+
+        if self._mode not in self.PNG_COLOR_TYPES:
+            raise ValueError(f"a {self._mode} canvas can not be written as a PNG")
+        width, height = self.size
+        compressor = zlib.compressobj(compress_level)
+        with open(path, "wb") as output:
+            output.write(b"\x89PNG\r\n\x1a\n")
+            self._writeChunk(output, b"IHDR", struct.pack(">IIBBBBB", width, height, 8, self.PNG_COLOR_TYPES[self._mode], 0, 0, 0))
+            for top, bottom in self.strips():
+                rows = np.zeros((bottom - top, 1 + width * self._bands), dtype = np.uint8)
+                rows[:, 1:] = self._pixels[top:bottom].reshape(bottom - top, -1)
+                self.release(top, bottom)
+                data = compressor.compress(rows.data)
+                if data:
+                    self._writeChunk(output, b"IDAT", data)
+            self._writeChunk(output, b"IDAT", compressor.flush())
+            self._writeChunk(output, b"IEND", b"")
+
+    def writeBMP(self, path):
+        """
+        Writes the canvas to a top down BMP file a strip at a time, 32 bit for RGBA and 24 bit for RGB.
+
+        Args:
+            path(str): the file to write.
+        """
+
+        if self._mode not in ("RGB", "RGBA"):
+            raise ValueError(f"a {self._mode} canvas can not be written as a BMP")
+        width, height = self.size
+        stride = (width * self._bands + 3) // 4 * 4
+        if 54 + stride * height > 0xFFFFFFFF:
+            raise ValueError(f"a {width}x{height} canvas is too large for a BMP, save it as a PNG")
+        with open(path, "wb") as output:
+            output.write(struct.pack("<2sIHHI", b"BM", 54 + stride * height, 0, 0, 54))
+            output.write(struct.pack("<IiiHHIIiiII", 40, width, -height, 1, self._bands * 8, 0, stride * height, 2835, 2835, 0, 0))
+            for top, bottom in self.strips():
+                rows = np.zeros((bottom - top, stride), dtype = np.uint8)
+                pixels = rows[:, :width * self._bands].reshape(bottom - top, width, self._bands)
+                pixels[...] = self._pixels[top:bottom]
+                pixels[..., [0, 2]] = pixels[..., [2, 0]]
+                self.release(top, bottom)
+                output.write(rows.data)
+
+    @staticmethod
+    def _remove(path):
+        """
+        A static method that removes a scratch file, a file that is already gone or still mapped elsewhere is left alone.
+
+        Args:
+            path(str): the scratch file.
+        """
+
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _writeChunk(output, kind, data):
+        """
+        A static method that writes one PNG chunk, its length, type, data and CRC.
+
+        Args:
+            output(file): the open PNG file.
+            kind(bytes): the four letter chunk type.
+            data(bytes): the chunk data.
+        """
+
+        output.write(struct.pack(">I", len(data)))
+        output.write(kind)
+        output.write(data)
+        output.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
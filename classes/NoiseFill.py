@@ -0,0 +1,506 @@
+import numpy as np
+from classes import config
+class NoiseFill:
+    """
+    A seeded procedural color source: value, Perlin or simplex noise, or a linear or radial gradient, mapped through a
+    palette. A NoiseFill can be used anywhere a color is, as the background of a TileGenerator or the color of a
+    PixelShape, and every pixel gets the color of the fill at its own position.
+
+    Noise is computed with whole array operations. The random values live on a small lattice that is only built for the
+    cells a render covers, and for a rectangle the lattice is spread over the pixel rows and columns with block repeats,
+    so a render costs a handful of passes over the pixels per octave.
+
+    Attributes:
+        kind (str): The kind of fill, one of KINDS.
+        palette (tuple): The RGBA colors the fill is mapped through, from low to high values.
+        scale (float): The size in pixels of a noise lattice cell, larger is smoother.
+        octaves (int): How many layers of noise are summed, each twice as fine as the last.
+        persistence (float): How much each octave is weighted against the one before it.
+        seed (int): The seed, the same seed always gives the same fill.
+        smooth (bool): Whether values blend between palette colors instead of picking the nearest one.
+        dither (bool): Whether an ordered 4x4 Bayer dither spreads values between neighbouring palette colors.
+        start (tuple): The (x, y) a gradient starts at, or the center of a radial gradient.
+        end (tuple): The (x, y) a gradient ends at, or a point on the edge of a radial gradient.
+        radial (bool): Whether a gradient spreads out from start instead of running along the line to end.
+    """
+
+    KINDS = ("value", "perlin", "simplex", "gradient")
+
+    BAYER = (np.array([[0, 8, 2, 10], [12, 4, 14, 6], [3, 11, 1, 9], [15, 7, 13, 5]], dtype = np.float32) + 0.5) / 16 - 0.5
+
+    def __init__(self, kind = "perlin", palette = ((0, 0, 0), (255, 255, 255)), scale = 16.0, octaves = 1, persistence = 0.5,
+                 seed = 0, smooth = False, dither = False, start = (0, 0), end = (32, 0), radial = False):
+        """
+        Initializes a new NoiseFill object.
+
+        Args:
+            kind (str): "value", "perlin" or "simplex" noise, or a "gradient".
+            palette (list of tuples): at least one RGB or RGBA color, from low to high values.
+            scale (float): The size in pixels of a noise lattice cell.
+            octaves (int): How many layers of noise are summed.
+            persistence (float): How much each octave is weighted against the one before it.
+            seed (int): The seed, the same seed always gives the same fill.
+            smooth (bool): Whether values blend between palette colors instead of picking the nearest one.
+            dither (bool): Whether an ordered dither spreads values between neighbouring palette colors.
+            start (tuple): The (x, y) a gradient starts at, or the center of a radial gradient.
+            end (tuple): The (x, y) a gradient ends at, or a point on the edge of a radial gradient.
+            radial (bool): Whether a gradient spreads out from start.
+        """
+
+        if kind not in self.KINDS:
+            raise ValueError(f"{kind} is not a fill, choose from {', '.join(self.KINDS)}")
+        colors = [tuple(color) for color in palette] if isinstance(palette, (list, tuple)) else []
+        if not colors or not all(3 <= len(color) <= 4 and all(isinstance(c, int) and 0 <= c <= 255 for c in color) for color in colors):
+            raise ValueError(f"a palette needs at least one RGB or RGBA color, got {palette}")
+        if not isinstance(scale, (int, float)) or scale <= 0:
+            raise ValueError(f"scale must be a positive number, got {scale}")
+        self._kind = kind
+        self._palette = tuple(color if len(color) == 4 else color + (255,) for color in colors)
+        self._scale = float(scale)
+        self._octaves = octaves if isinstance(octaves, int) and octaves > 0 else 1
+        self._persistence = float(persistence)
+        self._seed = int(seed)
+        self._smooth = bool(smooth)
+        self._dither = bool(dither)
+        self._start = tuple(start)
+        self._end = tuple(end)
+        self._radial = bool(radial)
+        self._table = np.array(self._palette, dtype = np.uint8)
+
+    def __str__(self):
+        """
+        Provides a string representation of the NoiseFill object.
+
+        Returns:
+            str: A description of the NoiseFill object.
+        """
+
+        if self._kind == "gradient":
+            return f"A {'radial' if self._radial else 'linear'} gradient from {self._start} to {self._end} through {len(self._palette)} colors."
+        return f"A {self._kind} noise fill of scale {self._scale} with {self._octaves} octaves and seed {self._seed} through {len(self._palette)} colors."
+
+    def __eq__(self, other):
+        """
+        Checks if two fills give the same colors.
+
+        Args:
+            other (NoiseFill): the fill to compare with.
+
+        Returns:
+            bool: True if every parameter matches.
+        """
+
+        return isinstance(other, NoiseFill) and self.toSpec() == other.toSpec()
+
+    def __hash__(self):
+        """
+        Hashes the fill by its parameters, so equal fills hash the same.
+
+        Returns:
+            int: the hash.
+        """
+
+        return hash(repr(sorted(self.toSpec().items())))
+
+    @property
+    def kind(self):
+        """
+        Gets the kind of the NoiseFill.
+
+        Returns:
+            str: The kind, one of KINDS.
+        """
+
+        return self._kind
+
+    @property
+    def palette(self):
+        """
+        Gets the palette of the NoiseFill.
+
+        Returns:
+            tuple: The RGBA colors from low to high values.
+        """
+
+        return self._palette
+
+    @property
+    def scale(self):
+        """
+        Gets the lattice cell size of the NoiseFill.
+
+        Returns:
+            float: The size in pixels of a noise lattice cell.
+        """
+
+        return self._scale
+
+    @property
+    def octaves(self):
+        """
+        Gets the number of octaves of the NoiseFill.
+
+        Returns:
+            int: How many layers of noise are summed.
+        """
+
+        return self._octaves
+
+    @property
+    def seed(self):
+        """
+        Gets the seed of the NoiseFill.
+
+        Returns:
+            int: The seed.
+        """
+
+        return self._seed
+
+    @property
+    def smooth(self):
+        """
+        Gets whether values blend between palette colors.
+
+        Returns:
+            bool: True if colors are blended, False if every pixel is a palette color.
+        """
+
+        return self._smooth
+
+    @classmethod
+    def fromSpec(cls, spec):
+        """
+        Creates a NoiseFill from a dictionary, as used by render manifests where it can stand in for a color.
+
+        Args:
+            spec (dict): "fill" naming the kind and any of the other constructor arguments.
+
+        Returns:
+            NoiseFill: the new NoiseFill object.
+        """
+
+        arguments = {name: value for name, value in spec.items() if name != "fill"}
+        if "palette" in arguments:
+            arguments["palette"] = [tuple(color) for color in arguments["palette"]]
+        return cls(spec.get("fill", "perlin"), **arguments)
+
+    def toSpec(self):
+        """
+        Describes the NoiseFill as a dictionary that fromSpec can rebuild it from.
+
+        Returns:
+            dict: the fill kind and its parameters.
+        """
+
+        return {"fill": self._kind, "palette": [list(color) for color in self._palette], "scale": self._scale,
+                "octaves": self._octaves, "persistence": self._persistence, "seed": self._seed, "smooth": self._smooth,
+                "dither": self._dither, "start": list(self._start), "end": list(self._end), "radial": self._radial}
+
+    def render(self, box):
+        """
+        Computes the colors of every pixel of a rectangle, a band of config.NOISE_BAND_ROWS rows at a time.
+
+        Args:
+            box (tuple): the (left, top, right, bottom) rectangle, right and bottom exclusive.
+
+        Returns:
+            numpy.ndarray: the (height, width, 4) uint8 RGBA colors.
+        """
+
+        left, top, right, bottom = box
+        colors = np.empty((max(bottom - top, 0), max(right - left, 0), 4), dtype = np.uint8)
+        xs = np.arange(left, right, dtype = np.float32)[None, :]
+        thresholds = {}
+        for band in range(top, bottom, config.NOISE_BAND_ROWS):
+            ys = np.arange(band, min(band + config.NOISE_BAND_ROWS, bottom), dtype = np.float32)[:, None]
+            if (band % 4, len(ys)) not in thresholds:
+                thresholds[band % 4, len(ys)] = self._threshold(xs, ys)
+            colors[band - top:band - top + len(ys)] = self._colorize(self.values(xs, ys), thresholds[band % 4, len(ys)])
+        return colors
+
+    def colorsAt(self, xs, ys):
+        """
+        Computes the colors of single pixels.
+
+        Args:
+            xs (numpy.ndarray): the x coordinates of the pixels.
+            ys (numpy.ndarray): the y coordinates of the pixels, the same length as xs.
+
+        Returns:
+            numpy.ndarray: the (n, 4) uint8 RGBA colors.
+        """
+
+        xs = np.asarray(xs, dtype = np.float32).ravel()
+        ys = np.asarray(ys, dtype = np.float32).ravel()
+        return self._colorize(self.values(xs, ys), self._threshold(xs, ys))
+
+    def values(self, xs, ys):
+        """
+        Computes the raw fill values before they are mapped through the palette.
+
+        Args:
+            xs (numpy.ndarray): x coordinates, a row (1, width) for a rectangle or a flat array for single pixels.
+            ys (numpy.ndarray): y coordinates, a column (height, 1) for a rectangle or a flat array for single pixels.
+
+        Returns:
+            numpy.ndarray: float32 values between 0 and 1, broadcast to the shape of xs and ys.
+        """
+
+        shape = np.broadcast_shapes(np.shape(xs), np.shape(ys))
+        if self._kind == "gradient":
+            return self._gradient(xs, ys)
+        if 0 in shape:
+            return np.zeros(shape, dtype = np.float32)
+        noise = self._value if self._kind == "value" else self._perlin if self._kind == "perlin" else self._simplex
+        weights = [self._persistence ** octave for octave in range(self._octaves)]
+        total = None
+        for octave, weight in enumerate(weights):
+            frequency = np.float32((2 ** octave) / self._scale)
+            layer = noise(xs * frequency, ys * frequency, self._seed + octave)
+            if total is None:
+                total = layer if len(weights) == 1 else layer * np.float32(weight / sum(weights))
+            else:
+                total += layer * np.float32(weight / sum(weights))
+        return np.clip(total, 0, 1, out = total)
+
+    def _colorize(self, values, threshold):
+        """
+        Maps fill values through the palette, blending between colors or picking the nearest one.
+
+        Args:
+            values (numpy.ndarray): float32 values between 0 and 1.
+            threshold (numpy.ndarray): what is added to a value before it is rounded down to a palette index, from _threshold.
+
+        Returns:
+            numpy.ndarray: uint8 RGBA colors, one per value.
+        """
+
+        last = len(self._palette) - 1
+        position = values * np.float32(last)
+        if self._smooth and last:
+            low = np.minimum(position.astype(np.intp), last - 1)
+            blend = (position - low)[..., None]
+            table = self._table.astype(np.float32)
+            colors = table[low] + (table[low + 1] - table[low]) * blend
+            return (colors + 0.5).astype(np.uint8)
+        position += threshold
+        index = np.clip(position, 0, last, out = position).astype(np.intp)
+        return self._table.view(np.uint32).ravel()[index].view(np.uint8).reshape(index.shape + (4,))
+
+    def _threshold(self, xs, ys):
+        """
+        Gets what is added to values before they are rounded down to a palette index, one half to round to the nearest
+        color, spread by the ordered dither when dither is set.
+
+        Args:
+            xs (numpy.ndarray): x coordinates.
+            ys (numpy.ndarray): y coordinates, broadcast against xs.
+
+        Returns:
+            numpy.ndarray: the float32 thresholds, broadcast to the shape of xs and ys.
+        """
+
+        if not self._dither:
+            return np.float32(0.5)
+        return self.BAYER[ys.astype(np.intp) % 4, xs.astype(np.intp) % 4] + np.float32(0.5)
+
+    def _gradient(self, xs, ys):
+        """
+        Computes gradient values, the position along the line from start to end or the distance from start.
+
+        Args:
+            xs (numpy.ndarray): x coordinates.
+            ys (numpy.ndarray): y coordinates.
+
+        Returns:
+            numpy.ndarray: float32 values between 0 and 1.
+        """
+
+        start_x, start_y = self._start
+        dx, dy = self._end[0] - start_x, self._end[1] - start_y
+        length = max(dx * dx + dy * dy, 1e-12)
+        if self._radial:
+            values = np.sqrt(((xs - np.float32(start_x)) ** 2 + (ys - np.float32(start_y)) ** 2) / np.float32(length))
+        else:
+            values = ((xs - np.float32(start_x)) * np.float32(dx / length) + (ys - np.float32(start_y)) * np.float32(dy / length))
+        values = np.broadcast_to(values, np.broadcast_shapes(np.shape(xs), np.shape(ys))).astype(np.float32)
+        return np.clip(values, 0, 1, out = values)
+
+    def _value(self, xs, ys, seed):
+        """
+        Computes value noise, random lattice values blended with a smoothstep.
+
+        Args:
+            xs (numpy.ndarray): x coordinates in lattice units.
+            ys (numpy.ndarray): y coordinates in lattice units.
+            seed (int): the seed of this octave.
+
+        Returns:
+            numpy.ndarray: float32 values between 0 and 1.
+        """
+
+        cell_x, cell_y = np.floor(xs), np.floor(ys)
+        fx, fy = xs - cell_x, ys - cell_y
+        u, v = fx * fx * (3 - 2 * fx), fy * fy * (3 - 2 * fy)
+        (top,), (bottom,) = self._blend(lambda columns, rows: self._unit(self._hash(columns, rows, seed)), cell_x, cell_y,
+                                        lambda left, right: (left + u * (right - left),))
+        return top + v * (bottom - top)
+
+    def _perlin(self, xs, ys, seed):
+        """
+        Computes Perlin gradient noise, random gradients on the lattice blended with a quintic fade. The dot products
+        are split into a part along x and a part along y, so the blend along x runs once per lattice row of a rectangle.
+
+        Args:
+            xs (numpy.ndarray): x coordinates in lattice units.
+            ys (numpy.ndarray): y coordinates in lattice units.
+            seed (int): the seed of this octave.
+
+        Returns:
+            numpy.ndarray: float32 values between 0 and 1.
+        """
+
+        cell_x, cell_y = np.floor(xs), np.floor(ys)
+        fx, fy = xs - cell_x, ys - cell_y
+        u = fx * fx * fx * (fx * (fx * 6 - 15) + 10)
+        v = fy * fy * fy * (fy * (fy * 6 - 15) + 10)
+
+        def along(left, right):
+            along_x = left.real * fx
+            return along_x + u * (right.real * (fx - 1) - along_x), left.imag + u * (right.imag - left.imag)
+
+        (top_x, top_y), (bottom_x, bottom_y) = self._blend(lambda columns, rows: self._gradients(columns, rows, seed, 0.5 / np.sqrt(0.5)), cell_x, cell_y, along)
+        top = top_x + fy * top_y
+        bottom = bottom_x + (fy - 1) * bottom_y
+        bottom -= top
+        bottom *= v
+        bottom += top
+        bottom += np.float32(0.5)
+        return bottom
+
+    def _simplex(self, xs, ys, seed):
+        """
+        Computes 2D simplex noise, summing the falloff of the three corners of the skewed triangle holding each point.
+
+        Args:
+            xs (numpy.ndarray): x coordinates in lattice units.
+            ys (numpy.ndarray): y coordinates in lattice units.
+            seed (int): the seed of this octave.
+
+        Returns:
+            numpy.ndarray: float32 values between 0 and 1.
+        """
+
+        skew, unskew = np.float32((np.sqrt(3) - 1) / 2), np.float32((3 - np.sqrt(3)) / 6)
+        xs, ys = np.broadcast_arrays(xs, ys)
+        offset = (xs + ys) * skew
+        i, j = np.floor(xs + offset), np.floor(ys + offset)
+        back = (i + j) * unskew
+        x0, y0 = xs - i + back, ys - j + back
+        upper = x0 > y0
+        step_x = upper.astype(np.float32)
+        i0, j0 = int(i.min()), int(j.min())
+        width, height = int(i.max()) - i0 + 2, int(j.max()) - j0 + 2
+        if width * height <= xs.size:
+            table = self._gradients(np.arange(i0, i0 + width)[None, :], np.arange(j0, j0 + height)[:, None], seed, 35).ravel()
+            base = ((j - j0) * width + (i - i0)).astype(np.intp)
+            corners = (table[base], table[base + width - upper * (width - 1)], table[base + width + 1])
+        else:
+            i, j = i.astype(np.int64), j.astype(np.int64)
+            corners = (self._gradients(i, j, seed, 35), self._gradients(i + upper, j + ~upper, seed, 35), self._gradients(i + 1, j + 1, seed, 35))
+        total = np.full(xs.shape, 0.5, dtype = np.float32)
+        for gradient, cx, cy in zip(corners, (x0, x0 - step_x + unskew, x0 - 1 + 2 * unskew), (y0, y0 + step_x - 1 + unskew, y0 - 1 + 2 * unskew)):
+            falloff = np.float32(0.5) - cx * cx
+            falloff -= cy * cy
+            np.maximum(falloff, 0, out = falloff)
+            falloff *= falloff
+            falloff *= falloff
+            falloff *= gradient.real * cx + gradient.imag * cy
+            total += falloff
+        return total
+
+    def _gradients(self, columns, rows, seed, length):
+        """
+        Gets the random gradients of lattice points as complex numbers, x in the real part and y in the imaginary part.
+
+        Args:
+            columns (numpy.ndarray): lattice columns.
+            rows (numpy.ndarray): lattice rows, broadcast against columns.
+            seed (int): the seed of this octave.
+            length (float): the length of every gradient.
+
+        Returns:
+            numpy.ndarray: the complex64 gradients.
+        """
+
+        angles = self._unit(self._hash(columns, rows, seed)) * np.float32(2 * np.pi)
+        gradients = np.empty(angles.shape, dtype = np.complex64)
+        gradients.real = np.cos(angles) * np.float32(length)
+        gradients.imag = np.sin(angles) * np.float32(length)
+        return gradients
+
+    @staticmethod
+    def _blend(lattice, cell_x, cell_y, along):
+        """
+        A static method that runs the blend along x between the left and right lattice values of every point, then hands
+        back its results for the lattice rows above and below. For a rectangle, a row of columns and a column of rows,
+        the lattice is built once, the blend runs once per lattice row and is spread over the pixel rows by copying whole
+        rows. Single points hash their own corners, so scattered points never build a lattice larger than they are.
+
+        Args:
+            lattice (callable): gets the values of lattice points from their columns and rows.
+            cell_x (numpy.ndarray): the lattice column of every point.
+            cell_y (numpy.ndarray): the lattice row of every point.
+            along (callable): blends the left and right values and returns a tuple of arrays.
+
+        Returns:
+            tuple: the tuples of along above and below every point.
+        """
+
+        if cell_x.ndim == 2 and cell_x.shape[0] == 1 and cell_y.ndim == 2 and cell_y.shape[1] == 1:
+            x0, y0 = int(cell_x.min()), int(cell_y.min())
+            table = lattice(np.arange(x0, int(cell_x.max()) + 2)[None, :], np.arange(y0, int(cell_y.max()) + 2)[:, None])
+            column, row = (cell_x[0] - x0).astype(np.intp), (cell_y[:, 0] - y0).astype(np.intp)
+            rows = along(table[:, column], table[:, column + 1])
+            return tuple(blended[row] for blended in rows), tuple(blended[row + 1] for blended in rows)
+        column, row = cell_x.astype(np.int64), cell_y.astype(np.int64)
+        return along(lattice(column, row), lattice(column + 1, row)), along(lattice(column, row + 1), lattice(column + 1, row + 1))
+
+    @staticmethod
+    def _hash(columns, rows, seed):
+        """
+        A static method that hashes integer lattice points and a seed into well mixed 64 bit values.
+
+        Args:
+            columns (numpy.ndarray): lattice columns.
+            rows (numpy.ndarray): lattice rows, broadcast against columns.
+            seed (int): the seed.
+
+        Returns:
+            numpy.ndarray: the uint64 hashes.
+        """
+
+        with np.errstate(over = "ignore"):
+            hashed = (columns.astype(np.int64).astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) ^ (rows.astype(np.int64).astype(np.uint64) * np.uint64(0xC2B2AE3D27D4EB4F))
+            hashed ^= np.uint64((seed * 0x165667B19E3779F9) & 0xFFFFFFFFFFFFFFFF)
+            hashed ^= hashed >> np.uint64(33)
+            hashed *= np.uint64(0xFF51AFD7ED558CCD)
+            hashed ^= hashed >> np.uint64(33)
+            hashed *= np.uint64(0xC4CEB9FE1A85EC53)
+            hashed ^= hashed >> np.uint64(33)
+        return hashed
+
+    @staticmethod
+    def _unit(hashed):
+        """
+        A static method that turns hashes into float32 values between 0 and 1.
+
+        Args:
+            hashed (numpy.ndarray): uint64 hashes.
+
+        Returns:
+            numpy.ndarray: the float32 values.
+        """
+
+        return (hashed >> np.uint64(40)).astype(np.float32) * np.float32(1 / (1 << 24))
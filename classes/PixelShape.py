@@ -1,4 +1,8 @@
-import random
+import numpy as np
+from classes import config
+from .CoordSpill import CoordSpill
+from .CoordView import CoordView
+from .Instrumentation import Instrumentation
 from .TileGenerator import TileGenerator
 class PixelShape:
     """
@@ -6,11 +10,13 @@ class PixelShape:
 
     Attributes:
         tile_generator (TileGenerator): The TileGenerator instance to draw the shape on.
-        coords (list of tuples): Coordinates of the shape.
+        coords (CoordView): Coordinates of the shape, stored packed and read as (x, y) tuples.
         color (tuple): The color of the shape.
         rounded_edges(bool): not currently utilized, but one determine if the shape is rounded in the future.
     """
 
+    __slots__ = ("_tile_generator", "_coords", "_color", "_rounded_edges", "_base_coords", "_repeats", "_cuts", "_drawn", "_radius", "_bounds")
+
     def __init__(self, tile_generator, coords, color, rounded_edges = False):
         """
         Initializes a new PixelShape object.
@@ -18,14 +24,22 @@ class PixelShape:
         Args:
             tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
             coords (list of tuples): Coordinates of the shape.
-            color (tuple): The color of the shape.
+            color (tuple): The color of the shape, or a NoiseFill.
             rounded_edges(bool): not currently utilized, but one determine if the shape is rounded in the future.
         """
 
         self._tile_generator = tile_generator if isinstance(tile_generator, TileGenerator) else None
-        self._coords = coords if isinstance(coords, list) else []
-        self._color = color if TileGenerator.validateRGBA(color) else None
+        self._coords = self.packCoords(coords)
+        self._color = color if TileGenerator.validateColor(color) else None
         self._rounded_edges = rounded_edges if isinstance(rounded_edges, bool) else False
+        self._base_coords = None
+        self._repeats = []
+        self._cuts = []
+        self._drawn = False
+        self._radius = 2
+        self._bounds = None
+        if self._tile_generator is not None:
+            self._tile_generator.addShape(self)
 
     def __str__(self):
         """
@@ -35,7 +49,109 @@ class PixelShape:
             str: A description of the Pixelshape object.
         """
 
-        return f"A custom pixel shape on {self._tile_generator} at {self._coords} coordinates in {self._color} color. Rounded edges is {self._rounded_edges}"
+        return f"A custom pixel shape on {self._tile_generator} at {self.coords} coordinates in {self._color} color. Rounded edges is {self._rounded_edges}"
+
+    @classmethod
+    def fromSpec(cls, tile_generator, spec, draw = False):
+        """
+        Creates a PixelShape on tile_generator from a dictionary holding the same fields the create prompts ask for,
+        as used by render manifests. If the dictionary has a repeat entry the repetition is applied, the shape is only
+        drawn when draw is True and the spec does not say it was left undrawn.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            spec (dict): coords, color, optionally rounded_edges, radius, drawn and a repeat dictionary of count_x, count_y,
+                spacing, starting, random_cut, cut_chance, cut_color and seed. A primitive and its params instead of coords
+                make a PrimitiveShape. A missing drawn means drawn and a missing radius means 2.
+            draw (bool): whether the shape is drawn as the spec says, at its radius.
+
+        Returns:
+            PixelShape: the new PixelShape object.
+        """
+
+        if "primitive" in spec:
+            from .PrimitiveShape import PrimitiveShape
+            shape = PrimitiveShape(tile_generator, spec["primitive"], spec.get("params") or {}, TileGenerator.toColor(spec.get("color")))
+        elif "coords" not in spec or TileGenerator.toColor(spec.get("color")) is None:
+            raise ValueError(f"a shape needs coords and a color, got {spec}")
+        else:
+            shape = cls(tile_generator, [tuple(coord) for coord in spec["coords"]], TileGenerator.toColor(spec["color"]), spec.get("rounded_edges", False))
+        shape._applySpec(spec, draw)
+        return shape
+
+    def toSpec(self):
+        """
+        Describes the PixelShape as a dictionary that fromSpec can rebuild it from, the coords are the ones
+        from before any repetition so the repeat entries can be replayed.
+
+        Returns:
+            dict: coords, color, rounded_edges, the radius and whether it was drawn, and a list of repeat dictionaries.
+        """
+
+        coords = self._coords if self._base_coords is None else self._base_coords
+        return {"coords": np.asarray(coords, dtype = np.int64).reshape(-1, 2).tolist(),
+                "color": TileGenerator.colorToSpec(self._color),
+                "rounded_edges": self._rounded_edges,
+                "radius": self._radius,
+                "drawn": self._drawn,
+                "repeat": [dict(repeat) for repeat in self._repeats]}
+
+    def getState(self):
+        """
+        Gets everything needed to restore the PixelShape exactly without replaying its repeats, as used by Session.
+
+        Returns:
+            tuple: a dictionary of the shape fields and a dictionary of its coord arrays, coords, base_coords (or None) and cuts.
+        """
+
+        fields = {"color": TileGenerator.colorToSpec(self._color), "rounded_edges": self._rounded_edges,
+                  "repeats": [dict(repeat) for repeat in self._repeats], "drawn": self._drawn, "radius": self._radius,
+                  "cut_colors": [TileGenerator.colorToSpec(color) for _, color in self._cuts]}
+        arrays = {"coords": self._coords, "base_coords": self._base_coords, "cuts": [coords for coords, _ in self._cuts]}
+        return fields, arrays
+
+    @classmethod
+    def fromState(cls, tile_generator, fields, arrays):
+        """
+        Restores a PixelShape from getState onto tile_generator, after the shapes already on it, without drawing anything.
+        The coord arrays are used as they are, so copy on write memory maps are only read when first used.
+
+        Args:
+            tile_generator (TileGenerator): the TileGenerator the shape was on, or None.
+            fields (dict): the shape fields made by getState.
+            arrays (dict): the coords, base_coords and cuts arrays made by getState.
+
+        Returns:
+            PixelShape: the restored PixelShape object.
+        """
+
+        if "primitive" in fields and cls is PixelShape:
+            from .PrimitiveShape import PrimitiveShape
+            return PrimitiveShape.fromState(tile_generator, fields, arrays)
+        shape = cls.__new__(cls)
+        shape._tile_generator = tile_generator
+        shape._coords = arrays["coords"]
+        shape._color = TileGenerator.toColor(fields["color"])
+        shape._rounded_edges = fields["rounded_edges"]
+        shape._base_coords = arrays["base_coords"]
+        shape._repeats = [dict(repeat) for repeat in fields["repeats"]]
+        shape._cuts = [(coords, TileGenerator.toColor(color)) for coords, color in zip(arrays["cuts"], fields["cut_colors"])]
+        shape._drawn = fields["drawn"]
+        shape._radius = fields["radius"]
+        shape._bounds = None
+        if tile_generator is not None:
+            tile_generator.addShape(shape)
+        return shape
+
+    def hasRandomCut(self):
+        """
+        Checks if drawing the shape involves a random cut.
+
+        Returns:
+            bool: True if any repetition of the shape was randomly cut, False otherwise.
+        """
+
+        return any(repeat["random_cut"] for repeat in self._repeats)
 
     @property
     def tile_generator(self):
@@ -58,7 +174,10 @@ class PixelShape:
         """
 
         if isinstance(tile_generator, TileGenerator):
+            if self._tile_generator is not None:
+                self._tile_generator.removeShape(self)
             self._tile_generator = tile_generator
+            self._tile_generator.addShape(self)
         else:
             print("Must use a valid TileGenerator object.\n")
 
@@ -68,10 +187,10 @@ class PixelShape:
         Gets the current coords of the PixelShape object.
 
         Returns:
-            list of tuples: The current coords of PixelShape object.
+            CoordView: A read only sequence of the (x, y) tuples of the PixelShape object.
         """
 
-        return self._coords
+        return CoordView(self._coords)
 
     @coords.setter
     def coords(self, coords):
@@ -79,10 +198,14 @@ class PixelShape:
         Sets new coords for the PixelShape object.
 
         Args:
-            coords(list of tuples): new coords to replace the old coords of PixelShape object.
+            coords(list of tuples): new coords to replace the old coords of PixelShape object, an (n, 2) array or CoordView is also accepted.
         """
 
-        self._coords = coords if isinstance(coords, list) else []
+        self._coords = self.packCoords(coords)
+        self._base_coords = None
+        self._repeats = []
+        self._cuts = []
+        self._moved()
 
     @property
     def color(self):
@@ -104,7 +227,7 @@ class PixelShape:
             color(tuple): new color to replace the old color of the PixelShape object.
         """
 
-        self._color = color if self._tile_generator.validateRGBA(color) else None
+        self._color = color if self._tile_generator.validateColor(color) else None
 
     @property
     def rounded_edges(self):
@@ -127,7 +250,9 @@ class PixelShape:
         """
 
         self._rounded_edges = rounded_edges if isinstance(rounded_edges, bool) else False
+        self._moved()
 
+    @Instrumentation.track("PixelShape.draw")
     def draw(self, radius = 2):
         """
         Draws the shape onto the TileGenerator, if rounded edges is flagged radius will be used.
@@ -136,16 +261,218 @@ class PixelShape:
             radius(int): the radius of the ellipse if rounded edges is flagged.
         """
 
-        for coord in self.coords:
-            x, y = coord
-            if self.rounded_edges:
-                self.tile_generator._draw.ellipse([x - radius, y - radius , x + radius, y + radius], fill = self.color)
-            else:
-                self.tile_generator._img.putpixel((x, y), self.color)
+        self._drawn = True
+        self._radius = radius
+        self._moved()
+        if Instrumentation.enabled:
+            Instrumentation.count("PixelShape.draw", pixels = len(self._coords) * ((2 * radius + 1) ** 2 if self.rounded_edges else 1))
+        if self.rounded_edges:
+            self.tile_generator.drawEllipses(self._coords, radius, self.color)
+        else:
+            self.tile_generator.putPixels(self._coords, self.color)
+
+    def edit(self, coords = None, color = None):
+        """
+        Changes the coords and/or color of a shape already on its TileGenerator and redraws only the rectangle covering
+        the old and new shape, from the background and every shape layered there, in the order they were added.
+        Only changing the color of a shape on an indexed tile, when no other shape shares that color, just changes the palette.
+
+        Args:
+            coords(list of tuples): new coords for the shape, or None to keep them.
+            color(tuple): new color for the shape, or None to keep it.
+        """
+
+        if coords is None and color is not None and self.tile_generator.recolorSlot(self._color, color, self):
+            self.color = color
+            return
+        old_bounds = self.getBounds()
+        if coords is not None:
+            self.coords = coords
+        if color is not None:
+            self.color = color
+        self.tile_generator.redrawRegion(TileGenerator.unionBox(old_bounds, self.getBounds()))
+
+    def erase(self):
+        """
+        Takes the shape off its TileGenerator and repaints only the pixels it covered from the background and the shapes
+        still there, the spatial index keeps the repaint to the shapes near it.
+        """
+
+        bounds = self.getBounds()
+        tile_generator = self._tile_generator
+        if tile_generator is not None:
+            tile_generator.removeShape(self)
+            self._tile_generator = None
+            tile_generator.redrawRegion(bounds)
+        self._drawn = False
+        self._bounds = None
+
+    def paints(self, x, y):
+        """
+        Checks if the shape paints a pixel, through its repeat cuts or, once drawn, its coords. A rounded shape counts
+        the square of radius around each coordinate.
+
+        Args:
+            x(int): the x of the pixel.
+            y(int): the y of the pixel.
+
+        Returns:
+            bool: True if the pixel is painted by the shape.
+        """
 
-    def repeat(self, count_x = 5, count_y = 5, spacing = (4, 4), start_pixel = (0, 0), randomize = False, cut_chance = 0.5, cut_color = None):
+        groups = [coords for coords, _ in self._cuts]
+        if self._drawn:
+            groups.append(self._coords)
+        for coords in groups:
+            pad = self._radius if self._rounded_edges and coords is self._coords else 0
+            for chunk in self._chunks(coords):
+                xs, ys = self._wrap(chunk)
+                if np.any((np.abs(xs - x) <= pad) & (np.abs(ys - y) <= pad)):
+                    return True
+        return False
+
+    def getBounds(self):
+        """
+        Gets the bounding box of every pixel the shape has painted, its repeat cuts and, once drawn, its coords.
+
+        Returns:
+            tuple: (left, top, right, bottom) with right and bottom exclusive, or None if nothing was painted.
+        """
+
+        if self._bounds is None:
+            groups = [coords for coords, _ in self._cuts]
+            if self._drawn:
+                groups.append(self._coords)
+            boxes = []
+            for coords in groups:
+                pad = self._radius if self._rounded_edges and coords is self._coords else 0
+                for chunk in self._chunks(coords):
+                    xs, ys = self._wrap(chunk)
+                    if len(xs):
+                        boxes.append((int(xs.min()) - pad, int(ys.min()) - pad, int(xs.max()) + pad + 1, int(ys.max()) + pad + 1))
+            bounds = None
+            for box in boxes:
+                bounds = TileGenerator.unionBox(bounds, box)
+            self._bounds = bounds or ()
+        return self._bounds or None
+
+    def _paint(self, box):
+        """
+        Paints the shape again, cuts first and then its coords if it was drawn, clipped to a rectangle of its TileGenerator.
+
+        Args:
+            box(tuple): the (left, top, right, bottom) rectangle to paint inside, right and bottom exclusive.
+        """
+
+        left, top, right, bottom = box
+        for coords, color in self._cuts:
+            for chunk in self._chunks(coords):
+                xs, ys = self._wrap(chunk)
+                inside = (xs >= left) & (xs < right) & (ys >= top) & (ys < bottom)
+                self.tile_generator.putPixels(np.stack((xs[inside], ys[inside]), axis = 1), color or self.color)
+        if self._drawn:
+            for chunk in self._chunks(self._coords):
+                xs, ys = self._wrap(chunk)
+                if self.rounded_edges:
+                    radius = self._radius
+                    near = (xs + radius >= left) & (xs - radius < right) & (ys + radius >= top) & (ys - radius < bottom)
+                    self.tile_generator.drawEllipses(np.stack((xs[near], ys[near]), axis = 1), radius, self.color, box)
+                else:
+                    inside = (xs >= left) & (xs < right) & (ys >= top) & (ys < bottom)
+                    self.tile_generator.putPixels(np.stack((xs[inside], ys[inside]), axis = 1), self.color)
+
+    def _applySpec(self, spec, draw):
+        """
+        Applies the repeat entries of a spec to the shape and, when draw is True and the spec does not say it was left
+        undrawn, draws it at the radius of the spec.
+
+        Args:
+            spec(dict): a spec as made by toSpec.
+            draw(bool): whether the shape is drawn as the spec says.
+        """
+
+        repeats = spec.get("repeat") or []
+        for repeat in repeats if isinstance(repeats, list) else [repeats]:
+            repeat = dict(config.REPEAT_DEFAULTS, **repeat)
+            self.repeat(repeat["count_x"], repeat["count_y"], tuple(repeat["spacing"]), tuple(repeat["starting"]),
+                        repeat["random_cut"], repeat["cut_chance"], TileGenerator.toColor(repeat["cut_color"]), repeat["seed"])
+        if draw and spec.get("drawn", True):
+            self.draw(spec.get("radius", 2))
+
+    def _replay(self):
+        """
+        Paints the shape again on the fresh image of its TileGenerator the way fromSpec rebuilds it from toSpec, its
+        repeats run again from the coords it was made with, so the pixels match the spec the tile is cached and rendered by.
+        """
+
+        spec = self.toSpec()
+        self._reset()
+        self._applySpec(spec, True)
+
+    def _reset(self):
+        """
+        Forgets what the shape painted, its coords go back to the ones from before any repetition.
+        """
+
+        if self._base_coords is not None:
+            self._coords = self._base_coords
+        self._base_coords = None
+        self._repeats = []
+        self._cuts = []
+        self._drawn = False
+        self._moved()
+
+    def _moved(self):
+        """
+        Forgets the bounds of the shape and tells its TileGenerator's spatial index they changed.
+        """
+
+        self._bounds = None
+        if self._tile_generator is not None:
+            self._tile_generator.updateShape(self)
+
+    @staticmethod
+    def _chunks(coords):
+        """
+        A static method that splits coords into runs of at most config.REPEAT_CHUNK_SIZE, so coords spilled to disk are
+        only read a bounded run at a time.
+
+        Args:
+            coords(numpy.ndarray): the (n, 2) coords to split.
+
+        Returns:
+            list of numpy.ndarray: the runs in order, a single run when the coords are small.
+        """
+
+        if len(coords) <= config.REPEAT_CHUNK_SIZE:
+            return [coords]
+        return [coords[start:start + config.REPEAT_CHUNK_SIZE] for start in range(0, len(coords), config.REPEAT_CHUNK_SIZE)]
+
+    def _wrap(self, coords):
+        """
+        Turns coords into x and y arrays on the image, negative values wrap around the same way putpixel wraps them and
+        values that can not be on the image are dropped.
+
+        Args:
+            coords(list of tuples): the coords to convert, an (n, 2) array is also accepted.
+
+        Returns:
+            tuple: numpy arrays of the x and y coordinates.
+        """
+
+        img_width, img_height = self.tile_generator.getDimensions()
+        coords = np.asarray(coords, dtype = np.int64).reshape(-1, 2)
+        xs, ys = coords[:, 0], coords[:, 1]
+        if not self.rounded_edges:
+            valid = (xs >= -img_width) & (xs < img_width) & (ys >= -img_height) & (ys < img_height)
+            xs, ys = xs[valid] % max(img_width, 1), ys[valid] % max(img_height, 1)
+        return xs, ys
+
+    @Instrumentation.track("PixelShape.repeat")
+    def repeat(self, count_x = 5, count_y = 5, spacing = (4, 4), start_pixel = (0, 0), randomize = False, cut_chance = 0.5, cut_color = None, seed = None):
         """
         Repeats the pattern defined by the coordinates across the tile image, with options for spacing, randomization, and cutting.
+        The lattice is built with array operations in bounded chunks, so large counts never build per pixel tuples.
 
     Args:
         count_x (int): Number of times to repeat the pattern horizontally. Defaults to 5.
@@ -155,23 +482,112 @@ class PixelShape:
         randomize (bool): If True, applies a random cut to some pixels based on the cut_chance. Defaults to False.
         cut_chance (float): The probability of cutting a pixel when randomize is True. Should be between 0 and 1. Defaults to 0.5.
         cut_color (tuple): The color to use for pixels that are cut (randomized). If None, uses the background color. Defaults to None.
+        seed (int or numpy.random.Generator): Seed or Generator for the random cut, the same seed always gives the same cut. If None, the cut differs every run. Defaults to None.
         """
 
-        new_coords = []
-        img_width, img_height = self.tile_generator._img.size
+        if self._base_coords is None:
+            self._base_coords = self._coords
+        cuts_before = len(self._cuts)
+        self._repeats.append({"count_x": count_x, "count_y": count_y, "spacing": list(spacing), "starting": list(start_pixel),
+                              "random_cut": randomize, "cut_chance": cut_chance, "cut_color": TileGenerator.colorToSpec(cut_color),
+                              "seed": int(seed) if isinstance(seed, (int, np.integer)) else None})
+        img_width, img_height = self.tile_generator.getDimensions()
         start_x, start_y = start_pixel
-        for i in range(count_x):
-            for j in range(count_y):
-                for coord in self.coords:
-                    new_x = coord[0] + i * spacing[0]
-                    new_y = coord[1] + j * spacing[1]
-                    if new_x < img_width and new_y < img_height:
-                        if randomize and (new_x - start_x) % spacing [0] == 0 and (new_y - start_y) % spacing[1] == 0:
-                            if random.random() > cut_chance:
-                                self.tile_generator._img.putpixel((new_x, new_y), cut_color)
-                            else:
-                                self.tile_generator._img.putpixel((new_x, new_y), self.color)
-                        else:
-                            new_coords.append((new_x, new_y))
-        self.coords = new_coords
+        if cut_color is None:
+            cut_color = self.tile_generator.background_color or (0, 0, 0, 0)
+        rng = np.random.default_rng(seed) if randomize else None
+        base = np.asarray(self._coords, dtype = np.int64).reshape(-1, 2)
+        pairs = count_x * count_y
+        step = max(1, config.REPEAT_CHUNK_SIZE // max(1, len(base)))
+        new_coords = CoordSpill(self.tile_generator.large, config.SCRATCH_DIRECTORY)
+        cuts = CoordSpill(self.tile_generator.large, config.SCRATCH_DIRECTORY)
+        colors = []
+        for first in range(0, pairs if len(base) else 0, step):
+            xs, ys = self._buildLattice(base, count_y, spacing, first, min(first + step, pairs))
+            inside = (xs < img_width) & (ys < img_height)
+            xs, ys = xs[inside], ys[inside]
+            if randomize:
+                if 0 in spacing[:2] and len(xs):
+                    raise ZeroDivisionError("integer modulo by zero")
+                on_grid = ((xs - start_x) % spacing[0] == 0) & ((ys - start_y) % spacing[1] == 0)
+                for coords, color in self._paintCuts(xs[on_grid], ys[on_grid], rng.random(int(on_grid.sum())) > cut_chance, cut_color):
+                    cuts.add(coords)
+                    colors.append(color)
+                xs, ys = xs[~on_grid], ys[~on_grid]
+            new_coords.add(np.stack((xs, ys), axis = 1))
+        self._cuts.extend(zip(cuts.parts(), colors))
+        self._coords = new_coords.joined()
+        self._moved()
+        if Instrumentation.enabled:
+            Instrumentation.count("PixelShape.repeat", pixels = len(self._coords) + sum(len(coords) for coords, _ in self._cuts[cuts_before:]))
+
+    @staticmethod
+    def packCoords(coords):
+        """
+        A static method that packs coords into a compact (n, 2) buffer, int16 when every value fits and int32 otherwise.
+
+        Args:
+            coords(list of tuples): the coords to pack, an (n, 2) array or CoordView is also accepted, anything else gives no coords.
+
+        Returns:
+            numpy.ndarray: the packed coordinate buffer.
+        """
+
+        if isinstance(coords, CoordView):
+            coords = coords.buffer
+        if not isinstance(coords, (list, np.ndarray)) or len(coords) == 0:
+            return np.empty((0, 2), dtype = np.int16)
+        coords = np.asarray(coords, dtype = np.int64).reshape(-1, 2)
+        small = coords.min() >= np.iinfo(np.int16).min and coords.max() <= np.iinfo(np.int16).max
+        return coords.astype(np.int16 if small else np.int32)
+
+    @staticmethod
+    def _buildLattice(base, count_y, spacing, first, last):
+        """
+        Broadcasts the base coordinates against a run of repeat offsets, keeping the order of the original nested loops
+        (horizontal repeat, then vertical repeat, then coordinate).
+
+        Args:
+            base (numpy.ndarray): (n, 2) array of the coordinates being repeated.
+            count_y (int): Number of vertical repetitions, used to turn a flat offset index into (i, j).
+            spacing (tuple of int): The spacing between repeated patterns in the x and y directions.
+            first (int): The first flat offset index of the run.
+            last (int): One past the last flat offset index of the run.
+
+        Returns:
+            tuple: flat numpy arrays of the repeated x and y coordinates.
+        """
+
+        offsets = np.arange(first, last, dtype = np.int64)
+        i, j = np.divmod(offsets, count_y)
+        xs = base[None, :, 0] + (i * spacing[0])[:, None]
+        ys = base[None, :, 1] + (j * spacing[1])[:, None]
+        return xs.ravel(), ys.ravel()
+
+    def _paintCuts(self, xs, ys, cut, cut_color):
+        """
+        Paints the pixels that took part in a random cut, cut pixels use cut_color and the rest keep the shape color.
+        When a pixel is hit more than once the last hit wins, just like painting them one at a time.
+
+        Args:
+            xs (numpy.ndarray): x coordinates of the pixels in painting order.
+            ys (numpy.ndarray): y coordinates of the pixels in painting order.
+            cut (numpy.ndarray): boolean mask of the pixels that were cut.
+            cut_color (tuple): The color used for cut pixels.
+
+        Returns:
+            list of tuple: the (coords, color) of the cut pixels and of the rest, color None meaning the shape color.
+        """
 
+        if not len(xs):
+            return []
+        img_width, img_height = self.tile_generator.getDimensions()
+        if xs.min() < -img_width or ys.min() < -img_height:
+            raise IndexError("image index out of range")
+        linear = (ys % img_height) * img_width + (xs % img_width)
+        _, last = np.unique(linear[::-1], return_index = True)
+        last = len(linear) - 1 - last
+        xs, ys, cut = xs[last], ys[last], cut[last]
+        self.tile_generator.putPixels(np.stack((xs[cut], ys[cut]), axis = 1), cut_color)
+        self.tile_generator.putPixels(np.stack((xs[~cut], ys[~cut]), axis = 1), self.color)
+        return [(np.stack((xs[cut], ys[cut]), axis = 1), cut_color), (np.stack((xs[~cut], ys[~cut]), axis = 1), None)]
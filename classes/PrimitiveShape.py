@@ -0,0 +1,509 @@
+import numpy as np
+from PIL import Image, ImageDraw
+from classes import config
+from .CoordView import CoordView
+from .Instrumentation import Instrumentation
+from .PixelShape import PixelShape
+from .TileGenerator import TileGenerator
+class PrimitiveShape(PixelShape):
+    """
+    A PixelShape described by parameters instead of a coordinate list: a rect, ellipse, polygon, line or flood fill.
+    Until it is repeated only the parameters are kept, drawing rasterizes a boolean mask of the shape's bounding box and
+    writes it in bulk, so memory and draw time follow the area of the shape. Primitives are clipped to the tile instead
+    of wrapping around it.
+
+    Repeating a primitive turns its mask into coords once and repeats them like any other shape. A flood fill takes its
+    region from the pixels of the tile when it is first drawn, and keeps that region from then on.
+
+    Masks only cover the part of the shape on the tile, and one up to config.PRIMITIVE_MASK_CACHE_BYTES is kept until
+    the shape is drawn, repeated or reset again.
+
+    Attributes:
+        kind (str): The kind of primitive, one of KINDS.
+        params (dict): The parameters of the primitive, box, points, filled, width, seed and bounds depending on the kind.
+    """
+
+    __slots__ = ("_kind", "_params", "_mask_cache")
+
+    KINDS = ("rect", "ellipse", "polygon", "line", "fill")
+
+    def __init__(self, tile_generator, kind, params, color = None):
+        """
+        Initializes a new PrimitiveShape object, the shape is not drawn.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            kind (str): The kind of primitive, one of KINDS.
+            params (dict): The parameters of the primitive, see the classmethods that make each kind.
+            color (tuple): The color of the shape, a line without one uses the line color of the TileGenerator.
+        """
+
+        if kind not in self.KINDS:
+            raise ValueError(f"{kind} is not a primitive, choose from {', '.join(self.KINDS)}")
+        if not TileGenerator.validateColor(color) and kind == "line" and isinstance(tile_generator, TileGenerator):
+            color = tile_generator.line_color
+        if not TileGenerator.validateColor(color):
+            raise ValueError(f"a {kind} needs a color, got {color}")
+        self._kind = kind
+        self._params = {name: list(value) if isinstance(value, tuple) else value for name, value in params.items()}
+        self._mask_cache = None
+        super().__init__(tile_generator, [], color)
+
+    @classmethod
+    def rect(cls, tile_generator, box, color, filled = True, width = 1):
+        """
+        Creates a rectangle.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            box (tuple): the (left, top, right, bottom) of the rectangle, right and bottom exclusive.
+            color (tuple): The color of the shape.
+            filled (bool): whether the inside is filled, otherwise only the outline is drawn.
+            width (int): the width of the outline.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        return cls(tile_generator, "rect", {"box": list(box), "filled": filled, "width": width}, color)
+
+    @classmethod
+    def ellipse(cls, tile_generator, box, color, filled = True, width = 1):
+        """
+        Creates an ellipse filling a bounding box.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            box (tuple): the (left, top, right, bottom) of the bounding box, right and bottom exclusive.
+            color (tuple): The color of the shape.
+            filled (bool): whether the inside is filled, otherwise only the outline is drawn.
+            width (int): the width of the outline.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        return cls(tile_generator, "ellipse", {"box": list(box), "filled": filled, "width": width}, color)
+
+    @classmethod
+    def circle(cls, tile_generator, center, radius, color, filled = True, width = 1):
+        """
+        Creates a circle, an ellipse in the square around center.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            center (tuple): the (x, y) center pixel.
+            radius (int): the radius in pixels.
+            color (tuple): The color of the shape.
+            filled (bool): whether the inside is filled, otherwise only the outline is drawn.
+            width (int): the width of the outline.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        x, y = center
+        return cls.ellipse(tile_generator, (x - radius, y - radius, x + radius + 1, y + radius + 1), color, filled, width)
+
+    @classmethod
+    def polygon(cls, tile_generator, points, color, filled = True, width = 1):
+        """
+        Creates a polygon.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            points (list of tuples): the (x, y) corners in order.
+            color (tuple): The color of the shape.
+            filled (bool): whether the inside is filled, otherwise only the outline is drawn.
+            width (int): the width of the outline.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        return cls(tile_generator, "polygon", {"points": [list(point) for point in points], "filled": filled, "width": width}, color)
+
+    @classmethod
+    def line(cls, tile_generator, points, color = None, width = 1):
+        """
+        Creates a line through a run of points.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            points (list of tuples): the (x, y) points the line joins in order.
+            color (tuple): The color of the line, if None the line color of the TileGenerator is used.
+            width (int): the width of the line.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        return cls(tile_generator, "line", {"points": [list(point) for point in points], "width": width}, color)
+
+    @classmethod
+    def floodFill(cls, tile_generator, seed, color, bounds = None):
+        """
+        Creates a flood fill of the 4 connected pixels sharing the color of the seed pixel.
+
+        Args:
+            tile_generator (TileGenerator): The TileGenerator object to draw the shape on.
+            seed (tuple): the (x, y) pixel the fill starts from.
+            color (tuple): The color of the shape.
+            bounds (tuple): the (left, top, right, bottom) rectangle the fill can not leave, None is the whole tile.
+
+        Returns:
+            PrimitiveShape: the new shape.
+        """
+
+        return cls(tile_generator, "fill", {"seed": list(seed), "bounds": list(bounds) if bounds else None}, color)
+
+    @property
+    def kind(self):
+        """
+        Gets the kind of the PrimitiveShape.
+
+        Returns:
+            str: The kind, one of KINDS, or None once coords have been set by hand.
+        """
+
+        return self._kind
+
+    @property
+    def params(self):
+        """
+        Gets the parameters of the PrimitiveShape.
+
+        Returns:
+            dict: A copy of the parameters.
+        """
+
+        return dict(self._params)
+
+    @property
+    def coords(self):
+        """
+        Gets the coords the primitive covers, rasterized when asked for while it is not repeated.
+
+        Returns:
+            CoordView: A read only sequence of the (x, y) tuples of the shape.
+        """
+
+        if self._isParametric():
+            return CoordView(self.packCoords(self._raster()))
+        return PixelShape.coords.fget(self)
+
+    @coords.setter
+    def coords(self, coords):
+        """
+        Sets new coords for the shape, it stops being a primitive and becomes a plain coordinate shape.
+
+        Args:
+            coords(list of tuples): new coords to replace the primitive, an (n, 2) array or CoordView is also accepted.
+        """
+
+        self._kind = None
+        PixelShape.coords.fset(self, coords)
+
+    def toSpec(self):
+        """
+        Describes the PrimitiveShape as a dictionary that PixelShape.fromSpec can rebuild it from.
+
+        Returns:
+            dict: primitive, params, color, the radius and whether it was drawn, and a list of repeat dictionaries,
+                or the coords once set by hand.
+        """
+
+        if self._kind is None:
+            return super().toSpec()
+        return {"primitive": self._kind, "params": dict(self._params),
+                "color": TileGenerator.colorToSpec(self._color),
+                "radius": self._radius,
+                "drawn": self._drawn,
+                "repeat": [dict(repeat) for repeat in self._repeats]}
+
+    def getState(self):
+        """
+        Gets everything needed to restore the PrimitiveShape exactly, as used by Session.
+
+        Returns:
+            tuple: a dictionary of the shape fields and a dictionary of its coord arrays.
+        """
+
+        fields, arrays = super().getState()
+        if self._kind is not None:
+            fields["primitive"] = self._kind
+            fields["params"] = dict(self._params)
+        return fields, arrays
+
+    @classmethod
+    def fromState(cls, tile_generator, fields, arrays):
+        """
+        Restores a PrimitiveShape from getState onto tile_generator without drawing anything.
+
+        Args:
+            tile_generator (TileGenerator): the TileGenerator the shape was on, or None.
+            fields (dict): the shape fields made by getState.
+            arrays (dict): the coords, base_coords and cuts arrays made by getState.
+
+        Returns:
+            PrimitiveShape: the restored shape.
+        """
+
+        shape = super().fromState(tile_generator, fields, arrays)
+        shape._kind = fields.get("primitive")
+        shape._params = dict(fields.get("params") or {})
+        shape._mask_cache = None
+        return shape
+
+    @Instrumentation.track("PixelShape.draw")
+    def draw(self, radius = 2):
+        """
+        Draws the shape onto the TileGenerator, a primitive is written in bulk from its mask.
+
+        Args:
+            radius(int): the radius of the ellipse if rounded edges is flagged, only used once the shape is repeated.
+        """
+
+        if not self._isParametric():
+            PixelShape.draw.__wrapped__(self, radius)
+            return
+        self._drawn = True
+        self._radius = radius
+        self._moved()
+        left, top, mask = self._mask()
+        if Instrumentation.enabled:
+            Instrumentation.count("PixelShape.draw", pixels = int(mask.sum()))
+        self.tile_generator.fillMask(left, top, mask, self.color)
+
+    def getBounds(self):
+        """
+        Gets the bounding box of every pixel the shape has painted.
+
+        Returns:
+            tuple: (left, top, right, bottom) with right and bottom exclusive, or None if nothing was painted.
+        """
+
+        if not self._isParametric():
+            return super().getBounds()
+        if self._bounds is None:
+            left, top, mask = self._mask() if self._drawn else (0, 0, np.zeros((0, 0), dtype = bool))
+            rows, columns = np.flatnonzero(mask.any(axis = 1)), np.flatnonzero(mask.any(axis = 0))
+            self._bounds = (left + int(columns[0]), top + int(rows[0]), left + int(columns[-1]) + 1, top + int(rows[-1]) + 1) if len(rows) else ()
+        return self._bounds or None
+
+    def paints(self, x, y):
+        """
+        Checks if the shape paints a pixel, a primitive looks it up in its mask.
+
+        Args:
+            x(int): the x of the pixel.
+            y(int): the y of the pixel.
+
+        Returns:
+            bool: True if the pixel is painted by the shape.
+        """
+
+        if not self._isParametric():
+            return super().paints(x, y)
+        if not self._drawn:
+            return False
+        left, top, mask = self._mask()
+        return 0 <= y - top < mask.shape[0] and 0 <= x - left < mask.shape[1] and bool(mask[y - top, x - left])
+
+    def repeat(self, count_x = 5, count_y = 5, spacing = (4, 4), start_pixel = (0, 0), randomize = False, cut_chance = 0.5, cut_color = None, seed = None):
+        """
+        Repeats the primitive across the tile image, its mask is turned into coords first and repeated like any other shape.
+
+    Args:
+        count_x (int): Number of times to repeat the pattern horizontally. Defaults to 5.
+        count_y (int): Number of times to repeat the pattern vertically. Defaults to 5.
+        spacing (tuple of int): The spacing between repeated patterns in the x and y directions. Defaults to (4, 4).
+        start_pixel (tuple of int): The starting coordinates for the repetition. Defaults to (0, 0).
+        randomize (bool): If True, applies a random cut to some pixels based on the cut_chance. Defaults to False.
+        cut_chance (float): The probability of cutting a pixel when randomize is True. Should be between 0 and 1. Defaults to 0.5.
+        cut_color (tuple): The color to use for pixels that are cut (randomized). If None, uses the background color. Defaults to None.
+        seed (int or numpy.random.Generator): Seed or Generator for the random cut, the same seed always gives the same cut. If None, the cut differs every run. Defaults to None.
+        """
+
+        if self._isParametric():
+            self._coords = self.packCoords(self._raster())
+        super().repeat(count_x, count_y, spacing, start_pixel, randomize, cut_chance, cut_color, seed)
+
+    def _paint(self, box):
+        """
+        Paints the shape again clipped to a rectangle of its TileGenerator, a primitive straight from its mask.
+
+        Args:
+            box(tuple): the (left, top, right, bottom) rectangle to paint inside, right and bottom exclusive.
+        """
+
+        if not self._isParametric():
+            super()._paint(box)
+        elif self._drawn:
+            left, top, mask = self._mask()
+            self.tile_generator.fillMask(left, top, mask, self.color, box)
+
+    def _reset(self):
+        """
+        Forgets what the shape painted, a primitive goes back to its parameters and a flood fill takes its region from
+        the tile again the next time it is drawn or repeated.
+        """
+
+        super()._reset()
+        if self._kind is not None:
+            self._coords = self.packCoords([])
+
+    def _moved(self):
+        """
+        Forgets the bounds and the cached mask of the shape and tells its TileGenerator's spatial index they changed.
+        """
+
+        self._mask_cache = None
+        super()._moved()
+
+    def _isParametric(self):
+        """
+        Checks if the shape is still kept as parameters, it stops being once repeated or given coords by hand.
+
+        Returns:
+            bool: True while the shape is drawn from its mask.
+        """
+
+        return self._kind is not None and not self._repeats
+
+    def _raster(self):
+        """
+        Turns the mask into the coords it covers, a flood fill takes its region from the tile the first time and keeps it.
+
+        Returns:
+            numpy.ndarray: the (n, 2) coords.
+        """
+
+        if self._kind == "fill" and len(self._coords) == 0:
+            self._coords = self.packCoords(self._fillRegion())
+        if self._kind == "fill":
+            return np.asarray(self._coords)
+        left, top, mask = self._mask()
+        ys, xs = np.nonzero(mask)
+        return np.stack((xs + left, ys + top), axis = 1)
+
+    def _mask(self):
+        """
+        Rasterizes the primitive into a boolean mask of its bounding box clipped to the tile, the mask is only ever as
+        big as the part of the shape on the tile. A small enough mask is kept until the shape moves or the tile is resized.
+
+        Returns:
+            tuple: the left and top of the mask on the tile and the (height, width) boolean mask.
+        """
+
+        size = self.tile_generator.getDimensions()
+        if self._mask_cache is not None and self._mask_cache[0] == size:
+            return self._mask_cache[1]
+        mask = self._rasterMask(*size)
+        if mask[2].nbytes <= config.PRIMITIVE_MASK_CACHE_BYTES:
+            self._mask_cache = (size, mask)
+        return mask
+
+    def _rasterMask(self, width, height):
+        """
+        Rasterizes the primitive into a boolean mask of its bounding box clipped to a tile of width by height. Rects are
+        built from their edges and the other kinds are drawn into an image of the clipped box, offset by its corner. The
+        image reaches 2 pixels past a clipped side, PIL rounds spans that start just off the image onto its first pixel.
+
+        Args:
+            width(int): the width of the tile.
+            height(int): the height of the tile.
+
+        Returns:
+            tuple: the left and top of the mask on the tile and the (height, width) boolean mask.
+        """
+
+        params = self._params
+        line_width = max(1, int(params.get("width", 1)))
+        if self._kind == "fill":
+            coords = self._raster()
+            if not len(coords):
+                return 0, 0, np.zeros((0, 0), dtype = bool)
+            left, top = coords.min(axis = 0).tolist()
+            right, bottom = (coords.max(axis = 0) + 1).tolist()
+            mask = np.zeros((bottom - top, right - left), dtype = bool)
+            mask[coords[:, 1] - top, coords[:, 0] - left] = True
+            return left, top, mask
+        if self._kind in ("rect", "ellipse"):
+            left, top, right, bottom = params["box"]
+        else:
+            points = np.asarray(params["points"], dtype = np.int64).reshape(-1, 2)
+            pad = line_width if self._kind == "polygon" else line_width // 2 + 1
+            left, top = (points.min(axis = 0) - pad).tolist() if len(points) else (0, 0)
+            right, bottom = (points.max(axis = 0) + pad + 1).tolist() if len(points) else (0, 0)
+        clip_left, clip_top = max(left, 0), max(top, 0)
+        clip_right, clip_bottom = min(right, width), min(bottom, height)
+        if clip_left >= clip_right or clip_top >= clip_bottom:
+            return 0, 0, np.zeros((0, 0), dtype = bool)
+        if self._kind == "rect":
+            if params.get("filled", True):
+                mask = np.ones((clip_bottom - clip_top, clip_right - clip_left), dtype = bool)
+            else:
+                xs, ys = np.arange(clip_left, clip_right), np.arange(clip_top, clip_bottom)
+                columns = (xs < left + line_width) | (xs >= right - line_width)
+                rows = (ys < top + line_width) | (ys >= bottom - line_width)
+                mask = rows[:, None] | columns[None, :]
+            return clip_left, clip_top, mask
+        origin_x, origin_y = max(left, clip_left - 2), max(top, clip_top - 2)
+        img = Image.new("L", (clip_right - origin_x, clip_bottom - origin_y), 0)
+        draw = ImageDraw.Draw(img)
+        fill = 255 if params.get("filled", True) else None
+        if self._kind == "ellipse":
+            draw.ellipse((left - origin_x, top - origin_y, right - 1 - origin_x, bottom - 1 - origin_y), fill = fill, outline = 255, width = line_width)
+        elif self._kind == "polygon":
+            draw.polygon([(x - origin_x, y - origin_y) for x, y in points.tolist()], fill = fill, outline = 255, width = line_width)
+        else:
+            draw.line([(x - origin_x, y - origin_y) for x, y in points.tolist()], fill = 255, width = line_width)
+        return clip_left, clip_top, np.asarray(img)[clip_top - origin_y:, clip_left - origin_x:] > 0
+
+    def _fillRegion(self):
+        """
+        Finds the 4 connected pixels sharing the seed pixel's color inside the bounds, run by run: every row is split into
+        runs of matching pixels once and the fill walks from run to touching run in the rows above and below.
+
+        Returns:
+            numpy.ndarray: the (n, 2) coords of the region.
+        """
+
+        width, height = self.tile_generator.getDimensions()
+        left, top, right, bottom = self._params.get("bounds") or (0, 0, width, height)
+        left, top, right, bottom = max(left, 0), max(top, 0), min(right, width), min(bottom, height)
+        seed_x, seed_y = self._params["seed"]
+        if not (left <= seed_x < right and top <= seed_y < bottom):
+            return np.empty((0, 2), dtype = np.int64)
+        tile_generator = self.tile_generator
+        pixels = tile_generator._canvas.pixels if tile_generator._canvas is not None else np.asarray(tile_generator.getImage())
+        region = pixels[top:bottom, left:right].reshape(bottom - top, right - left, -1)
+        match = np.ones(region.shape[:2], dtype = bool)
+        for band, value in enumerate(region[seed_y - top, seed_x - left]):
+            match &= region[..., band] == value
+        edges = np.diff(np.pad(match, ((0, 0), (1, 1))).astype(np.int8), axis = 1)
+        run_rows, run_starts = np.nonzero(edges == 1)
+        _, run_ends = np.nonzero(edges == -1)
+        row_first = np.searchsorted(run_rows, np.arange(bottom - top + 1))
+        seed_row = seed_y - top
+        first = row_first[seed_row] + np.searchsorted(run_starts[row_first[seed_row]:row_first[seed_row + 1]], seed_x - left, side = "right") - 1
+        visited = np.zeros(len(run_rows), dtype = bool)
+        visited[first] = True
+        stack = [first]
+        while stack:
+            run = stack.pop()
+            row, start, end = run_rows[run], run_starts[run], run_ends[run]
+            for next_row in (row - 1, row + 1):
+                if 0 <= next_row < bottom - top:
+                    low, high = row_first[next_row], row_first[next_row + 1]
+                    low, high = low + np.searchsorted(run_ends[low:high], start, side = "right"), low + np.searchsorted(run_starts[low:high], end, side = "left")
+                    for touching in range(low, high):
+                        if not visited[touching]:
+                            visited[touching] = True
+                            stack.append(touching)
+        runs = np.flatnonzero(visited)
+        lengths = run_ends[runs] - run_starts[runs]
+        xs = np.repeat(run_starts[runs] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        ys = np.repeat(run_rows[runs], lengths)
+        return np.stack((xs + left, ys + top), axis = 1)
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+from classes import config
+class RenderCache:
+    """
+    A persistent on disk cache of encoded tiles, keyed by a hash of everything that decides their pixels.
+
+    Entries are files named after their key, a hit refreshes the file's modification time and the least recently
+    used entries are removed once the cache grows past max_bytes. One cache can be shared by threads, the bookkeeping
+    is kept under a lock.
+
+    Attributes:
+        directory (str): The directory holding the cached files.
+        max_bytes (int): The size the cache is trimmed back to.
+        hits (int): How many lookups found an entry.
+        misses (int): How many lookups found nothing.
+    """
+
+    VERSION = 3
+
+    def __init__(self, directory = ".render_cache", max_bytes = 256 * 1024 * 1024):
+        """
+        Initializes a new RenderCache object, the directory is made if it does not exist.
+
+        Args:
+            directory (str): The directory holding the cached files.
+            max_bytes (int): The size the cache is trimmed back to.
+        """
+
+        self._directory = os.path.join(os.getcwd(), directory)
+        self._max_bytes = max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else 256 * 1024 * 1024
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self._directory, exist_ok = True)
+        self.refresh()
+
+    def __str__(self):
+        """
+        Provides a string representation of the RenderCache object.
+
+        Returns:
+            str: A description of the RenderCache object.
+        """
+
+        return f"A render cache in {self._directory} holding {len(self._entries)} tiles in {self.size} of {self._max_bytes} bytes, {self._hits} hits and {self._misses} misses."
+
+    @property
+    def directory(self):
+        """
+        Gets the directory of the RenderCache.
+
+        Returns:
+            str: The directory holding the cached files.
+        """
+
+        return self._directory
+
+    @property
+    def max_bytes(self):
+        """
+        Gets the size the RenderCache is trimmed back to.
+
+        Returns:
+            int: The size cap in bytes.
+        """
+
+        return self._max_bytes
+
+    @property
+    def hits(self):
+        """
+        Gets how many lookups found an entry.
+
+        Returns:
+            int: The number of hits.
+        """
+
+        return self._hits
+
+    @property
+    def misses(self):
+        """
+        Gets how many lookups found nothing.
+
+        Returns:
+            int: The number of misses.
+        """
+
+        return self._misses
+
+    @property
+    def size(self):
+        """
+        Gets the total size of the cached files.
+
+        Returns:
+            int: The size in bytes.
+        """
+
+        with self._lock:
+            return sum(size for size, _ in self._entries.values())
+
+    @staticmethod
+    def keyFor(spec):
+        """
+        A static method that hashes the fields of a TileGenerator spec that decide its encoded bytes: the size, background,
+        output extension, image mode, encoding profile, whether it is indexed and the palette an indexed tile holds, if
+        the spec has one, and the ordered shapes with their coords or primitive parameters, colors, repeat parameters,
+        whether they were drawn and, for rounded edges, their radius.
+
+        Args:
+            spec(dict): a spec as made by TileGenerator.toSpec.
+
+        Returns:
+            str: the hex key, or None when a shape has an unseeded random cut and so can not be cached.
+        """
+
+        shapes = []
+        for shape in spec.get("shapes", []):
+            repeats = shape.get("repeat") or []
+            repeats = [dict(config.REPEAT_DEFAULTS, **repeat) for repeat in (repeats if isinstance(repeats, list) else [repeats])]
+            if any(repeat["random_cut"] and repeat["seed"] is None for repeat in repeats):
+                return None
+            color = shape.get("color") or (spec.get("line_color") if shape.get("primitive") == "line" else None)
+            shapes.append({"coords": [list(coord) for coord in shape.get("coords", [])], "color": color or [],
+                           "rounded_edges": shape.get("rounded_edges", False),
+                           "radius": shape.get("radius", 2) if shape.get("rounded_edges", False) else None,
+                           "drawn": shape.get("drawn", True),
+                           "primitive": shape.get("primitive"), "params": shape.get("params"),
+                           "repeat": [{name: list(value) if isinstance(value, tuple) else value for name, value in repeat.items()} for repeat in repeats]})
+        _, ext = os.path.splitext(spec.get("output_file", ""))
+        ext = ext.lower()
+        key = {"version": RenderCache.VERSION, "width": spec.get("width"), "height": spec.get("height"),
+               "background_color": spec.get("background_color"), "ext": ext, "mode": config.VALID_IMG_FILE_EXT.get(ext),
+               "profile": spec.get("profile", "default"), "large": spec.get("large", False),
+               "indexed": spec.get("indexed", False), "palette": spec.get("palette") if spec.get("indexed", False) else None,
+               "shapes": shapes}
+        return hashlib.sha256(json.dumps(key, sort_keys = True, separators = (",", ":")).encode()).hexdigest()
+
+    def refresh(self):
+        """
+        Re-reads which entries are on disk, used after other processes have written to the same directory.
+        """
+
+        entries = {}
+        for entry in os.scandir(self._directory):
+            if entry.name.endswith(".bin"):
+                stat = entry.stat()
+                entries[entry.name[:-4]] = (stat.st_size, stat.st_mtime)
+        with self._lock:
+            self._entries = entries
+
+    def get(self, key):
+        """
+        Looks up the encoded bytes stored for a key and marks the entry as recently used.
+
+        Args:
+            key(str): the key made by keyFor, None always misses.
+
+        Returns:
+            bytes: the cached bytes, or None on a miss.
+        """
+
+        try:
+            if key is None:
+                raise FileNotFoundError
+            path = self._path(key)
+            with open(path, "rb") as cached:
+                data = cached.read()
+            os.utime(path)
+            mtime = os.path.getmtime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._misses += 1
+            return None
+        with self._lock:
+            self._hits += 1
+            self._entries[key] = (len(data), mtime)
+        return data
+
+    def put(self, key, data, evict = True):
+        """
+        Stores encoded bytes for a key, the file is written next to its final name and moved into place so readers never see half a file.
+
+        Args:
+            key(str): the key made by keyFor, None is ignored.
+            data(bytes): the encoded image.
+            evict(bool): whether to trim the cache back to max_bytes afterwards.
+        """
+
+        if key is None:
+            return
+        path = self._path(key)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as cached:
+            cached.write(data)
+        os.replace(temp_path, path)
+        with self._lock:
+            try:
+                self._entries[key] = (len(data), os.path.getmtime(path))
+            except FileNotFoundError:
+                return
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+
+        Returns:
+            int: how many entries were removed.
+        """
+
+        with self._lock:
+            size = sum(entry_size for entry_size, _ in self._entries.values())
+            removed = 0
+            for key, (entry_size, _) in sorted(self._entries.items(), key = lambda item: item[1][1]):
+                if size <= self._max_bytes:
+                    break
+                try:
+                    os.remove(self._path(key))
+                except FileNotFoundError:
+                    pass
+                del self._entries[key]
+                size -= entry_size
+                removed += 1
+        return removed
+
+    def record(self, hits = 0, misses = 0):
+        """
+        Adds lookups made by another process, such as a batch render worker, to the counters.
+
+        Args:
+            hits(int): hits to add.
+            misses(int): misses to add.
+        """
+
+        with self._lock:
+            self._hits += hits
+            self._misses += misses
+
+    def _path(self, key):
+        """
+        A method to get the file path of a key.
+
+        Args:
+            key(str): the cache key.
+
+        Returns:
+            str: the path of the cached file.
+        """
+
+        return os.path.join(self._directory, f"{key}.bin")
@@ -0,0 +1,96 @@
+import json
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import unquote
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """
+    The HTTP front of a RenderServer, connections are kept alive so a client pays for the handshake once.
+
+        GET    /health              {"ok": true}
+        GET    /generators          the resident generators and their specs
+        POST   /render              a JSON request, answered with the image bytes or {"files": [...]} when saved
+        DELETE /generators/<name>   drops a resident generator
+
+    Errors are answered with {"error": "..."}, 400 for a bad request and 404 for an unknown generator or path.
+    """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server_version = "DersEngine"
+
+    def do_GET(self):
+        """
+        Answers the health check and the list of resident generators.
+        """
+
+        render_server = self.server.render_server
+        if self.path == "/health":
+            self._sendJSON(200, {"ok": True})
+        elif self.path == "/generators":
+            self._sendJSON(200, {"generators": {name: tile_generator.toSpec() for name, tile_generator in list(render_server.generators.items())}})
+        else:
+            self._sendJSON(404, {"error": f"{self.path} not found"})
+
+    def do_POST(self):
+        """
+        Queues a render request and answers once its batch has run.
+        """
+
+        if self.path != "/render":
+            self._sendJSON(404, {"error": f"{self.path} not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"null")
+            result = self.server.render_server.submit(request).result()
+        except KeyError as error:
+            self._sendJSON(404, {"error": str(error.args[0]) if error.args else "not found"})
+            return
+        except Exception as error:
+            self._sendJSON(400, {"error": f"{type(error).__name__}: {error}"})
+            return
+        if "files" in result:
+            self._sendJSON(200, result)
+        else:
+            self._send(200, result["mime"], result["data"])
+
+    def do_DELETE(self):
+        """
+        Drops a resident generator.
+        """
+
+        name = unquote(self.path[len("/generators/"):]) if self.path.startswith("/generators/") else None
+        if name and self.server.render_server.removeGenerator(name):
+            self._sendJSON(200, {"removed": name})
+        else:
+            self._sendJSON(404, {"error": f"{self.path} not found"})
+
+    def log_message(self, format, *args):
+        """
+        Keeps the per request log off the terminal, errors are still answered to the client.
+        """
+
+    def _sendJSON(self, status, body):
+        """
+        Answers with a JSON body.
+
+        Args:
+            status (int): the HTTP status.
+            body (dict): the body to encode.
+        """
+
+        self._send(status, "application/json", json.dumps(body).encode())
+
+    def _send(self, status, content_type, data):
+        """
+        Answers with a body of known length so the connection can be reused.
+
+        Args:
+            status (int): the HTTP status.
+            content_type (str): the Content-Type header.
+            data (bytes): the body.
+        """
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
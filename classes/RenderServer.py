@@ -0,0 +1,408 @@
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
+from PIL import Image
+from classes import config
+from .PixelShape import PixelShape
+from .RenderCache import RenderCache
+from .RenderRequestHandler import RenderRequestHandler
+from .TileGenerator import TileGenerator
+class RenderServer:
+    """
+    A long running local render service, it keeps Pillow loaded and named TileGenerators resident between requests.
+
+    Requests are JSON objects. One with a "spec", a tile as in a render manifest, renders that tile. One with a "name"
+    uses the resident generator of that name, a "spec" given along with it replaces the generator and any "shapes" are
+    drawn onto it first. The encoded image is returned, or with "save": true the tile is saved and its files returned.
+
+    Saved tiles are written under root, a spec whose output_directory or output_file leads outside of it is rejected, as
+    is one wider or taller than config.SERVER_MAX_TILE_SIDE.
+
+    Requests that arrive together are taken off the queue as one batch, identical tile specs in a batch are rendered
+    once, and the batch is spread over a pool of worker threads. Requests on the same named generator run one at a time.
+
+    Attributes:
+        address (tuple): The (host, port) the server listens on.
+        jobs (int): How many worker threads render requests.
+        generators (dict): The resident TileGenerators by name.
+        cache (RenderCache): Cache of encoded tiles used for spec renders, or None.
+        root (str): The directory every output_directory of a request is resolved in.
+    """
+
+    def __init__(self, host = "127.0.0.1", port = 8765, jobs = None, max_batch = 64, cache = None, backlog = None, root = None):
+        """
+        Initializes a new RenderServer object, it does not listen until start or serveForever is called.
+
+        Args:
+            host (str): The address to listen on, localhost by default so only local clients can connect.
+            port (int): The port to listen on, 0 picks a free one.
+            jobs (int): How many worker threads render requests, if None one per core is used.
+            max_batch (int): The most requests taken off the queue as one batch.
+            cache (RenderCache): Cache of encoded tiles used for spec renders, or None.
+            backlog (int): How many new connections may wait to be accepted, if None config.SERVER_BACKLOG or max_batch,
+                whichever is larger, so a burst of clients is queued instead of reset.
+            root (str): The directory every output_directory of a request is resolved in, if None the working directory.
+        """
+
+        self._jobs = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)
+        self._max_batch = max_batch if isinstance(max_batch, int) and max_batch > 0 else 64
+        self._cache = cache if isinstance(cache, RenderCache) else None
+        self._root = os.path.realpath(root if isinstance(root, str) else os.getcwd())
+        self._generators = {}
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers = self._jobs, thread_name_prefix = "RenderServer")
+        self._http = ThreadingHTTPServer((host, port), RenderRequestHandler, bind_and_activate = False)
+        self._http.request_queue_size = backlog if isinstance(backlog, int) and backlog > 0 else max(config.SERVER_BACKLOG, self._max_batch)
+        try:
+            self._http.server_bind()
+            self._http.server_activate()
+        except OSError:
+            self._http.server_close()
+            self._executor.shutdown(wait = False)
+            raise
+        self._http.daemon_threads = True
+        self._http.render_server = self
+        self._dispatcher = threading.Thread(target = self._dispatch, name = "RenderServer-dispatch", daemon = True)
+        self._dispatcher.start()
+        self._thread = None
+        self._serving = False
+
+    def __str__(self):
+        """
+        Provides a string representation of the RenderServer object.
+
+        Returns:
+            str: A description of the RenderServer object.
+        """
+
+        return f"A render server on http://{self.address[0]}:{self.address[1]} with {self._jobs} workers and {len(self._generators)} resident generators."
+
+    @property
+    def address(self):
+        """
+        Gets the address the RenderServer listens on.
+
+        Returns:
+            tuple: The (host, port) of the server.
+        """
+
+        return self._http.server_address[:2]
+
+    @property
+    def jobs(self):
+        """
+        Gets how many worker threads render requests.
+
+        Returns:
+            int: The number of worker threads.
+        """
+
+        return self._jobs
+
+    @property
+    def generators(self):
+        """
+        Gets the resident TileGenerators.
+
+        Returns:
+            dict: The TileGenerators by name.
+        """
+
+        return self._generators
+
+    @property
+    def root(self):
+        """
+        Gets the directory the output directories of requests are resolved in.
+
+        Returns:
+            str: The resolved root directory.
+        """
+
+        return self._root
+
+    @property
+    def cache(self):
+        """
+        Gets the RenderCache of the RenderServer.
+
+        Returns:
+            RenderCache: The cache, or None.
+        """
+
+        return self._cache
+
+    def start(self):
+        """
+        Starts listening on a background thread and returns at once.
+        """
+
+        self._serving = True
+        self._thread = threading.Thread(target = self._http.serve_forever, name = "RenderServer-http", daemon = True)
+        self._thread.start()
+
+    def serveForever(self):
+        """
+        Listens on the calling thread until stop is called or the process is interrupted.
+        """
+
+        self._serving = True
+        try:
+            self._http.serve_forever()
+        finally:
+            self._serving = False
+            self._http.server_close()
+
+    def stop(self):
+        """
+        Stops listening and lets the worker threads finish the requests they have.
+        """
+
+        if self._serving:
+            self._http.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+        self._http.server_close()
+        self._queue.put(None)
+        self._executor.shutdown(wait = True)
+
+    def submit(self, request):
+        """
+        Queues a request for the next batch.
+
+        Args:
+            request (dict): the request, see the class description.
+
+        Returns:
+            Future: resolves to the result of handle, or raises the error of the request.
+        """
+
+        future = Future()
+        self._queue.put((request, future))
+        return future
+
+    def removeGenerator(self, name):
+        """
+        Drops a resident generator.
+
+        Args:
+            name (str): the name of the generator.
+
+        Returns:
+            bool: True if there was a generator of that name.
+        """
+
+        with self._lock(name):
+            return self._generators.pop(name, None) is not None
+
+    def handle(self, request):
+        """
+        Runs one request on the calling thread.
+
+        Args:
+            request (dict): the request, see the class description.
+
+        Returns:
+            dict: "data" and "mime" of the encoded image, or "files" when the tile was saved.
+        """
+
+        if not isinstance(request, dict) or ("name" not in request and "spec" not in request):
+            raise ValueError("a request needs a spec, a name or both")
+        name = request.get("name")
+        if name is None:
+            key = RenderCache.keyFor(request["spec"]) if self._cache and not request.get("save") else None
+            data = self._cache.get(key) if key else None
+            if data is not None:
+                return {"data": data, "mime": self._mime(request["spec"].get("output_file", "temp_output.png"))}
+            result = self._output(self._build(request["spec"]), request)
+            if key:
+                self._cache.put(key, result["data"])
+            return result
+        with self._lock(name):
+            if "spec" in request:
+                self._generators[name] = self._build(request["spec"])
+            if name not in self._generators:
+                raise KeyError(f"there is no generator named {name}")
+            tile_generator = self._generators[name]
+            self._drawShapes(tile_generator, request.get("shapes", []))
+            return self._output(tile_generator, request)
+
+    def _dispatch(self):
+        """
+        Takes requests off the queue in batches for as long as the server runs, every request that is already waiting
+        joins the batch. Identical tile specs share one render, each group is handed to the worker pool.
+        """
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < self._max_batch:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._queue.put(None)
+                    break
+                batch.append(job)
+            groups = {}
+            for request, future in batch:
+                groups.setdefault(self._shareKey(request) or id(future), []).append((request, future))
+            for group in groups.values():
+                self._executor.submit(self._run, group)
+
+    @staticmethod
+    def _shareKey(request):
+        """
+        A static method that gets the key a request can share its render by, only plain spec renders are shared.
+
+        Args:
+            request (dict): the request.
+
+        Returns:
+            str: the RenderCache key of the spec, or None when the request must run on its own.
+        """
+
+        if not isinstance(request, dict) or "name" in request or request.get("save") or not isinstance(request.get("spec"), dict):
+            return None
+        try:
+            return RenderCache.keyFor(request["spec"])
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    def _run(self, group):
+        """
+        Runs the first request of a group and hands its result, or error, to every request in the group.
+
+        Args:
+            group (list of tuple): the (request, future) pairs sharing one render.
+        """
+
+        request, _ = group[0]
+        try:
+            result = self.handle(request)
+        except Exception as error:
+            for _, future in group:
+                future.set_exception(error)
+            return
+        for _, future in group:
+            future.set_result(result)
+
+    def _build(self, spec):
+        """
+        Builds and draws a tile from a spec, on the canvas path unless the spec says otherwise.
+
+        Args:
+            spec (dict): the tile, as in a render manifest.
+
+        Returns:
+            TileGenerator: the drawn tile.
+        """
+
+        if not isinstance(spec, dict):
+            raise ValueError("a spec must be a JSON object")
+        for side in ("width", "height"):
+            if isinstance(spec.get(side), int) and spec[side] > config.SERVER_MAX_TILE_SIDE:
+                raise ValueError(f"{side} {spec[side]} is larger than the {config.SERVER_MAX_TILE_SIDE} the server renders")
+        spec = dict(spec, canvas = spec.get("canvas", True), output_directory = self._confine(spec))
+        try:
+            tile_generator = TileGenerator.fromSpec(spec)
+        except KeyError as error:
+            raise ValueError(f"the spec has an unknown or missing field {error}") from error
+        self._drawShapes(tile_generator, spec.get("shapes", []))
+        return tile_generator
+
+    @staticmethod
+    def _drawShapes(tile_generator, shape_specs):
+        """
+        A static method that draws the shapes of a request onto a tile, a shape spec missing a field is a bad request
+        so its KeyError is raised as a ValueError, leaving KeyError to mean an unknown generator.
+
+        Args:
+            tile_generator (TileGenerator): the tile.
+            shape_specs (list of dict): the shapes, as in a render manifest.
+        """
+
+        if not isinstance(shape_specs, list):
+            raise ValueError("shapes must be a list")
+        for shape_spec in shape_specs:
+            try:
+                PixelShape.fromSpec(tile_generator, shape_spec, draw = True)
+            except KeyError as error:
+                raise ValueError(f"a shape has an unknown or missing field {error}") from error
+
+    def _confine(self, spec):
+        """
+        Resolves the output directory of a spec under root, so a request can only ever write inside it.
+
+        Args:
+            spec (dict): the tile, as in a render manifest.
+
+        Returns:
+            str: the absolute output directory.
+        """
+
+        directory = spec.get("output_directory", "temp_assets")
+        output_file = spec.get("output_file", "temp_output.png")
+        if not isinstance(directory, str) or not isinstance(output_file, str):
+            raise ValueError("output_directory and output_file must be strings")
+        if os.path.basename(output_file) != output_file:
+            raise ValueError(f"{output_file} must be a file name without a directory")
+        path = os.path.realpath(os.path.join(self._root, directory))
+        if os.path.commonpath([path, self._root]) != self._root:
+            raise ValueError(f"{directory} is outside of the render root {self._root}")
+        return path
+
+    def _output(self, tile_generator, request):
+        """
+        Encodes a tile, or saves it when the request asks for it.
+
+        Args:
+            tile_generator (TileGenerator): the tile.
+            request (dict): the request, "save" and "copies" are read.
+
+        Returns:
+            dict: "data" and "mime" of the encoded image, or "files" when the tile was saved.
+        """
+
+        if request.get("save"):
+            copies = request.get("copies", 1)
+            tile_generator.saveImage(multiples = copies > 1, count = copies)
+            names = [f"{i}_{tile_generator.output_file}" for i in range(1, copies + 1)] if copies > 1 else [tile_generator.output_file]
+            return {"files": [os.path.join(tile_generator.output_directory, name) for name in names]}
+        return {"data": tile_generator.encodeImage(), "mime": self._mime(tile_generator.output_file)}
+
+    def _lock(self, name):
+        """
+        Gets the lock that makes requests on one named generator run one at a time.
+
+        Args:
+            name (str): the name of the generator.
+
+        Returns:
+            threading.Lock: the lock of that name.
+        """
+
+        with self._locks_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @staticmethod
+    def _mime(output_file):
+        """
+        A static method that gets the MIME type of a file name's image format.
+
+        Args:
+            output_file (str): the file name.
+
+        Returns:
+            str: the MIME type, application/octet-stream when it is not known.
+        """
+
+        _, ext = os.path.splitext(output_file)
+        return Image.MIME.get(Image.registered_extensions().get(ext.lower(), ""), "application/octet-stream")
@@ -0,0 +1,393 @@
+import bisect
+import functools
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import numpy as np
+from classes import config
+class ResidencyManager:
+    """
+    Keeps the pixels of many TileGenerators within a memory budget. When the resident pixels grow past max_bytes the
+    least recently used tiles are spilled to one scratch file and their buffers dropped, a spilled tile is read back
+    the next time a pixel method touches it, so drawing, repeating and saving work on it as before.
+
+    Tiles are held by weak reference, a tile that is no longer used anywhere else is forgotten and its spill space reused.
+    Large tiles already live in their own memory mapped file and are left alone.
+
+    Attributes:
+        max_bytes (int): The pixel bytes tiles may keep resident before the least recently used ones are spilled.
+        path (str): The scratch file spilled pixels are written to.
+        resident (int): How many tiles have their pixels in memory.
+        spilled (int): How many tiles have their pixels in the scratch file.
+        resident_bytes (int): The pixel bytes of the resident tiles.
+        spilled_bytes (int): The pixel bytes of the spilled tiles.
+    """
+
+    _default = None
+
+    def __init__(self, max_bytes = None, directory = None):
+        """
+        Initializes a new ResidencyManager object, the scratch file is made empty and grows as tiles are spilled.
+
+        Args:
+            max_bytes (int): The resident pixel budget in bytes, if None config.RESIDENCY_MAX_BYTES is used.
+            directory (str): Where the scratch file is made, if None config.SCRATCH_DIRECTORY is used.
+        """
+
+        self._max_bytes = max_bytes if isinstance(max_bytes, int) and max_bytes >= 0 else config.RESIDENCY_MAX_BYTES
+        handle, self._path = tempfile.mkstemp(prefix = "residency_", suffix = ".raw", dir = directory or config.SCRATCH_DIRECTORY)
+        os.close(handle)
+        self._file = open(self._path, "r+b")
+        weakref.finalize(self, ResidencyManager._close, self._file, self._path)
+        self._lock = threading.RLock()
+        self._tiles = OrderedDict()
+        self._spilled = {}
+        self._resident_bytes = 0
+        self._free = []
+        self._end = 0
+        self._spills = 0
+        self._rehydrations = 0
+        self._bytes_written = 0
+        self._bytes_read = 0
+        self._spill_seconds = 0.0
+        self._rehydrate_seconds = 0.0
+
+    def __str__(self):
+        """
+        Provides a string representation of the ResidencyManager object.
+
+        Returns:
+            str: A description of the ResidencyManager object.
+        """
+
+        return (f"{self.resident} tiles resident in {self.resident_bytes} of {self._max_bytes} bytes, {self.spilled} spilled in {self.spilled_bytes} bytes, "
+                f"{self._spills} spills writing {self._bytes_written} bytes in {self._spill_seconds:.3f}s and "
+                f"{self._rehydrations} rehydrations reading {self._bytes_read} bytes in {self._rehydrate_seconds:.3f}s.")
+
+    @property
+    def max_bytes(self):
+        """
+        Gets the resident pixel budget of the ResidencyManager.
+
+        Returns:
+            int: The budget in bytes.
+        """
+
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, max_bytes):
+        """
+        Sets a new resident pixel budget, tiles are spilled at once until the resident pixels fit.
+
+        Args:
+            max_bytes(int): the new budget in bytes.
+        """
+
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError(f"{max_bytes} must be a whole number of bytes")
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._trim()
+
+    @property
+    def path(self):
+        """
+        Gets the scratch file of the ResidencyManager.
+
+        Returns:
+            str: The path of the scratch file.
+        """
+
+        return self._path
+
+    @property
+    def resident(self):
+        """
+        Gets how many tiles have their pixels in memory.
+
+        Returns:
+            int: The number of resident tiles.
+        """
+
+        return len(self._tiles)
+
+    @property
+    def spilled(self):
+        """
+        Gets how many tiles have their pixels in the scratch file.
+
+        Returns:
+            int: The number of spilled tiles.
+        """
+
+        return len(self._spilled)
+
+    @property
+    def resident_bytes(self):
+        """
+        Gets the pixel bytes of the resident tiles, as measured when each was last touched.
+
+        Returns:
+            int: The resident size in bytes.
+        """
+
+        return self._resident_bytes
+
+    @property
+    def spilled_bytes(self):
+        """
+        Gets the pixel bytes of the spilled tiles.
+
+        Returns:
+            int: The spilled size in bytes.
+        """
+
+        return sum(entry["spill"]["size"] for entry in list(self._spilled.values()))
+
+    @classmethod
+    def default(cls):
+        """
+        Gets the manager shared by the tiles of the command line, it is made on first use with config.RESIDENCY_MAX_BYTES.
+
+        Returns:
+            ResidencyManager: the shared manager.
+        """
+
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def stats(self):
+        """
+        Gets the tile counts and spill I/O of the ResidencyManager.
+
+        Returns:
+            dict: resident, spilled, resident_bytes, spilled_bytes, max_bytes, spills, rehydrations, bytes_written,
+                bytes_read, spill_seconds and rehydrate_seconds.
+        """
+
+        with self._lock:
+            return {"resident": self.resident, "spilled": self.spilled, "resident_bytes": self.resident_bytes,
+                    "spilled_bytes": self.spilled_bytes, "max_bytes": self._max_bytes, "spills": self._spills,
+                    "rehydrations": self._rehydrations, "bytes_written": self._bytes_written, "bytes_read": self._bytes_read,
+                    "spill_seconds": self._spill_seconds, "rehydrate_seconds": self._rehydrate_seconds}
+
+    def add(self, tile_generator):
+        """
+        Puts a TileGenerator under the budget as the most recently used tile, a tile already added is only touched.
+
+        Args:
+            tile_generator(TileGenerator): the tile to manage.
+        """
+
+        if tile_generator.large:
+            return
+        with self._lock:
+            key = id(tile_generator)
+            if key not in self._tiles and key not in self._spilled:
+                self._tiles[key] = {"ref": weakref.ref(tile_generator, functools.partial(self._forget, key)), "bytes": 0, "spill": None}
+                tile_generator._residency = self
+            self.touch(tile_generator)
+
+    def remove(self, tile_generator):
+        """
+        Takes a TileGenerator out from under the budget, its pixels are read back first if it was spilled.
+
+        Args:
+            tile_generator(TileGenerator): the tile to stop managing.
+        """
+
+        with self._lock:
+            key = id(tile_generator)
+            if key in self._spilled:
+                self._rehydrate(tile_generator, key)
+            entry = self._tiles.pop(key, None)
+            if entry is not None:
+                self._resident_bytes -= entry["bytes"]
+                tile_generator._residency = None
+
+    def touch(self, tile_generator):
+        """
+        Marks a TileGenerator as the most recently used, reading its pixels back if it was spilled, and spills the least
+        recently used other tiles until the resident pixels fit the budget.
+
+        Args:
+            tile_generator(TileGenerator): the tile about to be used.
+        """
+
+        with self._lock:
+            key = id(tile_generator)
+            if key in self._spilled:
+                self._rehydrate(tile_generator, key)
+            entry = self._tiles.get(key)
+            if entry is None:
+                return
+            self._tiles.move_to_end(key)
+            size = tile_generator._residentBytes()
+            self._resident_bytes += size - entry["bytes"]
+            entry["bytes"] = size
+            if self._resident_bytes > self._max_bytes:
+                self._trim()
+
+    def spill(self, tile_generator):
+        """
+        Writes the pixels of a resident TileGenerator to the scratch file and drops its buffers.
+
+        Args:
+            tile_generator(TileGenerator): the tile to spill.
+        """
+
+        with self._lock:
+            key = id(tile_generator)
+            if key not in self._tiles:
+                return
+            start = time.perf_counter()
+            mode, pixels, palette = tile_generator._pixelState()
+            pixels = np.ascontiguousarray(pixels)
+            offset = self._allocate(pixels.nbytes)
+            self._file.seek(offset)
+            self._file.write(pixels.data)
+            self._file.flush()
+            tile_generator._dropPixels()
+            entry = self._tiles.pop(key)
+            entry["spill"] = {"offset": offset, "size": pixels.nbytes, "shape": pixels.shape, "mode": mode, "palette": palette}
+            self._spilled[key] = entry
+            self._resident_bytes -= entry["bytes"]
+            self._spills += 1
+            self._bytes_written += pixels.nbytes
+            self._spill_seconds += time.perf_counter() - start
+
+    @staticmethod
+    def touches(function):
+        """
+        A decorator for the TileGenerator methods that use its pixels, the tile is touched before every call so spilled
+        pixels are read back first. A tile without a ResidencyManager only costs one attribute check.
+
+        Args:
+            function(callable): the TileGenerator method.
+
+        Returns:
+            callable: the wrapped method.
+        """
+
+        @functools.wraps(function)
+        def wrapper(tile_generator, *args, **kwargs):
+            if tile_generator._residency is not None:
+                tile_generator._residency.touch(tile_generator)
+            return function(tile_generator, *args, **kwargs)
+        return wrapper
+
+    def _trim(self):
+        """
+        Spills the least recently used resident tiles, never the most recent one, until the resident pixels fit the budget.
+        """
+
+        while self._resident_bytes > self._max_bytes and len(self._tiles) > 1:
+            key, entry = next(iter(self._tiles.items()))
+            tile_generator = entry["ref"]()
+            if tile_generator is None:
+                self._forget(key, None)
+            else:
+                self.spill(tile_generator)
+
+    def _rehydrate(self, tile_generator, key):
+        """
+        Reads the spilled pixels of a tile back into new buffers and frees their space in the scratch file, the tile is
+        resident again as the most recently used one.
+
+        Args:
+            tile_generator(TileGenerator): the tile to read back.
+            key(int): the id the tile is kept under.
+        """
+
+        entry = self._spilled.pop(key)
+        spill = entry["spill"]
+        start = time.perf_counter()
+        pixels = np.empty(spill["shape"], dtype = np.uint8)
+        self._file.seek(spill["offset"])
+        self._file.readinto(memoryview(pixels).cast("B"))
+        tile_generator._restorePixels(spill["mode"], pixels, spill["palette"])
+        entry["spill"] = None
+        self._tiles[key] = entry
+        self._resident_bytes += entry["bytes"]
+        self._release(spill["offset"], spill["size"])
+        self._rehydrations += 1
+        self._bytes_read += spill["size"]
+        self._rehydrate_seconds += time.perf_counter() - start
+
+    def _allocate(self, size):
+        """
+        Finds room for size bytes in the scratch file, reusing the first freed run that is big enough.
+
+        Args:
+            size(int): the bytes needed.
+
+        Returns:
+            int: the offset to write at.
+        """
+
+        for i, (offset, free) in enumerate(self._free):
+            if free >= size:
+                self._free[i:i + 1] = [(offset + size, free - size)] if free > size else []
+                return offset
+        offset = self._end
+        self._end += size
+        return offset
+
+    def _release(self, offset, size):
+        """
+        Gives a run of the scratch file back, merging it with the free runs it touches.
+
+        Args:
+            offset(int): where the run starts.
+            size(int): how many bytes it holds.
+        """
+
+        i = bisect.bisect(self._free, (offset, size))
+        if i < len(self._free) and offset + size == self._free[i][0]:
+            size += self._free.pop(i)[1]
+        if i and self._free[i - 1][0] + self._free[i - 1][1] == offset:
+            i -= 1
+            offset, size = self._free[i][0], self._free.pop(i)[1] + size
+        if offset + size == self._end:
+            self._end = offset
+            self._file.truncate(self._end)
+        else:
+            self._free.insert(i, (offset, size))
+
+    def _forget(self, key, _ref):
+        """
+        Drops the bookkeeping of a tile that has been garbage collected, its spill space is reused while the scratch file is open.
+
+        Args:
+            key(int): the id the tile was kept under.
+            _ref(weakref.ref): the dead reference.
+        """
+
+        with self._lock:
+            entry = self._tiles.pop(key, None)
+            if entry is not None:
+                self._resident_bytes -= entry["bytes"]
+            entry = self._spilled.pop(key, None)
+            if entry is not None and not self._file.closed:
+                self._release(entry["spill"]["offset"], entry["spill"]["size"])
+
+    @staticmethod
+    def _close(file, path):
+        """
+        A static method that closes and removes the scratch file, a file that is already gone is left alone.
+
+        Args:
+            file(file): the open scratch file.
+            path(str): the scratch file.
+        """
+
+        file.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
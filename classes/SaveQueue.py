@@ -0,0 +1,191 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from classes.Instrumentation import Instrumentation
+class SaveQueue:
+    """
+    A class to encode and write tile images on background threads so saving never blocks the caller.
+
+    Each save takes a snapshot of the image saveImage would encode, so the tile can keep being drawn on and an indexed
+    tile is still written as a palette PNG, and returns a Future that holds the written paths or the error. When the
+    snapshots waiting to be written pass max_bytes, new saves wait for room.
+
+    Attributes:
+        workers (int): How many threads encode and write images.
+        max_bytes (int): How many bytes of image snapshots may wait to be written before submit blocks.
+        pending (int): How many saves have not finished yet.
+    """
+
+    _default = None
+
+    def __init__(self, workers = 2, max_bytes = 256 * 1024 * 1024):
+        """
+        Initializes a new SaveQueue object.
+
+        Args:
+            workers (int): How many threads encode and write images.
+            max_bytes (int): How many bytes of image snapshots may wait to be written before submit blocks.
+        """
+
+        self._workers = workers if isinstance(workers, int) and workers > 0 else 2
+        self._max_bytes = max_bytes if isinstance(max_bytes, int) and max_bytes > 0 else 256 * 1024 * 1024
+        self._executor = ThreadPoolExecutor(max_workers = self._workers, thread_name_prefix = "SaveQueue")
+        self._room = threading.Condition()
+        self._pending_bytes = 0
+        self._futures = set()
+
+    def __str__(self):
+        """
+        Provides a string representation of the SaveQueue object.
+
+        Returns:
+            str: A description of the SaveQueue object.
+        """
+
+        return f"A save queue with {self._workers} workers and {self.pending} saves pending."
+
+    @property
+    def workers(self):
+        """
+        Gets how many threads encode and write images.
+
+        Returns:
+            int: The number of worker threads.
+        """
+
+        return self._workers
+
+    @property
+    def max_bytes(self):
+        """
+        Gets how many bytes of snapshots may wait before submit blocks.
+
+        Returns:
+            int: The snapshot budget in bytes.
+        """
+
+        return self._max_bytes
+
+    @property
+    def pending(self):
+        """
+        Gets how many saves have not finished yet.
+
+        Returns:
+            int: The number of unfinished saves.
+        """
+
+        with self._room:
+            return len(self._futures)
+
+    @classmethod
+    def default(cls):
+        """
+        Gets the queue shared by TileGenerator.saveImageAsync, it is made on first use and flushed at interpreter exit.
+
+        Returns:
+            SaveQueue: the shared queue.
+        """
+
+        if cls._default is None:
+            cls._default = cls()
+            atexit.register(cls._default.shutdown)
+        return cls._default
+
+    def submit(self, tile_generator, multiples = False, count = 1):
+        """
+        Queues a save of the current pixels of a TileGenerator, blocking only while the queue is over its byte budget.
+
+        Args:
+            tile_generator (TileGenerator): the tile to save.
+            multiples (bool): whether count copies are saved as {i}_{output_file}.
+            count (int): how many copies are saved when multiples is True.
+
+        Returns:
+            Future: resolves to the list of written paths, or raises the error of the save.
+        """
+
+        if not isinstance(count, int) or count < 1 or not isinstance(multiples, bool):
+            raise ValueError(f"{count} must be greater than or equal to 1 and {multiples} must be True or False")
+        img = tile_generator._encodeSource().copy()
+        names = [f"{i}_{tile_generator.output_file}" for i in range(1, count + 1)] if multiples else [tile_generator.output_file]
+        paths = [os.path.join(tile_generator.output_directory, name) for name in names]
+        size = img.width * img.height * len(img.getbands())
+        with self._room:
+            while self._pending_bytes and self._pending_bytes + size > self._max_bytes:
+                self._room.wait()
+            self._pending_bytes += size
+            future = self._executor.submit(self._write, img, tile_generator.output_file, tile_generator.profile, paths)
+            self._futures.add(future)
+        future.add_done_callback(lambda done: self._release(done, size))
+        return future
+
+    def flush(self, timeout = None):
+        """
+        Waits for every queued save to finish, errors stay on their futures.
+
+        Args:
+            timeout (float): seconds to wait at most, None waits for as long as it takes.
+
+        Returns:
+            list of Future: the saves that were waited on.
+        """
+
+        with self._room:
+            futures = list(self._futures)
+        for future in futures:
+            try:
+                future.exception(timeout = timeout)
+            except TimeoutError:
+                break
+        return futures
+
+    def shutdown(self):
+        """
+        Flushes the queue and stops its threads.
+        """
+
+        self.flush()
+        self._executor.shutdown(wait = True)
+
+    @staticmethod
+    @Instrumentation.track("TileGenerator.saveImage")
+    def _write(img, output_file, profile, paths):
+        """
+        A static method that encodes the snapshot once and writes it to every path, runs on a worker thread.
+        It is recorded as TileGenerator.saveImage, with the bytes it wrote, like a save made on the caller's thread.
+
+        Args:
+            img (Image): the snapshot.
+            output_file (str): the output file name at the time of the save, its extension picks the format.
+            profile (str): the encoding profile at the time of the save.
+            paths (list of str): where to write it.
+
+        Returns:
+            list of str: the written paths.
+        """
+
+        from .TileGenerator import TileGenerator
+
+        data = TileGenerator.encodeAs(img, output_file, profile)
+        for path in paths:
+            with open(path, "wb") as output:
+                output.write(data)
+        if Instrumentation.enabled:
+            Instrumentation.count("TileGenerator.saveImage", bytes_written = len(data) * len(paths))
+        return paths
+
+    def _release(self, future, size):
+        """
+        Gives the bytes of a finished save back to the budget and wakes any waiting submit.
+
+        Args:
+            future (Future): the finished save.
+            size (int): the bytes of its snapshot.
+        """
+
+        with self._room:
+            self._pending_bytes -= size
+            self._futures.discard(future)
+            self._room.notify_all()
@@ -0,0 +1,198 @@
+import json
+import os
+import struct
+import numpy as np
+from .TileGenerator import TileGenerator
+from .PixelShape import PixelShape
+class Session:
+    """
+    A class to save and load named TileGenerators and PixelShapes, pixels and coords included, in one binary file.
+
+    The file holds a small JSON header describing every generator and shape followed by their pixel and coord arrays
+    as raw, 64 byte aligned buffers. Loading parses only the header and maps the file copy on write, so the arrays are
+    used in place without per element parsing and a tile's pixels are only read from disk when the tile is first used.
+
+    Attributes:
+        tile_generators (dict): The TileGenerators by name.
+        shapes (dict): The PixelShapes by name.
+    """
+
+    MAGIC = b"DERSSESS"
+    VERSION = 1
+    ALIGN = 64
+
+    def __init__(self, tile_generators = None, shapes = None):
+        """
+        Initializes a new Session object.
+
+        Args:
+            tile_generators (dict): The TileGenerators by name.
+            shapes (dict): The PixelShapes by name.
+        """
+
+        self._tile_generators = tile_generators if isinstance(tile_generators, dict) else {}
+        self._shapes = shapes if isinstance(shapes, dict) else {}
+
+    def __str__(self):
+        """
+        Provides a string representation of the Session object.
+
+        Returns:
+            str: A description of the Session object.
+        """
+
+        return f"A session of {len(self._tile_generators)} tile generators and {len(self._shapes)} shapes."
+
+    @property
+    def tile_generators(self):
+        """
+        Gets the TileGenerators of the Session.
+
+        Returns:
+            dict: The TileGenerators by name.
+        """
+
+        return self._tile_generators
+
+    @property
+    def shapes(self):
+        """
+        Gets the PixelShapes of the Session.
+
+        Returns:
+            dict: The PixelShapes by name.
+        """
+
+        return self._shapes
+
+    def save(self, path):
+        """
+        Writes the session to a file, the file is written next to its final name and moved into place so a failed
+        save never leaves half a session behind. Every shape on a saved generator is kept in drawing order, named or not.
+
+        Args:
+            path (str): the session file to write.
+        """
+
+        buffers = []
+        end = [0]
+
+        def reference(array):
+            if array is None:
+                return None
+            array = np.ascontiguousarray(array)
+            buffers.append(array)
+            offset = end[0]
+            end[0] += -(-array.nbytes // self.ALIGN) * self.ALIGN
+            return {"offset": offset, "dtype": array.dtype.str, "shape": list(array.shape)}
+
+        placed = {}
+        tiles = {}
+        for name, tile_generator in self._tile_generators.items():
+            fields, pixels = tile_generator.getState()
+            fields["pixels"] = reference(pixels)
+            fields["shapes"] = []
+            for index, shape in enumerate(tile_generator.shapes):
+                fields["shapes"].append(self._shapeHeader(shape, reference))
+                placed[id(shape)] = (name, index)
+            tiles[name] = fields
+        shapes = {}
+        for name, shape in self._shapes.items():
+            if id(shape) in placed:
+                shapes[name] = {"tile": placed[id(shape)][0], "index": placed[id(shape)][1]}
+            else:
+                shapes[name] = {"tile": None, "shape": self._shapeHeader(shape, reference)}
+
+        header = json.dumps({"tiles": tiles, "shapes": shapes}, separators = (",", ":")).encode()
+        start = -(-(len(self.MAGIC) + 16 + len(header)) // self.ALIGN) * self.ALIGN
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as output:
+            output.write(self.MAGIC)
+            output.write(struct.pack("<IIQ", self.VERSION, start, len(header)))
+            output.write(header)
+            for buffer in buffers:
+                output.write(b"\0" * (-output.tell() % self.ALIGN))
+                if buffer.nbytes:
+                    output.write(buffer.data)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Reads a session file. Only the header is parsed, pixels and coords stay in the copy on write mapped file until
+        they are used, changes made to them are never written back to it.
+
+        Args:
+            path (str): the session file to read.
+
+        Returns:
+            Session: the loaded session.
+        """
+
+        with open(path, "rb") as stored:
+            if stored.read(len(cls.MAGIC)) != cls.MAGIC:
+                raise ValueError(f"{path} is not a session file")
+            version, start, length = struct.unpack("<IIQ", stored.read(16))
+            if version != cls.VERSION:
+                raise ValueError(f"{path} is a version {version} session, only version {cls.VERSION} can be read")
+            header = json.loads(stored.read(length))
+        mapped = np.memmap(path, dtype = np.uint8, mode = "c")
+
+        def array(reference):
+            if reference is None:
+                return None
+            dtype = np.dtype(reference["dtype"])
+            count = int(np.prod(reference["shape"]))
+            offset = start + reference["offset"]
+            return mapped[offset:offset + count * dtype.itemsize].view(dtype).reshape(reference["shape"])
+
+        tile_generators = {}
+        for name, fields in header["tiles"].items():
+            tile_generator = TileGenerator.fromState(fields, array(fields["pixels"]))
+            for shape in fields["shapes"]:
+                cls._restoreShape(tile_generator, shape, array)
+            tile_generators[name] = tile_generator
+        shapes = {}
+        for name, entry in header["shapes"].items():
+            if entry["tile"] is None:
+                shapes[name] = cls._restoreShape(None, entry["shape"], array)
+            else:
+                shapes[name] = tile_generators[entry["tile"]].shapes[entry["index"]]
+        return cls(tile_generators, shapes)
+
+    @staticmethod
+    def _shapeHeader(shape, reference):
+        """
+        A static method that describes a shape for the header, its arrays are handed to reference to be placed in the file.
+
+        Args:
+            shape (PixelShape): the shape to describe.
+            reference (callable): places an array in the file and gives back its header entry.
+
+        Returns:
+            dict: the shape fields with references to its coords, base coords and cuts.
+        """
+
+        fields, arrays = shape.getState()
+        fields["coords"] = reference(arrays["coords"])
+        fields["base_coords"] = reference(arrays["base_coords"])
+        fields["cuts"] = [reference(coords) for coords in arrays["cuts"]]
+        return fields
+
+    @staticmethod
+    def _restoreShape(tile_generator, fields, array):
+        """
+        A static method that rebuilds a shape from its header entry.
+
+        Args:
+            tile_generator (TileGenerator): the generator the shape was on, or None.
+            fields (dict): the header entry of the shape.
+            array (callable): turns a reference into the mapped array.
+
+        Returns:
+            PixelShape: the restored shape.
+        """
+
+        arrays = {"coords": array(fields["coords"]), "base_coords": array(fields["base_coords"]),
+                  "cuts": [array(reference) for reference in fields["cuts"]]}
+        return PixelShape.fromState(tile_generator, fields, arrays)
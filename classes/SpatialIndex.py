@@ -0,0 +1,323 @@
+from classes import config
+class SpatialIndex:
+    """
+    A uniform grid over the bounds of the PixelShapes on a TileGenerator, used for hit testing and to find the shapes
+    a redraw has to repaint without checking every shape.
+
+    Every shape is bucketed into the grid cells its bounds cover, shapes covering more than max_cells cells are kept in a
+    short list of wide shapes instead. Shapes report changes through update and are only re-bucketed by the next query,
+    so drawing, editing and repeating many shapes in a row costs nothing until someone asks. Queries give shapes in the
+    order they were added, which is the order they are painted in.
+
+    Attributes:
+        cell_size (int): The side of a grid cell in pixels.
+        max_cells (int): The most cells a shape is bucketed into before it is kept with the wide shapes.
+    """
+
+    def __init__(self, cell_size = None, max_cells = None):
+        """
+        Initializes a new, empty SpatialIndex object.
+
+        Args:
+            cell_size (int): The side of a grid cell in pixels, if None config.SPATIAL_CELL_SIZE is used.
+            max_cells (int): The most cells a shape is bucketed into, if None config.SPATIAL_MAX_CELLS is used.
+        """
+
+        self._cell_size = cell_size if isinstance(cell_size, int) and cell_size > 0 else config.SPATIAL_CELL_SIZE
+        self._max_cells = max_cells if isinstance(max_cells, int) and max_cells > 0 else config.SPATIAL_MAX_CELLS
+        self._order = {}
+        self._boxes = {}
+        self._cells = {}
+        self._wide = set()
+        self._dirty = {}
+        self._extent = None
+        self._next = 0
+
+    def __str__(self):
+        """
+        Provides a string representation of the SpatialIndex object.
+
+        Returns:
+            str: A description of the SpatialIndex object.
+        """
+
+        return f"A spatial index of {len(self._order)} shapes in {len(self._cells)} cells of {self._cell_size} pixels, {len(self._wide)} wide shapes."
+
+    def __len__(self):
+        """
+        Gets how many shapes are indexed.
+
+        Returns:
+            int: The number of shapes.
+        """
+
+        return len(self._order)
+
+    def __contains__(self, shape):
+        """
+        Checks if a shape is indexed.
+
+        Args:
+            shape (PixelShape): the shape to look for.
+
+        Returns:
+            bool: True if the shape is indexed.
+        """
+
+        return shape in self._order
+
+    @property
+    def cell_size(self):
+        """
+        Gets the side of a grid cell.
+
+        Returns:
+            int: The side of a cell in pixels.
+        """
+
+        return self._cell_size
+
+    @property
+    def max_cells(self):
+        """
+        Gets the most cells a shape is bucketed into.
+
+        Returns:
+            int: The number of cells.
+        """
+
+        return self._max_cells
+
+    def add(self, shape):
+        """
+        Adds a shape after every shape already indexed, its bounds are read by the next query.
+
+        Args:
+            shape (PixelShape): the shape to add.
+        """
+
+        if shape not in self._order:
+            self._order[shape] = self._next
+            self._next += 1
+            self._dirty[shape] = None
+
+    def remove(self, shape):
+        """
+        Removes a shape from the index.
+
+        Args:
+            shape (PixelShape): the shape to remove.
+        """
+
+        if shape in self._order:
+            self._unplace(shape)
+            self._dirty.pop(shape, None)
+            del self._order[shape]
+
+    def update(self, shape):
+        """
+        Marks the bounds of an indexed shape as changed, it is bucketed again by the next query.
+
+        Args:
+            shape (PixelShape): the shape that changed.
+        """
+
+        if shape in self._order:
+            self._dirty[shape] = None
+
+    def shapesAt(self, x, y, exact = False):
+        """
+        Gets the shapes whose bounds hold a pixel.
+
+        Args:
+            x (int): the x of the pixel.
+            y (int): the y of the pixel.
+            exact (bool): if True only shapes that actually paint the pixel are kept, not every shape whose bounds hold it.
+
+        Returns:
+            list of PixelShape: the shapes in the order they were added.
+        """
+
+        self._flush()
+        candidates = self._cells.get((x // self._cell_size, y // self._cell_size), set()) | self._wide
+        found = [shape for shape in candidates if self._hits(self._boxes[shape], (x, y, x + 1, y + 1))]
+        if exact:
+            found = [shape for shape in found if shape.paints(x, y)]
+        return sorted(found, key = self._order.__getitem__)
+
+    def shapesIn(self, box):
+        """
+        Gets the shapes whose bounds overlap a rectangle.
+
+        Args:
+            box (tuple): the (left, top, right, bottom) rectangle, right and bottom exclusive.
+
+        Returns:
+            list of PixelShape: the shapes in the order they were added.
+        """
+
+        self._flush()
+        left, top, right, bottom = box
+        if left >= right or top >= bottom:
+            return []
+        columns, rows = self._span(box)
+        if len(columns) * len(rows) > len(self._boxes):
+            candidates = self._boxes.keys()
+        else:
+            candidates = set(self._wide)
+            for cx in columns:
+                for cy in rows:
+                    candidates.update(self._cells.get((cx, cy), ()))
+        return sorted((shape for shape in candidates if self._hits(self._boxes[shape], box)), key = self._order.__getitem__)
+
+    def nearest(self, x, y):
+        """
+        Gets the shape whose bounds are nearest to a pixel, searching the grid in rings around the pixel's cell and
+        skipping cells farther away than the nearest shape found so far.
+
+        Args:
+            x (int): the x of the pixel.
+            y (int): the y of the pixel.
+
+        Returns:
+            PixelShape: the nearest shape, the last added one on a tie, or None if no shape has painted anything.
+        """
+
+        self._flush()
+        best, best_distance = None, None
+
+        def consider(shape):
+            nonlocal best, best_distance
+            distance = self._distance(self._boxes[shape], x, y)
+            if best is None or distance < best_distance or (distance == best_distance and self._order[shape] > self._order[best]):
+                best, best_distance = shape, distance
+
+        for shape in self._wide:
+            consider(shape)
+        if self._extent is None:
+            return best
+        cell_x, cell_y = x // self._cell_size, y // self._cell_size
+        first_x, first_y, last_x, last_y = self._extent
+        start = max(first_x - cell_x, cell_x - last_x, first_y - cell_y, cell_y - last_y, 0)
+        reach = max(abs(cell_x - first_x), abs(cell_x - last_x), abs(cell_y - first_y), abs(cell_y - last_y))
+        for ring in range(start, reach + 1):
+            if best is not None and best_distance <= (ring - 1) * self._cell_size:
+                break
+            for cx in range(max(cell_x - ring, first_x), min(cell_x + ring, last_x) + 1):
+                if cx in (cell_x - ring, cell_x + ring):
+                    rows = range(max(cell_y - ring, first_y), min(cell_y + ring, last_y) + 1)
+                else:
+                    rows = [cy for cy in (cell_y - ring, cell_y + ring) if first_y <= cy <= last_y]
+                for cy in rows:
+                    cell = self._cells.get((cx, cy))
+                    if not cell or (best is not None and self._distance(self._cellBox(cx, cy), x, y) > best_distance):
+                        continue
+                    for shape in cell:
+                        consider(shape)
+        return best
+
+    def _flush(self):
+        """
+        Buckets every shape marked as changed by its current bounds.
+        """
+
+        while self._dirty:
+            shape, _ = self._dirty.popitem()
+            self._unplace(shape)
+            box = shape.getBounds()
+            if not box:
+                continue
+            self._boxes[shape] = box
+            columns, rows = self._span(box)
+            if len(columns) * len(rows) > self._max_cells:
+                self._wide.add(shape)
+                continue
+            for cx in columns:
+                for cy in rows:
+                    self._cells.setdefault((cx, cy), set()).add(shape)
+            extent = self._extent or (columns[0], rows[0], columns[-1], rows[-1])
+            self._extent = (min(extent[0], columns[0]), min(extent[1], rows[0]), max(extent[2], columns[-1]), max(extent[3], rows[-1]))
+
+    def _unplace(self, shape):
+        """
+        Takes a shape out of the cells it was bucketed into.
+
+        Args:
+            shape (PixelShape): the shape to take out.
+        """
+
+        box = self._boxes.pop(shape, None)
+        if box is None:
+            return
+        if shape in self._wide:
+            self._wide.discard(shape)
+            return
+        columns, rows = self._span(box)
+        for cx in columns:
+            for cy in rows:
+                cell = self._cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(shape)
+                    if not cell:
+                        del self._cells[(cx, cy)]
+
+    def _span(self, box):
+        """
+        Gets the grid columns and rows a rectangle covers.
+
+        Args:
+            box (tuple): the (left, top, right, bottom) rectangle, right and bottom exclusive.
+
+        Returns:
+            tuple: ranges of the column and row numbers.
+        """
+
+        left, top, right, bottom = box
+        return range(left // self._cell_size, (right - 1) // self._cell_size + 1), range(top // self._cell_size, (bottom - 1) // self._cell_size + 1)
+
+    def _cellBox(self, cx, cy):
+        """
+        Gets the rectangle of a grid cell.
+
+        Args:
+            cx (int): the column of the cell.
+            cy (int): the row of the cell.
+
+        Returns:
+            tuple: the (left, top, right, bottom) rectangle, right and bottom exclusive.
+        """
+
+        return (cx * self._cell_size, cy * self._cell_size, (cx + 1) * self._cell_size, (cy + 1) * self._cell_size)
+
+    @staticmethod
+    def _hits(first, second):
+        """
+        A static method that checks if two rectangles overlap.
+
+        Args:
+            first (tuple): a (left, top, right, bottom) rectangle, right and bottom exclusive.
+            second (tuple): a (left, top, right, bottom) rectangle, right and bottom exclusive.
+
+        Returns:
+            bool: True if they share a pixel.
+        """
+
+        return first[0] < second[2] and first[2] > second[0] and first[1] < second[3] and first[3] > second[1]
+
+    @staticmethod
+    def _distance(box, x, y):
+        """
+        A static method that gets the distance from a pixel to the nearest pixel of a rectangle, 0 inside it.
+
+        Args:
+            box (tuple): the (left, top, right, bottom) rectangle, right and bottom exclusive.
+            x (int): the x of the pixel.
+            y (int): the y of the pixel.
+
+        Returns:
+            float: the distance in pixels.
+        """
+
+        dx = max(box[0] - x, 0, x - (box[2] - 1))
+        dy = max(box[1] - y, 0, y - (box[3] - 1))
+        return (dx * dx + dy * dy) ** 0.5
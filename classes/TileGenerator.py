@@ -1,33 +1,76 @@
+import copy
+import io
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from classes import config
+from classes.Animation import Animation
+from classes.Canvas import Canvas
+from classes.IndexedCanvas import IndexedCanvas
+from classes.Instrumentation import Instrumentation
+from classes.LargeCanvas import LargeCanvas
+from classes.NoiseFill import NoiseFill
+from classes.RenderCache import RenderCache
+from classes.ResidencyManager import ResidencyManager
+from classes.SaveQueue import SaveQueue
+from classes.SpatialIndex import SpatialIndex
 from PIL import Image, ImageDraw
 class TileGenerator:
     """
     A class to generate and save tile images with specified attributes.
 
     Attributes:
-        array (list of list): 2D array representing the tile.
-        background_color (tuple): The background color of the tile, if none is specified background will be transparent.
+        array (list of list): 2D array representing the tile, only built when asked for.
+        background_color (tuple): The background color of the tile, or a NoiseFill, if none is specified background will be transparent.
         line_color (tuple): The color used for lines in the tile.
         output_file (str): The name of the output file.
         output_directory (str): The directory where the output file will be saved.
+        canvas (bool): Whether pixels are kept in a NumPy backed Canvas and only turned into a PIL Image when needed.
+        profile (str): The encoding profile in config.ENCODING_PROFILES used when the tile is saved.
+        large (bool): Whether pixels live in a memory mapped LargeCanvas and are worked on a strip at a time, for tiles larger than RAM.
+        indexed (bool): Whether pixels are palette indices in an IndexedCanvas, so recoloring only changes the palette.
     """
 
-    def __init__(self, array =  [["."]*32 for _ in range(32)], background_color = None, line_color = None, output_file = "temp_output.png", output_directory = "temp_assets"):
+    DIHEDRAL_TRANSFORMS = {
+        "identity": (lambda pixels: pixels, None),
+        "rot90": (lambda pixels: np.rot90(pixels, 1), Image.Transpose.ROTATE_90),
+        "rot180": (lambda pixels: np.rot90(pixels, 2), Image.Transpose.ROTATE_180),
+        "rot270": (lambda pixels: np.rot90(pixels, 3), Image.Transpose.ROTATE_270),
+        "flipH": (lambda pixels: pixels[:, ::-1], Image.Transpose.FLIP_LEFT_RIGHT),
+        "flipV": (lambda pixels: pixels[::-1], Image.Transpose.FLIP_TOP_BOTTOM),
+        "transpose": (lambda pixels: pixels.swapaxes(0, 1), Image.Transpose.TRANSPOSE),
+        "transverse": (lambda pixels: np.rot90(pixels, 2).swapaxes(0, 1), Image.Transpose.TRANSVERSE),
+    }
+
+    def __init__(self, array = (32, 32), background_color = None, line_color = None, output_file = "temp_output.png", output_directory = "temp_assets", canvas = False, profile = "default", large = False, indexed = False):
         """
         Initializes a new TileGenerator object.
 
         Args:
-            array (list of list): 2D array representing the tile.
-            background_color (tuple): The background color of the tile.
+            array (tuple or list of list): (width, height) of the tile, a 2D array representing the tile is also accepted.
+            background_color (tuple): The background color of the tile, or a NoiseFill to fill it procedurally.
             line_color (tuple): The color used for lines in the tile.
             output_file (str): The name of the output file.
             output_directory (str): The directory where the output file will be saved.
+            canvas (bool): Whether pixels are kept in a NumPy backed Canvas, bulk writes are much faster on large tiles.
+            profile (str): The encoding profile, "default", "fast" for the quickest encode or "small" for the smallest file.
+            large (bool): Whether pixels live in a memory mapped LargeCanvas, implies canvas. Large tiles are saved strip by strip and only as .png or .bmp.
+            indexed (bool): Whether pixels are kept as indices into a palette of up to 256 colors, implies canvas. Recolors
+                and recolored copies then cost one pass over the palette. Ignored for large tiles.
         """
 
-        self._array = array if isinstance(array, list) else  [["."]*32 for _ in range(32)]
-        self._background_color = background_color if self.validateRGBA(background_color) else None
+        self._large = large if isinstance(large, bool) else False
+        self._indexed = indexed if isinstance(indexed, bool) and not self._large else False
+        self._canvas_enabled = canvas if isinstance(canvas, bool) else False
+        self._canvas_enabled = self._canvas_enabled or self._large or self._indexed
+        self._profile = profile if profile in config.ENCODING_PROFILES else "default"
+        self._canvas = None
+        self._residency = None
+        self._shapes = []
+        self._index = SpatialIndex()
+        self._size, self._array = self._parseArray(array)
+        self._background_color = background_color if self.validateColor(background_color) else None
         self._line_color = line_color if self.validateRGBA(line_color) else None
         self._output_file = output_file if isinstance(output_file, str) and output_file.endswith(tuple(config.VALID_IMG_FILE_EXT.keys())) else "temp_output.png"
         self._output_directory = os.path.join(os.getcwd(), output_directory) if isinstance(output_directory, str) else "temp_assets"
@@ -35,8 +78,7 @@ class TileGenerator:
             os.makedirs(self._output_directory)
         _, ext = os.path.splitext(self._output_file)
         mode = config.VALID_IMG_FILE_EXT.get(ext, "RGBA")
-        self._img = Image.new(mode, (len(array[0]) if array else 0, len(array)), self._background_color)
-        self._draw = ImageDraw.Draw(self._img)
+        self._newImage(mode, self._size)
 
         if self._background_color:
             self._applyBackground()
@@ -49,35 +91,39 @@ class TileGenerator:
             str: A description of the TileGenerator object.
         """
 
-        return f"A Tile represented with a 2D array {self._array}, it has {self._background_color} as a background and {self._line_color} for lines. it will be saved as {self._output_file} in {self._output_directory}."
+        return f"A {self._size[0]}x{self._size[1]} Tile, it has {self._background_color} as a background and {self._line_color} for lines. it will be saved as {self._output_file} in {self._output_directory}."
 
     @property
     def array(self):
         """
-        Gets the current array of the Tilegenerator
+        Gets the current array of the Tilegenerator, a grid of "." cells is built the first time it is asked for.
 
         Returns:
             list of list: The current array of Tilegenerator.
         """
 
+        if self._array is None:
+            self._array = [["."]*self._size[0] for _ in range(self._size[1])]
         return self._array
 
     @array.setter
+    @ResidencyManager.touches
     def array(self, array):
         """
-        Sets a new array for the Tilegenerator
+        Sets a new array for the Tilegenerator, the image is made again at the new size and the shapes are painted
+        again on it from their specs.
 
         Args:
-            array(list of list): new 2D array to replace old array value.
+            array(tuple or list of list): new (width, height), or 2D array, to replace old array value.
         """
 
-        self._array = array if isinstance(array, list) else [["."]*32]*32
+        self._size, self._array = self._parseArray(array)
         _, ext = os.path.splitext(self._output_file)
         mode = config.VALID_IMG_FILE_EXT.get(ext, "RGBA")
-        self._img = Image.new(mode, (len(array[0]) if array else 0, len(array)), self._background_color)
-        self._draw = ImageDraw.Draw(self._img)
+        self._newImage(mode, self._size)
         if self._background_color:
             self._applyBackground()
+        self._replayShapes()
 
     @property
     def background_color(self):
@@ -96,11 +142,21 @@ class TileGenerator:
         Sets a new background color for the Tilegenerator
 
         Args:
-            background_color(tuple): tuple of either RGB or RGBA value to replace current one.
+            background_color(tuple): tuple of either RGB or RGBA value, or a NoiseFill, to replace current one.
+                The shapes are repainted over it, an indexed tile whose old background color no shape uses only changes its palette.
+                A value that is not a color is rejected, the pixels and the background are left as they are.
         """
 
-        self._background_color = background_color if self.validateRGBA(background_color) else None
-        self._applyBackground()
+        if not self.validateColor(background_color):
+            raise ValueError(f"{background_color} must be an RGB or RGBA tuple of values between 0 and 255, or a NoiseFill")
+        old_color = self._background_color
+        self._background_color = background_color
+        if self.recolorSlot(old_color, self._background_color):
+            return
+        if self._shapes:
+            self.redrawRegion((0, 0) + self.getDimensions())
+        else:
+            self._applyBackground()
 
     @property
     def line_color(self):
@@ -136,9 +192,11 @@ class TileGenerator:
         return self._output_file
 
     @output_file.setter
+    @ResidencyManager.touches
     def output_file(self, output_file):
         """
-        Sets a new output file name for the Tilegenerator
+        Sets a new output file name for the Tilegenerator, the image is made again in the mode of the new extension
+        and the shapes are painted again on it from their specs.
 
         Args:
             output_file(string): A string containing the new name for the output file, must end in valid extension located in config file.
@@ -146,18 +204,14 @@ class TileGenerator:
 
         if isinstance(output_file, str) and output_file.endswith(tuple(config.VALID_IMG_FILE_EXT.keys())):
             self._output_file = output_file
-            _, ext = os.path.splitext(output_file)
-            mode = config.VALID_IMG_FILE_EXT.get(ext, "RGBA")
-            self._img = Image.new(mode, self._img.size, self._background_color)
-            self._draw = ImageDraw.Draw(self._img)
-            if self._background_color:
-                self._applyBackground()
         else:
             self._output_file = "temp_file.png"
-            _, ext = os.path.splitext(self._output_file)
-            mode = config.VALID_IMG_FILE_EXT.get(ext, "RGBA")
-            self._img = Image.new(mode, self._img.size, self._background_color)
-            self._draw = ImageDraw.Draw(self._img)
+        _, ext = os.path.splitext(self._output_file)
+        mode = config.VALID_IMG_FILE_EXT.get(ext, "RGBA")
+        self._newImage(mode, self.getDimensions())
+        if self._background_color:
+            self._applyBackground()
+        self._replayShapes()
 
     @property
     def output_directory(self):
@@ -183,6 +237,366 @@ class TileGenerator:
         if not os.path.exists(self._output_directory):
             os.makedirs(self._output_directory)
 
+    @property
+    def canvas(self):
+        """
+        Gets whether the Tilegenerator keeps its pixels in a NumPy backed Canvas.
+
+        Returns:
+            bool: True if a Canvas is used, False if pixels are written straight to the PIL Image.
+        """
+
+        return self._canvas_enabled
+
+    @property
+    def indexed(self):
+        """
+        Gets whether the Tilegenerator keeps its pixels as palette indices in an IndexedCanvas.
+
+        Returns:
+            bool: True if pixels are palette indices and recolors only change the palette.
+        """
+
+        return self._indexed
+
+    @property
+    def large(self):
+        """
+        Gets whether the Tilegenerator keeps its pixels in a memory mapped LargeCanvas.
+
+        Returns:
+            bool: True if the pixels live in a scratch file and are worked on a strip at a time.
+        """
+
+        return self._large
+
+    @property
+    def profile(self):
+        """
+        Gets the encoding profile of the Tilegenerator.
+
+        Returns:
+            str: The name of the profile in config.ENCODING_PROFILES.
+        """
+
+        return self._profile
+
+    @profile.setter
+    def profile(self, profile):
+        """
+        Sets a new encoding profile for the Tilegenerator, unknown profiles fall back to default.
+
+        Args:
+            profile(str): the name of a profile in config.ENCODING_PROFILES.
+        """
+
+        if profile in config.ENCODING_PROFILES:
+            self._profile = profile
+        else:
+            print(f"{profile} is not an encoding profile, choose from {', '.join(config.ENCODING_PROFILES)}.")
+            self._profile = "default"
+
+    @classmethod
+    def fromSpec(cls, spec):
+        """
+        Creates a TileGenerator from a dictionary holding the same fields the create prompts ask for,
+        as used by render manifests.
+
+        Args:
+            spec(dict): width, height, background_color, line_color, output_file, output_directory and optionally canvas, profile, large and indexed.
+
+        Returns:
+            TileGenerator: the new TileGenerator object.
+        """
+
+        if not isinstance(spec.get("width"), int) or not isinstance(spec.get("height"), int):
+            raise ValueError(f"width and height must be integers, got {spec.get('width')} and {spec.get('height')}")
+        return cls(array = (spec["width"], spec["height"]),
+                   background_color = cls.toColor(spec.get("background_color")),
+                   line_color = cls.toColor(spec.get("line_color")),
+                   output_file = spec.get("output_file", "temp_output.png"),
+                   output_directory = spec.get("output_directory", "temp_assets"),
+                   canvas = spec.get("canvas", False),
+                   profile = spec.get("profile", "default"),
+                   large = spec.get("large", False),
+                   indexed = spec.get("indexed", False))
+
+    def toSpec(self):
+        """
+        Describes the TileGenerator and the PixelShapes drawn on it, in drawing order, as a dictionary that fromSpec
+        and the batch renderer can rebuild the tile from.
+
+        Returns:
+            dict: the generator fields and a shapes list.
+        """
+
+        width, height = self.getDimensions()
+        return {"width": width, "height": height,
+                "background_color": self.colorToSpec(self._background_color),
+                "line_color": list(self._line_color) if self._line_color else None,
+                "output_file": self._output_file,
+                "output_directory": self._output_directory,
+                "canvas": self._canvas_enabled,
+                "profile": self._profile,
+                "large": self._large,
+                "indexed": self._indexed,
+                "shapes": [shape.toSpec() for shape in self._shapes]}
+
+    @ResidencyManager.touches
+    def getState(self):
+        """
+        Gets everything needed to restore the Tilegenerator exactly, pixels included, as used by Session.
+
+        Returns:
+            tuple: a dictionary of the generator fields and the (height, width, bands) uint8 pixel array, an indexed
+                tile gives its (height, width, 1) palette indices and keeps its palette in the fields.
+        """
+
+        width, height = self.getDimensions()
+        mode, pixels, palette = self._pixelState()
+        fields = {"width": width, "height": height, "mode": mode,
+                  "background_color": self.colorToSpec(self._background_color),
+                  "line_color": list(self._line_color) if self._line_color else None,
+                  "output_file": self._output_file, "output_directory": self._output_directory,
+                  "canvas": self._canvas_enabled, "profile": self._profile, "large": self._large, "indexed": self._indexed}
+        if self._indexed:
+            fields["palette"] = palette
+        return fields, pixels
+
+    @classmethod
+    def fromState(cls, fields, pixels):
+        """
+        Restores a Tilegenerator from getState without drawing anything. The pixel array is used as it is, so a copy on
+        write memory map is only read from disk when the tile is first used, a large tile copies it into its own scratch file.
+
+        Args:
+            fields(dict): the generator fields made by getState.
+            pixels(numpy.ndarray): the (height, width, bands) uint8 pixel array.
+
+        Returns:
+            TileGenerator: the restored TileGenerator object.
+        """
+
+        tile_generator = cls.__new__(cls)
+        tile_generator._large = fields["large"]
+        tile_generator._indexed = fields.get("indexed", False)
+        tile_generator._canvas_enabled = fields["canvas"]
+        tile_generator._profile = fields["profile"] if fields["profile"] in config.ENCODING_PROFILES else "default"
+        tile_generator._shapes = []
+        tile_generator._index = SpatialIndex()
+        tile_generator._size, tile_generator._array = (fields["width"], fields["height"]), None
+        tile_generator._background_color = cls.toColor(fields["background_color"])
+        tile_generator._line_color = cls.toColor(fields["line_color"])
+        tile_generator._output_file = fields["output_file"]
+        tile_generator._output_directory = fields["output_directory"]
+        os.makedirs(tile_generator._output_directory, exist_ok = True)
+        tile_generator._residency = None
+        tile_generator._restorePixels(fields["mode"], pixels, fields.get("palette"))
+        return tile_generator
+
+    def _pixelState(self):
+        """
+        A method used to get the pixel buffer of the tile as getState and ResidencyManager keep it.
+
+        Returns:
+            tuple: the image mode, the (height, width, bands) uint8 pixel array, or the (height, width, 1) palette
+                indices of an indexed tile, and the palette colors of an indexed tile or None.
+        """
+
+        if self._indexed:
+            return self._canvas.mode, self._canvas.indices[..., None], self._canvas.paletteColors()
+        if self._canvas is not None:
+            return self._canvas.mode, self._canvas.pixels, None
+        width, height = self._img.size
+        return self._img.mode, np.asarray(self._img).reshape(height, width, -1), None
+
+    def _restorePixels(self, mode, pixels, palette = None):
+        """
+        A method used to put the pixel buffer of _pixelState back without drawing anything, the array is used as it is
+        except by a large tile, which copies it into its own scratch file.
+
+        Args:
+            mode(str): the PIL image mode of the pixels.
+            pixels(numpy.ndarray): the (height, width, bands) uint8 pixel array, or (height, width, 1) palette indices.
+            palette(list): the palette colors of an indexed tile.
+        """
+
+        self._img = None
+        self._draw = None
+        if self._large:
+            self._canvas = LargeCanvas(mode, self._size, None, config.SCRATCH_DIRECTORY)
+            for top, bottom in self._canvas.strips():
+                self._canvas.pixels[top:bottom] = pixels[top:bottom]
+                self._canvas.release(top, bottom)
+        elif self._indexed:
+            self._canvas = IndexedCanvas.fromArray(mode, pixels[..., 0], palette)
+        elif self._canvas_enabled:
+            self._canvas = Canvas.fromArray(mode, pixels)
+        else:
+            self._canvas = None
+            self._img = Image.frombuffer(mode, self._size, pixels, "raw", mode, 0, 1)
+
+    def _dropPixels(self):
+        """
+        A method used to let go of the pixel buffers once ResidencyManager has spilled them, until they are restored
+        only the size of the tile is known.
+        """
+
+        self._canvas = None
+        self._img = None
+        self._draw = None
+
+    def _residentBytes(self):
+        """
+        A method used to get how many bytes of pixels the tile holds in memory, counting an image built from its Canvas.
+
+        Returns:
+            int: the size in bytes, 0 for a large tile whose pixels are memory mapped.
+        """
+
+        size = 0
+        if isinstance(self._canvas, IndexedCanvas):
+            size += self._canvas.indices.nbytes + self._canvas.palette.nbytes
+        elif self._canvas is not None and not self._large:
+            size += self._canvas.pixels.nbytes
+        if self._img is not None:
+            size += self._img.width * self._img.height * len(self._img.getbands())
+        return size
+
+    @property
+    def shapes(self):
+        """
+        Gets the PixelShapes drawn on the Tilegenerator.
+
+        Returns:
+            list of PixelShape: the shapes in the order they were added.
+        """
+
+        return list(self._shapes)
+
+    def addShape(self, shape):
+        """
+        Adds a PixelShape to the shapes of the Tilegenerator and its spatial index, PixelShape does this itself when created.
+
+        Args:
+            shape(PixelShape): the shape to add.
+        """
+
+        if shape not in self._index:
+            self._shapes.append(shape)
+            self._index.add(shape)
+
+    def removeShape(self, shape):
+        """
+        Removes a PixelShape from the shapes of the Tilegenerator, pixels already drawn are left as they are.
+
+        Args:
+            shape(PixelShape): the shape to remove.
+        """
+
+        if shape in self._index:
+            self._shapes.remove(shape)
+            self._index.remove(shape)
+
+    def updateShape(self, shape):
+        """
+        Tells the spatial index that a shape's painted pixels changed, PixelShape does this itself when drawn, edited or repeated.
+
+        Args:
+            shape(PixelShape): the shape that changed.
+        """
+
+        self._index.update(shape)
+
+    def shapesAt(self, x, y, exact = False):
+        """
+        Gets the shapes whose bounds hold a pixel, for hit testing.
+
+        Args:
+            x(int): the x of the pixel.
+            y(int): the y of the pixel.
+            exact(bool): if True only shapes that actually paint the pixel are kept.
+
+        Returns:
+            list of PixelShape: the shapes in the order they were added, the last one is drawn on top.
+        """
+
+        return self._index.shapesAt(x, y, exact)
+
+    def shapesIn(self, box):
+        """
+        Gets the shapes whose bounds overlap a rectangle.
+
+        Args:
+            box(tuple): the (left, top, right, bottom) rectangle, right and bottom exclusive.
+
+        Returns:
+            list of PixelShape: the shapes in the order they were added.
+        """
+
+        return self._index.shapesIn(box)
+
+    def nearestShape(self, x, y):
+        """
+        Gets the shape whose bounds are nearest to a pixel.
+
+        Args:
+            x(int): the x of the pixel.
+            y(int): the y of the pixel.
+
+        Returns:
+            PixelShape: the nearest shape, or None if no shape has painted anything.
+        """
+
+        return self._index.nearest(x, y)
+
+    @staticmethod
+    def toColor(color):
+        """
+        A static method that turns a color read from JSON, which arrives as a list, into the tuple form the rest of the classes use.
+        A dictionary describes a NoiseFill.
+
+        Args:
+            color(list or tuple or dict): the color to convert, None is passed through.
+
+        Returns:
+            tuple: the color as a tuple, a NoiseFill, or None.
+        """
+
+        if isinstance(color, dict):
+            return NoiseFill.fromSpec(color)
+        return tuple(color) if isinstance(color, (list, tuple)) else None
+
+    @staticmethod
+    def colorToSpec(color):
+        """
+        A static method that turns a color into the form it is written to JSON in, the reverse of toColor.
+
+        Args:
+            color(tuple or NoiseFill): the color to convert, None is passed through.
+
+        Returns:
+            list or dict: the color as a list, the dictionary of a NoiseFill, or None.
+        """
+
+        if isinstance(color, NoiseFill):
+            return color.toSpec()
+        return list(color) if color else None
+
+    @staticmethod
+    def validateColor(color):
+        """
+        A static method that checks if a value can be painted with, an RGB or RGBA tuple or a NoiseFill.
+
+        Args:
+            color(tuple or NoiseFill): the value to check.
+
+        Returns:
+            bool: True if the value is a valid color or a NoiseFill, False otherwise.
+        """
+
+        return isinstance(color, NoiseFill) or TileGenerator.validateRGBA(color)
+
     @staticmethod
     def validateRGBA(rgba):
         """
@@ -197,15 +611,294 @@ class TileGenerator:
 
         return isinstance(rgba, tuple) and (3 <= len(rgba) <= 4) and all(isinstance(c, int) and 0 <= c <= 255 for c in rgba)
 
+    @staticmethod
+    def _parseArray(array):
+        """
+        A static method that reads the size out of an array argument without building any cells.
+
+        Args:
+            array(tuple or list of list): a (width, height) pair or a 2D array.
+
+        Returns:
+            tuple: the (width, height) and the 2D array if one was given, otherwise None. Anything else gives 32x32.
+        """
+
+        if isinstance(array, (tuple, list)) and len(array) == 2 and all(isinstance(value, int) and not isinstance(value, bool) and value >= 0 for value in array):
+            return (array[0], array[1]), None
+        if isinstance(array, list):
+            return (len(array[0]) if array else 0, len(array)), array
+        return (32, 32), None
+
+    def _newImage(self, mode, size):
+        """
+        A method used to create a fresh image, or Canvas when canvas is flagged, for the class object.
+
+        Args:
+            mode(str): the PIL image mode of the new image.
+            size(tuple): the (width, height) of the new image.
+        """
+
+        if self._large:
+            self._canvas = LargeCanvas(mode, size, self._flatBackground(), config.SCRATCH_DIRECTORY)
+            self._img = None
+            self._draw = None
+        elif self._indexed:
+            self._canvas = IndexedCanvas(mode, size, self._flatBackground())
+            self._img = None
+            self._draw = None
+        elif self._canvas_enabled:
+            self._canvas = Canvas(mode, size, self._flatBackground())
+            self._img = None
+            self._draw = None
+        else:
+            self._canvas = None
+            self._img = Image.new(mode, size, self._flatBackground())
+            self._draw = ImageDraw.Draw(self._img)
+
+    def _replayShapes(self):
+        """
+        A method used to paint the shapes again, in the order they were added, on an image that was just made fresh.
+        Every shape is rebuilt from its own spec, so the pixels stay what toSpec and cacheKey describe.
+        """
+
+        for shape in list(self._shapes):
+            shape._replay()
+
+    def _flatBackground(self):
+        """
+        A method used to get the background color a fresh image can be created with, a NoiseFill has to be painted after.
+
+        Returns:
+            tuple: the background color, or None if there is none or it is a NoiseFill.
+        """
+
+        return self._background_color if self.validateRGBA(self._background_color) else None
+
+    @ResidencyManager.touches
+    def getImage(self):
+        """
+        A method to get the PIL Image of the Tilegenerator object. When canvas is flagged the Image is built from
+        the Canvas on first request and reused until the next pixel write. For a large tile this builds the whole image
+        in memory, saveImage streams it instead.
+
+        Returns:
+            Image: the PIL Image of the Tilegenerator.
+        """
+
+        if self._canvas is not None and self._img is None:
+            self._img = self._canvas.toImage()
+        return self._img
+
+    def getDimensions(self):
+        """
+        A method to get the width and height of the Tilegenerator object.
+
+        Returns:
+            tuple: the (width, height) of the image.
+        """
+
+        if self._canvas is not None:
+            return self._canvas.size
+        if self._img is not None:
+            return self._img.size
+        return self._size
+
+    @ResidencyManager.touches
+    def putPixels(self, coords, color):
+        """
+        Writes one color to every coordinate given, in bulk when canvas is flagged. With a NoiseFill every pixel gets
+        the color of the fill at its position.
+
+        Args:
+            coords(list of tuples): the (x, y) coordinates to write, an (n, 2) array is also accepted.
+            color(tuple): the RGB or RGBA color to write, or a NoiseFill.
+        """
+
+        width, height = self.getDimensions()
+        if self._canvas is not None:
+            coords = (coords if isinstance(coords, np.ndarray) else np.asarray(coords, dtype = np.int64)).reshape(-1, 2)
+            for start in range(0, len(coords), config.REPEAT_CHUNK_SIZE):
+                chunk = coords[start:start + config.REPEAT_CHUNK_SIZE].astype(np.int64)
+                colors = color.colorsAt(chunk[:, 0] % width, chunk[:, 1] % height) if isinstance(color, NoiseFill) else color
+                self._canvas.putPixels(chunk[:, 0], chunk[:, 1], colors)
+            self._img = None
+        elif isinstance(color, NoiseFill):
+            coords = np.asarray(coords, dtype = np.int64).reshape(-1, 2)
+            bands = len(self._img.getbands())
+            colors = color.colorsAt(coords[:, 0] % max(width, 1), coords[:, 1] % max(height, 1))[:, :bands].tolist()
+            for (x, y), pixel in zip(coords.tolist(), colors):
+                self._img.putpixel((x, y), tuple(pixel))
+        else:
+            for x, y in coords:
+                self._img.putpixel((int(x), int(y)), color)
+
+    @ResidencyManager.touches
+    def fillMask(self, left, top, mask, color, box = None):
+        """
+        Writes one color to every pixel set in a boolean mask placed with its top left corner at (left, top), the mask
+        is clipped to the image so primitives can hang over its edges.
+
+        Args:
+            left(int): the x the first mask column lands on.
+            top(int): the y the first mask row lands on.
+            mask(numpy.ndarray): a (height, width) boolean array of the pixels to write.
+            color(tuple): the RGB or RGBA color to write, or a NoiseFill.
+            box(tuple): if given, only pixels inside this (left, top, right, bottom) rectangle are changed.
+        """
+
+        width, height = self.getDimensions()
+        clip = box if box else (0, 0, width, height)
+        x0, y0 = max(left, clip[0], 0), max(top, clip[1], 0)
+        x1, y1 = min(left + mask.shape[1], clip[2], width), min(top + mask.shape[0], clip[3], height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = mask[y0 - top:y1 - top, x0 - left:x1 - left]
+        if isinstance(color, NoiseFill):
+            color = color.render((x0, y0, x1, y1))
+        if self._canvas is not None:
+            self._canvas.fillMask(x0, y0, mask, color)
+            self._img = None
+            if self._large:
+                self._canvas.release(y0, y1)
+        elif isinstance(color, np.ndarray):
+            colors = Image.frombytes(self._img.mode, (x1 - x0, y1 - y0), np.ascontiguousarray(color[..., :len(self._img.getbands())]).tobytes())
+            self._img.paste(colors, (x0, y0), Image.fromarray(mask.astype(np.uint8) * 255, "L"))
+        else:
+            self._img.paste(color, (x0, y0, x1, y1), Image.fromarray(mask.astype(np.uint8) * 255, "L"))
+
+    @ResidencyManager.touches
+    def drawEllipses(self, coords, radius, color, box = None):
+        """
+        Draws a filled ellipse centered on every coordinate given.
+
+        Args:
+            coords(list of tuples): the (x, y) centers of the ellipses.
+            radius(int): the radius of each ellipse.
+            color(tuple): the RGB or RGBA color to fill with, or a NoiseFill.
+            box(tuple): if given, only pixels inside this (left, top, right, bottom) rectangle are changed.
+        """
+
+        left, top, right, bottom = box if box else (0, 0) + self.getDimensions()
+        if self._large and (len(coords) > config.REPEAT_CHUNK_SIZE or bottom - top > self._canvas.strip_rows):
+            coords = coords if isinstance(coords, np.ndarray) else np.asarray(coords, dtype = np.int64).reshape(-1, 2)
+            for start in range(0, len(coords), config.REPEAT_CHUNK_SIZE):
+                chunk = coords[start:start + config.REPEAT_CHUNK_SIZE].astype(np.int64)
+                ys = chunk[:, 1]
+                for strip_top, strip_bottom in self._canvas.strips(top, bottom):
+                    near = (ys + radius >= strip_top) & (ys - radius < strip_bottom)
+                    if near.any():
+                        self.drawEllipses(chunk[near], radius, color, (left, strip_top, right, strip_bottom))
+            return
+        if isinstance(color, NoiseFill) or self._indexed:
+            mask = Image.new("L", (right - left, bottom - top), 0)
+            draw = ImageDraw.Draw(mask)
+            for x, y in np.asarray(coords, dtype = np.int64).reshape(-1, 2).tolist():
+                x, y = x - left, y - top
+                draw.ellipse([x - radius, y - radius , x + radius, y + radius], fill = 255)
+            self.fillMask(left, top, np.asarray(mask) > 0, color, (left, top, right, bottom))
+            return
+        if self._canvas is not None:
+            region = self._canvas.pixels[top:bottom, left:right]
+            img = Image.frombytes(self._canvas.mode, (right - left, bottom - top), region.tobytes())
+        else:
+            img = self._img.crop((left, top, right, bottom)) if box else self._img
+        draw = ImageDraw.Draw(img)
+        for x, y in np.asarray(coords, dtype = np.int64).reshape(-1, 2).tolist():
+            x, y = x - left, y - top
+            draw.ellipse([x - radius, y - radius , x + radius, y + radius], fill = color)
+        if self._canvas is not None:
+            region[...] = np.asarray(img).reshape(region.shape)
+            self._img = None
+            if self._large:
+                self._canvas.release(top, bottom)
+        elif box:
+            self._img.paste(img, (left, top))
+
+    @Instrumentation.track("TileGenerator.redrawRegion")
+    @ResidencyManager.touches
+    def redrawRegion(self, box):
+        """
+        Repaints a rectangle of the image from the background and every shape whose bounds touch it, found through the
+        spatial index, in the order the shapes were added, leaving the rest of the image untouched.
+
+        Args:
+            box(tuple): the (left, top, right, bottom) rectangle to repaint, right and bottom exclusive, None repaints nothing.
+        """
+
+        if box is None:
+            return
+        width, height = self.getDimensions()
+        box = (max(box[0], 0), max(box[1], 0), min(box[2], width), min(box[3], height))
+        if box[0] >= box[2] or box[1] >= box[3]:
+            return
+        left, top, right, bottom = box
+        if self._large and bottom - top > self._canvas.strip_rows:
+            for strip_top, strip_bottom in self._canvas.strips(top, bottom):
+                self.redrawRegion((left, strip_top, right, strip_bottom))
+            return
+        if Instrumentation.enabled:
+            Instrumentation.count("TileGenerator.redrawRegion", pixels = (right - left) * (bottom - top))
+        self._fillBox(box, self._background_color or (0, 0, 0, 0))
+        for shape in self._index.shapesIn(box):
+            shape._paint(box)
+        if self._large:
+            self._canvas.release(top, bottom)
+
+    @staticmethod
+    def unionBox(first, second):
+        """
+        A static method that gets the smallest rectangle covering two rectangles.
+
+        Args:
+            first(tuple): a (left, top, right, bottom) rectangle or None.
+            second(tuple): a (left, top, right, bottom) rectangle or None.
+
+        Returns:
+            tuple: the covering rectangle, or None if both are None.
+        """
+
+        if first is None:
+            return second
+        if second is None:
+            return first
+        return (min(first[0], second[0]), min(first[1], second[1]), max(first[2], second[2]), max(first[3], second[3]))
+
+    @Instrumentation.track("TileGenerator._applyBackground")
+    @ResidencyManager.touches
     def _applyBackground(self):
         """
         A method used to apply the background color to the class object.
         """
 
+        if self.background_color and Instrumentation.enabled:
+            width, height = self.getDimensions()
+            Instrumentation.count("TileGenerator._applyBackground", pixels = width * height)
+
         if self.background_color:
-            for y, row in enumerate(self._array):
-                for x, pixel in enumerate(row):
-                    self._img.putpixel((x, y), self.background_color)
+            self._fillBox((0, 0) + self.getDimensions(), self.background_color)
+
+    def _fillBox(self, box, color):
+        """
+        A method used to paint a whole rectangle of the image with a color or a NoiseFill, a strip at a time on a large tile.
+
+        Args:
+            box(tuple): the (left, top, right, bottom) rectangle to paint, right and bottom exclusive.
+            color(tuple): the RGB or RGBA color to paint, or a NoiseFill.
+        """
+
+        left, top, right, bottom = box
+        if isinstance(color, NoiseFill):
+            strips = self._canvas.strips(top, bottom) if self._large else [(top, bottom)]
+            for strip_top, strip_bottom in strips:
+                self.fillMask(left, strip_top, np.ones((strip_bottom - strip_top, right - left), dtype = bool), color)
+        elif self._canvas is not None:
+            if box == (0, 0) + self._canvas.size:
+                self._canvas.fill(color)
+            else:
+                self._canvas.fillMask(left, top, np.ones((bottom - top, right - left), dtype = bool), color)
+            self._img = None
+        else:
+            self._img.paste(color, box)
 
     def getSize(self):
         """
@@ -215,25 +908,589 @@ class TileGenerator:
             int: the highest of the two values between width and height.
         """
 
-        return max(self._img.size)
+        return max(self.getDimensions())
 
-    def saveImage(self, multiples = False, count = 1):
+    @Instrumentation.track("TileGenerator.saveImage")
+    @ResidencyManager.touches
+    def saveImage(self, multiples = False, count = 1, variants = False, seed = None, jobs = None, cache = None, scales = None, mips = False):
         """
-        Saves the image with an optional of multiples saved and how many.
+        Saves the image with an optional of multiples saved and how many. Copies of the same pixels are only encoded once.
+        Other display densities and a mip chain can be saved alongside, all derived from the one rendered image.
 
         Args:
             multiples(bool): a boolean expression True or False to determine if more than one copies being saved.
             count(int): how many copies of the image that will be saved.
+            variants(bool): if True every copy is rendered again from the shapes with its own random cut, copies are
+                rendered and encoded in worker processes. Without any randomly cut shape the copies are identical.
+            seed(int): seed the per copy random cuts are derived from, the same seed always gives the same variants.
+            jobs(int): how many worker processes render variants, or threads encode scales and mips, if None one per core is used.
+            cache(RenderCache): if given, the encoded bytes are looked up by cacheKey and encoding is skipped on a hit.
+            scales(list of int): the nearest neighbor scales to save, named as config.SCALED_FILE_NAME, 1 is output_file itself.
+            mips(bool): whether the mip chain below output_file is saved, named as config.MIP_FILE_NAME.
         """
 
         if not isinstance(count, int) or count < 1 or not isinstance(multiples, bool):
             raise ValueError(f"{count} must be greater than or equal to 1 and {multiples} must be True or False")
 
-        if multiples:
+        if scales is not None or mips:
+            if self._large:
+                raise ValueError("large tiles are streamed to disk by saveImage, they can not be scaled")
+            if multiples and variants and any(shape.hasRandomCut() for shape in self._shapes):
+                raise ValueError("scales and mips are derived from one render, they can not be saved with per copy variants")
+            names = self._saveDerived(scales if scales is not None else [1], mips, multiples, count, jobs, cache)
+        elif self._large:
+            self._saveStreamed(multiples, count)
+        elif multiples and variants and any(shape.hasRandomCut() for shape in self._shapes):
+            self._saveVariants(count, seed, jobs, cache if seed is not None else None)
+        elif multiples:
+            data = self._encodeCached(cache)
             for i in range(1, count + 1):
-                self._img.save(os.path.join(self.output_directory, f"{i}_{self.output_file}"))
+                with open(os.path.join(self.output_directory, f"{i}_{self.output_file}"), "wb") as output:
+                    output.write(data)
+        elif cache is not None:
+            with open(os.path.join(self.output_directory, self.output_file), "wb") as output:
+                output.write(self._encodeCached(cache))
         else:
-            self._img.save(os.path.join(self.output_directory, self.output_file))
+            with open(os.path.join(self.output_directory, self.output_file), "wb") as output:
+                output.write(self.encodeImage())
+        if Instrumentation.enabled:
+            if scales is None and not mips:
+                names = [f"{i}_{self.output_file}" for i in range(1, count + 1)] if multiples else [self.output_file]
+            Instrumentation.count("TileGenerator.saveImage", bytes_written = sum(os.path.getsize(os.path.join(self.output_directory, name)) for name in names))
+
+    @ResidencyManager.touches
+    def dihedralVariants(self, transforms = None):
+        """
+        Rotates and flips the rendered pixels into any of the 8 dihedral variants without drawing a shape again.
+        Variants whose pixels equal an earlier one, as a symmetric tile gives, are left out. Indexed PNG tiles are
+        transformed as palette images.
+
+        Args:
+            transforms(list of str): names from TileGenerator.DIHEDRAL_TRANSFORMS, if None all eight in that order.
+
+        Returns:
+            dict: the Image of every distinct variant by transform name, and for every duplicate the name of the
+                variant it equals, in the order of DIHEDRAL_TRANSFORMS.
+        """
+
+        transforms = list(self.DIHEDRAL_TRANSFORMS) if transforms is None else transforms
+        unknown = [name for name in transforms if name not in self.DIHEDRAL_TRANSFORMS]
+        if unknown:
+            raise ValueError(f"{', '.join(map(str, unknown))} must be one of {', '.join(self.DIHEDRAL_TRANSFORMS)}")
+        if self._large:
+            raise ValueError("large tiles are streamed to disk by saveImage, they can not be rotated or flipped")
+        if self._indexed:
+            pixels = self._canvas.indices
+        else:
+            pixels = self._canvas.pixels if self._canvas is not None else np.asarray(self.getImage())
+        source = (self._canvas.toIndexedImage() if self._indexed and self.output_file.lower().endswith(".png") else None) or self.getImage()
+        variants = {}
+        views = {}
+        for name in [name for name in self.DIHEDRAL_TRANSFORMS if name in transforms]:
+            turn, method = self.DIHEDRAL_TRANSFORMS[name]
+            view = turn(pixels)
+            variants[name] = next((other for other, kept in views.items() if kept.shape == view.shape and np.array_equal(kept, view)), None)
+            if variants[name] is None:
+                views[name] = view
+                variants[name] = source if method is None else source.transpose(method)
+        return variants
+
+    @Instrumentation.track("TileGenerator.saveDihedral")
+    def saveDihedral(self, transforms = None, jobs = None):
+        """
+        Saves the distinct dihedral variants of dihedralVariants, named as config.DIHEDRAL_FILE_NAME with identity being
+        output_file itself, and encoded on a thread pool. Duplicates are not written.
+
+        Args:
+            transforms(list of str): names from TileGenerator.DIHEDRAL_TRANSFORMS, if None all eight.
+            jobs(int): how many threads encode variants, if None one per core is used.
+
+        Returns:
+            dict: the path of every transform, a duplicate gets the path of the variant it equals.
+        """
+
+        variants = self.dihedralVariants(transforms)
+        stem, ext = os.path.splitext(self.output_file)
+        names = {name: self.output_file if name == "identity" else config.DIHEDRAL_FILE_NAME.format(stem = stem, transform = name, ext = ext) for name in variants}
+        distinct = [name for name, img in variants.items() if not isinstance(img, str)]
+        with ThreadPoolExecutor(max_workers = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)) as executor:
+            encoded = list(executor.map(lambda name: self.encodeAs(variants[name], self.output_file, self._profile), distinct))
+        for name, data in zip(distinct, encoded):
+            with open(os.path.join(self.output_directory, names[name]), "wb") as output:
+                output.write(data)
+        if Instrumentation.enabled:
+            Instrumentation.count("TileGenerator.saveDihedral", bytes_written = sum(len(data) for data in encoded))
+        return {name: os.path.join(self.output_directory, names[variants[name] if isinstance(variants[name], str) else name]) for name in variants}
+
+    @ResidencyManager.touches
+    def derivedImages(self, scales = (1,), mips = False):
+        """
+        Derives every output size from the one rendered image, integer scales repeat every pixel and each mip level
+        halves the level above it with a box filter down to a single pixel. Indexed PNG tiles are scaled as palette images.
+
+        Args:
+            scales(list of int): the nearest neighbor scales, 1 is the image itself.
+            mips(bool): whether the mip levels below the image are added.
+
+        Returns:
+            dict: the Image of every output file name, in the order they are named.
+        """
+
+        if not isinstance(scales, (list, tuple)) or not all(isinstance(scale, int) and not isinstance(scale, bool) and scale >= 1 for scale in scales):
+            raise ValueError(f"{scales} must be a list of whole numbers greater than or equal to 1")
+        stem, ext = os.path.splitext(self.output_file)
+        img = self.getImage()
+        source = (self._canvas.toIndexedImage() if self._indexed and ext.lower() == ".png" else None) or img
+        width, height = img.size
+        images = {}
+        for scale in dict.fromkeys(scales):
+            name = self.output_file if scale == 1 else config.SCALED_FILE_NAME.format(stem = stem, scale = scale, ext = ext)
+            images[name] = source if scale == 1 else source.resize((width * scale, height * scale), Image.NEAREST)
+        level = 0
+        while mips and (width > 1 or height > 1):
+            level += 1
+            width, height = max(1, width // 2), max(1, height // 2)
+            img = img.resize((width, height), Image.BOX)
+            images[config.MIP_FILE_NAME.format(stem = stem, level = level, ext = ext)] = img
+        return images
+
+    def _saveDerived(self, scales, mips, multiples, count, jobs, cache):
+        """
+        Saves the derived sizes of derivedImages, encoded on a thread pool. The image itself is looked up in the cache
+        when one is given, copies of every size are only encoded once.
+
+        Args:
+            scales(list of int): the nearest neighbor scales to save.
+            mips(bool): whether the mip chain is saved.
+            multiples(bool): whether count copies of every size are saved as {i}_{name}.
+            count(int): how many copies are saved when multiples is True.
+            jobs(int): how many threads encode, if None one per core is used.
+            cache(RenderCache): cache the image itself is looked up in and added to, or None.
+
+        Returns:
+            list of str: the names of the written files.
+        """
+
+        images = self.derivedImages(scales, mips)
+        names = list(images)
+        with ThreadPoolExecutor(max_workers = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)) as executor:
+            encoded = list(executor.map(lambda name: self._encodeCached(cache) if name == self.output_file else self.encodeAs(images[name], name, self._profile), names))
+        written = []
+        for name, data in zip(names, encoded):
+            for copy_name in ([f"{i}_{name}" for i in range(1, count + 1)] if multiples else [name]):
+                with open(os.path.join(self.output_directory, copy_name), "wb") as output:
+                    output.write(data)
+                written.append(copy_name)
+        return written
+
+    def _saveStreamed(self, multiples, count):
+        """
+        Writes a large tile strip by strip as a PNG or BMP, copies are written once and then copied file to file.
+
+        Args:
+            multiples(bool): whether count copies are saved as {i}_{output_file}.
+            count(int): how many copies are saved when multiples is True.
+        """
+
+        _, ext = os.path.splitext(self.output_file)
+        ext = ext.lower()
+        if ext not in (".png", ".bmp"):
+            raise ValueError(f"large tiles can only be saved as .png or .bmp, not {ext}")
+        names = [f"{i}_{self.output_file}" for i in range(1, count + 1)] if multiples else [self.output_file]
+        paths = [os.path.join(self.output_directory, name) for name in names]
+        if ext == ".png":
+            options = config.ENCODING_PROFILES.get(self._profile, {}).get(ext, {})
+            self._canvas.writePNG(paths[0], options.get("compress_level", 9 if options.get("optimize") else 6))
+        else:
+            self._canvas.writeBMP(paths[0])
+        for path in paths[1:]:
+            shutil.copyfile(paths[0], path)
+
+    @ResidencyManager.touches
+    def cacheKey(self):
+        """
+        A method to get the RenderCache key of the Tilegenerator, made from its size, background, output format and shapes.
+        An indexed tile adds its palette, whose slot order decides the bytes of its palette PNG.
+
+        Returns:
+            str: the key, or None if a shape has an unseeded random cut.
+        """
+
+        spec = self.toSpec()
+        if self._indexed:
+            spec["palette"] = self._canvas.paletteColors()
+        return RenderCache.keyFor(spec)
+
+    def _encodeCached(self, cache):
+        """
+        Encodes the image, reusing and filling the cache when one is given.
+
+        Args:
+            cache(RenderCache): the cache to use, or None.
+
+        Returns:
+            bytes: the encoded image file.
+        """
+
+        key = self.cacheKey() if cache is not None else None
+        data = cache.get(key) if key is not None else None
+        if data is None:
+            data = self.encodeImage()
+            if key is not None:
+                cache.put(key, data)
+        return data
+
+    @ResidencyManager.touches
+    def encodeImage(self):
+        """
+        Encodes the image in the format of the output file extension with the encoding profile of the Tilegenerator.
+
+        Returns:
+            bytes: the encoded image file.
+        """
+
+        return self.encodeAs(self._encodeSource(), self.output_file, self._profile)
+
+    @ResidencyManager.touches
+    def _encodeSource(self):
+        """
+        Gets the image encodeImage encodes, an indexed tile saved as PNG gives its P mode image so the palette is kept.
+
+        Returns:
+            Image: the image to encode, it may share the pixels of the Tilegenerator.
+        """
+
+        if self._indexed and self.output_file.lower().endswith(".png"):
+            return self._canvas.toIndexedImage() or self.getImage()
+        return self.getImage()
+
+    @staticmethod
+    def encodeAs(img, output_file, profile = "default"):
+        """
+        A static method that encodes an image in the format of a file name's extension with the options of an encoding profile.
+
+        Args:
+            img(Image): the image to encode.
+            output_file(str): the file name whose extension picks the format.
+            profile(str): the name of a profile in config.ENCODING_PROFILES.
+
+        Returns:
+            bytes: the encoded image file.
+        """
+
+        _, ext = os.path.splitext(output_file)
+        ext = ext.lower()
+        options = dict(config.ENCODING_PROFILES.get(profile, {}).get(ext, {}))
+        if options.pop("palette", False):
+            img = TileGenerator.toPalette(img, ext) or img
+        buffer = io.BytesIO()
+        img.save(buffer, format = Image.registered_extensions()[ext], **options)
+        return buffer.getvalue()
+
+    @staticmethod
+    def toPalette(img, ext):
+        """
+        A static method that turns an RGB or RGBA image with 256 colors or fewer into a P mode image holding exactly the same pixels.
+        Transparency is kept as a per color alpha table in PNG and as a single fully transparent color in GIF, BMP has none.
+
+        Args:
+            img(Image): the image to convert.
+            ext(str): the lower case output extension, it decides which transparency can be kept.
+
+        Returns:
+            Image: the P mode image, or None when the image has too many colors or transparency the format can not hold.
+        """
+
+        if img.mode not in ("RGB", "RGBA") or img.getcolors(256) is None:
+            return None
+        pixels = np.asarray(img.convert("RGBA"))
+        packed = pixels.view(np.uint32).reshape(pixels.shape[:2])
+        colors = np.unique(packed)
+        palette = colors.view(np.uint8).reshape(-1, 4)
+        alpha = palette[:, 3]
+        if ext == ".gif":
+            transparent = np.flatnonzero(alpha == 0)
+            if len(transparent) > 1 or np.any((alpha != 0) & (alpha != 255)):
+                return None
+        elif ext != ".png" and np.any(alpha != 255):
+            return None
+        indexed = Image.fromarray(np.searchsorted(colors, packed).astype(np.uint8), "P")
+        indexed.putpalette(palette[:, :3].tobytes())
+        if ext == ".png" and np.any(alpha != 255):
+            indexed.info["transparency"] = alpha.tobytes()
+        elif ext == ".gif" and len(transparent):
+            indexed.info["transparency"] = int(transparent[0])
+        return indexed
+
+    def saveImageAsync(self, multiples = False, count = 1, queue = None):
+        """
+        Queues a save of the current pixels on a background writer and returns at once, the tile can keep being drawn on.
+
+        Args:
+            multiples(bool): a boolean expression True or False to determine if more than one copies being saved.
+            count(int): how many copies of the image that will be saved.
+            queue(SaveQueue): the queue to use, if None the shared queue flushed at interpreter exit is used.
+
+        Returns:
+            Future: resolves to the list of written paths, or raises the error of the save.
+        """
+
+        if self._large:
+            raise ValueError("large tiles are streamed to disk by saveImage, they can not be snapshotted for a background save")
+        return (queue or SaveQueue.default()).submit(self, multiples, count)
+
+    def _saveVariants(self, count, seed, jobs, cache = None):
+        """
+        Renders count copies of the tile from its shapes, each copy with its own deterministic random cut seeds,
+        and saves them as {i}_{output_file}.
+
+        Args:
+            count(int): how many variants to save.
+            seed(int): seed the per copy seeds are derived from, if None new variants are made every time.
+            jobs(int): how many worker processes to use, if None one per core is used.
+            cache(RenderCache): cache the variants are looked up in and added to, or None.
+        """
+
+        from .BatchRenderer import BatchRenderer
+
+        specs = self._variantSpecs(count, seed)
+        for i, variant in enumerate(specs, start = 1):
+            variant["name"] = f"{i}_{self.output_file}"
+            variant["output_file"] = f"{i}_{self.output_file}"
+        failures = [result for result in BatchRenderer(specs, jobs, cache).run() if result["error"]]
+        if failures:
+            raise RuntimeError(f"{len(failures)} variants failed, first error {failures[0]['name']}: {failures[0]['error']}")
+
+    @staticmethod
+    def colorKey(color):
+        """
+        A static method that gets the RGBA form of a color, so RGB and RGBA colors that paint the same pixels compare equal.
+
+        Args:
+            color(tuple): an RGB or RGBA color.
+
+        Returns:
+            tuple: the RGBA color, or None if color is not a valid RGB or RGBA tuple.
+        """
+
+        return tuple(color) + (255,) * (4 - len(color)) if TileGenerator.validateRGBA(color) else None
+
+    @ResidencyManager.touches
+    def recolorSlot(self, old_color, new_color, owner = None):
+        """
+        Recolors the pixels of one color by changing the palette of an indexed tile, which costs one pass over the palette.
+        It only happens when nothing but owner painted the old color: no other shape, no cut, no NoiseFill and, unless
+        owner is None for the background itself, not the background.
+
+        Args:
+            old_color(tuple): the color the pixels were painted with.
+            new_color(tuple): the color they should show.
+            owner(PixelShape): the shape changing color, or None when the background is.
+
+        Returns:
+            bool: True if the palette was changed, False if the tile has to be repainted instead.
+        """
+
+        old_key = self.colorKey(old_color)
+        if not self._indexed or old_key is None or self.colorKey(new_color) is None:
+            return False
+        used = [shape.color for shape in self._shapes if shape is not owner]
+        used += [color for shape in self._shapes for _, color in shape._cuts if color is not None]
+        if owner is not None:
+            used.append(self._background_color or (0, 0, 0, 0))
+        if any(self.colorKey(color) in (old_key, None) for color in used if color is not None):
+            return False
+        self._canvas.recolor({old_color: new_color})
+        self._img = None
+        return True
+
+    @ResidencyManager.touches
+    def recolor(self, mapping):
+        """
+        Replaces colors across the tile, the background, shape colors, cut colors and the palettes of NoiseFills that
+        match are changed. An indexed tile only changes its palette, any other tile, or an indexed one with a smooth
+        NoiseFill, is repainted from its shapes.
+
+        Args:
+            mapping(dict): new RGB or RGBA color tuples by the old color tuples they replace.
+        """
+
+        mapping = {self.colorKey(old): tuple(new) for old, new in mapping.items() if self.colorKey(old) and self.validateRGBA(new)}
+        fills = [color for color in [self._background_color] + [shape.color for shape in self._shapes] if isinstance(color, NoiseFill)]
+        self._background_color = self._recolored(self._background_color, mapping)
+        for shape in self._shapes:
+            shape._color = self._recolored(shape._color, mapping)
+            shape._cuts = [(coords, self._recolored(color, mapping)) for coords, color in shape._cuts]
+        if self._indexed and not any(fill.smooth for fill in fills):
+            self._canvas.recolor(mapping)
+            self._img = None
+        else:
+            self.redrawRegion((0, 0) + self.getDimensions())
+
+    @ResidencyManager.touches
+    def recolorVariants(self, mappings):
+        """
+        Makes a recolored copy of an indexed tile for every mapping, such as team colors or seasons, without redrawing
+        or changing the tile. Every copy costs one pass over the palette, the pixels are shared.
+
+        Args:
+            mappings(list of dict): for every copy, new RGB or RGBA color tuples by the old color tuples they replace.
+
+        Returns:
+            list of Image: the copies, P mode images sharing the indices for RGB and RGBA tiles.
+        """
+
+        if not self._indexed:
+            raise ValueError("recolored copies need an indexed tile, create it with indexed = True")
+        images = []
+        for mapping in mappings:
+            palette = self._canvas.recolored(mapping)
+            images.append(self._canvas.toIndexedImage(palette) or self._canvas.toImage(palette))
+        return images
+
+    @Instrumentation.track("TileGenerator.saveRecolors")
+    def saveRecolors(self, mappings, jobs = None):
+        """
+        Saves a recolored copy of an indexed tile for every mapping as {i}_{output_file}, encoded on a thread pool.
+
+        Args:
+            mappings(list of dict): for every copy, new RGB or RGBA color tuples by the old color tuples they replace.
+            jobs(int): how many threads encode copies, if None one per core is used.
+
+        Returns:
+            list of str: the written paths.
+        """
+
+        images = self.recolorVariants(mappings)
+        if not self.output_file.lower().endswith(".png"):
+            images = [img.convert(self._canvas.mode) if img.mode == "P" else img for img in images]
+        with ThreadPoolExecutor(max_workers = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)) as executor:
+            encoded = list(executor.map(lambda img: self.encodeAs(img, self.output_file, self._profile), images))
+        paths = [os.path.join(self.output_directory, f"{i}_{self.output_file}") for i in range(1, len(images) + 1)]
+        for path, data in zip(paths, encoded):
+            with open(path, "wb") as output:
+                output.write(data)
+        if Instrumentation.enabled:
+            Instrumentation.count("TileGenerator.saveRecolors", bytes_written = sum(len(data) for data in encoded))
+        return paths
+
+    @staticmethod
+    def _recolored(color, mapping):
+        """
+        A static method that applies a recolor mapping to one color or to the palette of a NoiseFill.
+
+        Args:
+            color(tuple): the color, a NoiseFill or None.
+            mapping(dict): new colors by the RGBA form of the old colors.
+
+        Returns:
+            tuple: the new color or NoiseFill, color itself when nothing matched.
+        """
+
+        if isinstance(color, NoiseFill):
+            spec = color.toSpec()
+            palette = [list(mapping.get(tuple(entry), entry)) for entry in spec["palette"]]
+            return NoiseFill.fromSpec(dict(spec, palette = palette)) if palette != spec["palette"] else color
+        return mapping.get(TileGenerator.colorKey(color), color) if color is not None else None
+
+    def _variantSpecs(self, count, seed):
+        """
+        Describes count copies of the tile, each with its own deterministic random cut seeds derived from seed.
+
+        Args:
+            count(int): how many copies to describe.
+            seed(int): seed the per copy seeds are derived from, if None new copies are made every time.
+
+        Returns:
+            list of dict: the spec of every copy, as toSpec gives it.
+        """
+
+        spec = self.toSpec()
+        specs = []
+        for sequence in np.random.SeedSequence(seed).spawn(count):
+            variant = copy.deepcopy(spec)
+            repeats = [repeat for shape in variant["shapes"] for repeat in shape["repeat"]]
+            for repeat, repeat_seed in zip(repeats, sequence.generate_state(len(repeats))):
+                repeat["seed"] = int(repeat_seed)
+            specs.append(variant)
+        return specs
+
+    def animate(self, count = 8, seed = None, update = None, duration = 100, loop = 0):
+        """
+        Renders count frames of the tile into an Animation. With update, the tile itself is changed between frames and
+        edits only repaint what they touch. Without it, every frame is rendered again from the shapes with its own
+        random cut seeds, the same way variants are.
+
+        Args:
+            count(int): how many frames to render.
+            seed(int): seed the per frame random cuts are derived from, the same seed always gives the same frames.
+            update(callable): called as update(tile_generator, index) before every frame is taken, to move, recolor or edit shapes.
+            duration(int): how many milliseconds every frame is shown.
+            loop(int): how many times the animation plays, 0 loops forever.
+
+        Returns:
+            Animation: the frames, each kept as the rectangle that changed since the frame before it.
+        """
+
+        if not isinstance(count, int) or count < 1:
+            raise ValueError(f"{count} must be greater than or equal to 1")
+        if self._large:
+            raise ValueError("large tiles are streamed to disk by saveImage, they can not be animated")
+        from .PixelShape import PixelShape
+
+        animation = Animation(self.getDimensions(), duration, loop)
+        if update is not None:
+            for i in range(count):
+                update(self, i)
+                animation.addFrame(self._framePixels())
+            return animation
+        for variant in self._variantSpecs(count, seed):
+            variant["canvas"] = True
+            tile_generator = TileGenerator.fromSpec(variant)
+            for shape_spec in variant["shapes"]:
+                PixelShape.fromSpec(tile_generator, shape_spec, draw = True)
+            animation.addFrame(tile_generator._framePixels())
+        return animation
+
+    @Instrumentation.track("TileGenerator.saveAnimation")
+    def saveAnimation(self, count = 8, seed = None, update = None, duration = 100, loop = 0):
+        """
+        Renders count frames of the tile and saves them as one animated GIF or APNG, in the format of the output file
+        extension. Frames are diffed, so the file and the encode grow with what changes, not with the frame count.
+
+        Args:
+            count(int): how many frames to render.
+            seed(int): seed the per frame random cuts are derived from, the same seed always gives the same frames.
+            update(callable): called as update(tile_generator, index) before every frame is taken, to move, recolor or edit shapes.
+            duration(int): how many milliseconds every frame is shown.
+            loop(int): how many times the animation plays, 0 loops forever.
+
+        Returns:
+            Animation: the saved frames.
+        """
+
+        _, ext = os.path.splitext(self.output_file)
+        if ext.lower() not in (".gif", ".png"):
+            raise ValueError(f"animations can only be saved as .gif or .png, not {ext}")
+        animation = self.animate(count, seed, update, duration, loop)
+        path = os.path.join(self.output_directory, self.output_file)
+        animation.save(path, self._profile)
+        if Instrumentation.enabled:
+            Instrumentation.count("TileGenerator.saveAnimation", bytes_written = os.path.getsize(path))
+        return animation
+
+    @ResidencyManager.touches
+    def _framePixels(self):
+        """
+        A method used to get the current pixels of the tile as an array, without a copy when canvas is flagged.
+
+        Returns:
+            numpy.ndarray: the (height, width, bands) uint8 pixels.
+        """
+
+        if self._canvas is not None:
+            return self._canvas.pixels
+        return np.asarray(self.getImage().convert("RGBA"))
 
     def deleteImage(self):
         """
@@ -242,6 +1499,7 @@ class TileGenerator:
 
         os.remove(os.path.join(self.output_directory, self.output_file))
 
+    @Instrumentation.track("TileGenerator.deleteDirectory")
     def deleteDirectory(self):
         """
         Deletes the directory named in _output_directory and all it's contents
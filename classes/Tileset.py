@@ -0,0 +1,336 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from classes import config
+from .PixelShape import PixelShape
+from .TileGenerator import TileGenerator
+class Tileset:
+    """
+    A class to build a full autotile set, a 47 tile blob set or a 16 tile Wang set, from a base fill tile and edge
+    and corner layers.
+
+    Every tile is split into four quadrants and each quadrant only depends on its two side neighbors and the corner
+    neighbor between them, so it shows one of five states: the base fill, an edge along either side, an outer corner
+    or an inner corner. The edge and corner layers are drawn once as if on the north side and the north west corner,
+    rotated to the other sides and composited over the base as masks, so building a tile is four block copies.
+
+    Neighbor masks use one bit per neighbor, N = 1, NE = 2, E = 4, SE = 8, S = 16, SW = 32, W = 64 and NW = 128, a set
+    bit meaning the neighbor is the same terrain. A corner bit only matters when both sides next to it are set.
+
+    Attributes:
+        base (TileGenerator): The tile every variant is filled with, it must be square.
+        layout (str): "blob" for the 47 tile set with inner corners, or "wang" for the 16 tile set of side neighbors only.
+        size (int): The width and height of every tile.
+    """
+
+    LAYOUTS = ("blob", "wang")
+
+    NEIGHBORS = {"n": 1, "ne": 2, "e": 4, "se": 8, "s": 16, "sw": 32, "w": 64, "nw": 128}
+
+    # every quadrant with its vertical side, horizontal side and corner neighbor, and the quarter turns from the north west
+    QUADRANTS = {"nw": ("n", "w", "nw", 0), "ne": ("n", "e", "ne", 3), "se": ("s", "e", "se", 2), "sw": ("s", "w", "sw", 1)}
+
+    # the quarter turns that take the north side to every other side
+    SIDES = {"n": 0, "w": 1, "s": 2, "e": 3}
+
+    def __init__(self, base, edge, outer_corner = None, inner_corner = None, layout = "blob"):
+        """
+        Initializes a new Tileset object, the layers are drawn and composited right away.
+
+        Args:
+            base (TileGenerator): The square tile every variant is filled with.
+            edge (TileGenerator or list of PixelShape): The border drawn along the north side when there is no neighbor
+                there, a TileGenerator's opaque pixels or shapes drawn on a transparent tile of the same size.
+            outer_corner (TileGenerator or list of PixelShape): The north west corner drawn when neither the north nor the
+                west neighbor is there, if None the north and west edges are drawn over each other.
+            inner_corner (TileGenerator or list of PixelShape): The north west corner drawn when the north and west
+                neighbors are there but the north west one is not, if None the base shows. Unused by the wang layout.
+            layout (str): "blob" or "wang".
+        """
+
+        if not isinstance(base, TileGenerator):
+            raise ValueError(f"{base} must be a TileGenerator")
+        width, height = base.getDimensions()
+        if width != height or width < 2:
+            raise ValueError(f"autotiles must be square and at least 2 pixels, got {width}x{height}")
+        if layout not in self.LAYOUTS:
+            raise ValueError(f"{layout} is not a layout, choose from {', '.join(self.LAYOUTS)}")
+        self._base = base
+        self._layout = layout
+        self._size = width
+        self._blocks = self._composite(self._pixels(base), self._layer(edge), self._layer(outer_corner), self._layer(inner_corner))
+
+    def __str__(self):
+        """
+        Provides a string representation of the Tileset object.
+
+        Returns:
+            str: A description of the Tileset object.
+        """
+
+        return f"A {self._layout} tileset of {len(self.masks())} {self._size}x{self._size} tiles, saved as {{mask}}_{self._base.output_file} in {self._base.output_directory}."
+
+    @property
+    def base(self):
+        """
+        Gets the base fill tile.
+
+        Returns:
+            TileGenerator: The base tile.
+        """
+
+        return self._base
+
+    @property
+    def layout(self):
+        """
+        Gets the layout of the set.
+
+        Returns:
+            str: "blob" or "wang".
+        """
+
+        return self._layout
+
+    @property
+    def size(self):
+        """
+        Gets the width and height of every tile.
+
+        Returns:
+            int: The tile size in pixels.
+        """
+
+        return self._size
+
+    @classmethod
+    def fromSpec(cls, spec):
+        """
+        Creates a Tileset from a dictionary, the base is a tile spec as render manifests hold and the layers are
+        lists of shape specs.
+
+        Args:
+            spec (dict): base, edge and optionally outer_corner, inner_corner and layout.
+
+        Returns:
+            Tileset: the new Tileset object.
+        """
+
+        base = TileGenerator.fromSpec(spec["base"])
+        for shape_spec in spec["base"].get("shapes", []):
+            PixelShape.fromSpec(base, shape_spec, draw = True)
+        return cls(base, spec.get("edge") or [], spec.get("outer_corner"), spec.get("inner_corner"), spec.get("layout", "blob"))
+
+    def masks(self):
+        """
+        Gets the neighbor mask of every distinct tile in the set.
+
+        Returns:
+            list of int: the 47 reduced masks of a blob set or the 16 side masks of a wang set, in increasing order.
+        """
+
+        if self._layout == "wang":
+            return sorted({mask & 0b01010101 for mask in range(256)})
+        return sorted({self.reduce(mask) for mask in range(256)})
+
+    @classmethod
+    def reduce(cls, mask):
+        """
+        A class method that clears the corner bits of a neighbor mask that can not change a tile, a corner only counts
+        when both sides next to it are set.
+
+        Args:
+            mask (int): the 8 bit neighbor mask.
+
+        Returns:
+            int: the reduced mask.
+        """
+
+        for vertical, horizontal, corner, _ in cls.QUADRANTS.values():
+            if not (mask & cls.NEIGHBORS[vertical] and mask & cls.NEIGHBORS[horizontal]):
+                mask &= ~cls.NEIGHBORS[corner]
+        return mask
+
+    def lookup(self, mask):
+        """
+        Gets the tile mask to draw for any 8 bit neighbor mask.
+
+        Args:
+            mask (int): the neighbor mask, as read from a map.
+
+        Returns:
+            int: the mask of the tile in the set.
+        """
+
+        return mask & 0b01010101 if self._layout == "wang" else self.reduce(mask)
+
+    def render(self, mask):
+        """
+        Builds the tile of a neighbor mask from the four composited quadrant blocks.
+
+        Args:
+            mask (int): the neighbor mask, it is reduced to the set first.
+
+        Returns:
+            numpy.ndarray: the (size, size, 4) uint8 RGBA pixels of the tile.
+        """
+
+        mask = self.lookup(mask)
+        half = self._size // 2
+        pixels = np.empty((self._size, self._size, 4), dtype = np.uint8)
+        for quadrant, (vertical, horizontal, corner, _) in self.QUADRANTS.items():
+            rows = slice(0, half) if vertical == "n" else slice(half, self._size)
+            columns = slice(0, half) if horizontal == "w" else slice(half, self._size)
+            pixels[rows, columns] = self._blocks[quadrant][self._state(mask, vertical, horizontal, corner)][rows, columns]
+        return pixels
+
+    def build(self):
+        """
+        Builds every distinct tile of the set.
+
+        Returns:
+            dict: the (size, size, 4) uint8 RGBA pixels of every tile, by neighbor mask.
+        """
+
+        return {mask: self.render(mask) for mask in self.masks()}
+
+    def save(self, output_directory = None, name = None, jobs = None):
+        """
+        Builds the set and writes every tile as {mask}_{output_file} of the base tile, encoded in parallel with the base's
+        encoding profile, along with {name}.json indexing the tiles. Tiles with the same pixels are encoded once.
+
+        Args:
+            output_directory (str): The directory the tiles and index are written to, if None the base's output directory.
+            name (str): The base name of the index file, if None the base's output file without its extension.
+            jobs (int): How many threads encode tiles, if None one per core is used.
+
+        Returns:
+            dict: the JSON index that was written.
+        """
+
+        output_directory = output_directory or self._base.output_directory
+        output_file = self._base.output_file
+        stem, ext = os.path.splitext(output_file)
+        name = name or stem
+        os.makedirs(output_directory, exist_ok = True)
+        tiles = self.build()
+        unique = {}
+        for mask, pixels in tiles.items():
+            unique.setdefault(pixels.tobytes(), pixels)
+        mode = config.VALID_IMG_FILE_EXT.get(ext.lower(), "RGBA")
+        profile = self._base.profile
+
+        def encode(pixels):
+            img = Image.fromarray(pixels, "RGBA")
+            return TileGenerator.encodeAs(img if mode == "RGBA" else img.convert(mode), output_file, profile)
+
+        with ThreadPoolExecutor(max_workers = jobs if isinstance(jobs, int) and jobs > 0 else (os.cpu_count() or 1)) as executor:
+            encoded = dict(zip(unique, executor.map(encode, unique.values())))
+        index = {"layout": self._layout, "width": self._size, "height": self._size, "tiles": [],
+                 "lookup": [self.lookup(mask) for mask in range(256)]}
+        for mask, pixels in tiles.items():
+            file_name = f"{mask}_{output_file}"
+            with open(os.path.join(output_directory, file_name), "wb") as output:
+                output.write(encoded[pixels.tobytes()])
+            index["tiles"].append({"mask": mask, "file": file_name,
+                                   "neighbors": [neighbor for neighbor, bit in self.NEIGHBORS.items() if mask & bit]})
+        with open(os.path.join(output_directory, f"{name}.json"), "w") as output:
+            json.dump(index, output, indent = 1)
+        return index
+
+    def _state(self, mask, vertical, horizontal, corner):
+        """
+        Gets which of the five quadrant states a neighbor mask gives a quadrant.
+
+        Args:
+            mask (int): the reduced neighbor mask.
+            vertical (str): the north or south neighbor of the quadrant.
+            horizontal (str): the west or east neighbor of the quadrant.
+            corner (str): the corner neighbor between them.
+
+        Returns:
+            str: "fill", "vertical" for an edge along the north or south side, "horizontal" for an edge along the west
+                or east side, "outer" or "inner".
+        """
+
+        above = mask & self.NEIGHBORS[vertical]
+        beside = mask & self.NEIGHBORS[horizontal]
+        if not above and not beside:
+            return "outer"
+        if not above:
+            return "vertical"
+        if not beside:
+            return "horizontal"
+        if self._layout == "blob" and not mask & self.NEIGHBORS[corner]:
+            return "inner"
+        return "fill"
+
+    def _composite(self, base, edge, outer_corner, inner_corner):
+        """
+        Composites the rotated layers over the base once for every quadrant and state.
+
+        Args:
+            base (numpy.ndarray): the RGBA pixels of the base tile.
+            edge (numpy.ndarray): the RGBA pixels of the north edge, or None.
+            outer_corner (numpy.ndarray): the RGBA pixels of the north west outer corner, or None.
+            inner_corner (numpy.ndarray): the RGBA pixels of the north west inner corner, or None.
+
+        Returns:
+            dict: by quadrant, a dict of the whole tile sized pixels of every state, only the quadrant of each is used.
+        """
+
+        def over(pixels, layer, turns):
+            if layer is None:
+                return pixels
+            layer = np.rot90(layer, turns)
+            pixels = pixels.copy()
+            np.copyto(pixels, layer, where = layer[..., 3:] != 0)
+            return pixels
+
+        blocks = {}
+        for quadrant, (vertical, horizontal, _, turns) in self.QUADRANTS.items():
+            along_vertical = over(base, edge, self.SIDES[vertical])
+            along_horizontal = over(base, edge, self.SIDES[horizontal])
+            outer = over(base, outer_corner, turns) if outer_corner is not None else over(along_vertical, edge, self.SIDES[horizontal])
+            blocks[quadrant] = {"fill": base, "vertical": along_vertical, "horizontal": along_horizontal,
+                                "outer": outer, "inner": over(base, inner_corner, turns)}
+        return blocks
+
+    def _layer(self, source):
+        """
+        Turns an edge or corner definition into RGBA pixels the size of the tiles.
+
+        Args:
+            source (TileGenerator or PixelShape or list): a tile, a shape, or shapes or shape specs drawn on a transparent tile.
+
+        Returns:
+            numpy.ndarray: the (size, size, 4) uint8 RGBA pixels, or None when there is no source.
+        """
+
+        if source is None:
+            return None
+        if not isinstance(source, TileGenerator):
+            shapes = [source] if isinstance(source, (PixelShape, dict)) else list(source)
+            tile_generator = TileGenerator(array = (self._size, self._size), canvas = True)
+            for shape in shapes:
+                PixelShape.fromSpec(tile_generator, shape if isinstance(shape, dict) else shape.toSpec(), draw = True)
+            source = tile_generator
+        if source.getDimensions() != (self._size, self._size):
+            raise ValueError(f"edge and corner tiles must be {self._size}x{self._size}, got {source.getDimensions()}")
+        return self._pixels(source)
+
+    @staticmethod
+    def _pixels(tile_generator):
+        """
+        A static method that gets the pixels of a TileGenerator as RGBA.
+
+        Args:
+            tile_generator (TileGenerator): the tile to read.
+
+        Returns:
+            numpy.ndarray: the (height, width, 4) uint8 RGBA pixels.
+        """
+
+        return np.asarray(tile_generator.getImage().convert("RGBA"))
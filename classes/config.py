@@ -1 +1,56 @@
 VALID_IMG_FILE_EXT = {'.png':'RGBA', '.jpg':'YCbCr', '.jpeg':'YCbCr', '.bmp':'RGBA', '.gif':'RGBA'}
+
+# how many repeated pixels PixelShape.repeat builds per chunk, bounds the memory of large repeats
+REPEAT_CHUNK_SIZE = 1 << 20
+
+# the repeat parameters a shape in a render manifest falls back to, matching the defaults of PixelShape.repeat
+REPEAT_DEFAULTS = {"count_x": 5, "count_y": 5, "spacing": [4, 4], "starting": [0, 0], "random_cut": False, "cut_chance": 0.5, "cut_color": None, "seed": None}
+
+# named encoding profiles, the options Image.save gets for each output extension. "palette" is not a Pillow option,
+# it turns the image into an exact P mode image first when it has 256 colors or fewer
+ENCODING_PROFILES = {
+    "default": {},
+    "fast": {".png": {"compress_level": 1}},
+    "small": {".png": {"optimize": True, "palette": True}, ".gif": {"optimize": True, "palette": True},
+              ".bmp": {"palette": True}, ".jpg": {"optimize": True}, ".jpeg": {"optimize": True}},
+}
+
+# how many bytes of pixels a LargeCanvas works on at once, it bounds the memory of fills, bulk writes and streamed saves
+STRIP_BYTES = 64 * 1024 * 1024
+
+# where LargeCanvas and spilled coords keep their scratch files, None is the system temporary directory
+SCRATCH_DIRECTORY = None
+
+# the largest mask in bytes a PrimitiveShape keeps between draws and hit tests, bigger masks are rasterized again when needed
+PRIMITIVE_MASK_CACHE_BYTES = 16 * 1024 * 1024
+
+# the side in pixels of a SpatialIndex grid cell, and how many cells a shape's bounds may cover before the shape is
+# kept in the short list of wide shapes checked by every query instead
+SPATIAL_CELL_SIZE = 32
+SPATIAL_MAX_CELLS = 256
+
+# how many rows of pixels a NoiseFill computes at once, it bounds the memory of its temporary arrays
+NOISE_BAND_ROWS = 64
+
+# how many stored pixels an Animation builds its GIF palette from when the frames hold more than 256 colors
+ANIMATION_PALETTE_SAMPLE = 1 << 18
+
+# the file names TileGenerator.saveImage gives its nearest neighbor scales and mip levels, built from the stem and
+# extension of output_file
+SCALED_FILE_NAME = "{stem}@{scale}x{ext}"
+MIP_FILE_NAME = "{stem}_mip{level}{ext}"
+
+# how many bytes of pixels the tiles under a ResidencyManager keep in memory before the least recently used ones are
+# spilled to a scratch file in SCRATCH_DIRECTORY
+RESIDENCY_MAX_BYTES = 512 * 1024 * 1024
+
+# the file names TileGenerator.saveDihedral gives its rotated and flipped variants, built from the stem and extension
+# of output_file and the transform name
+DIHEDRAL_FILE_NAME = "{stem}_{transform}{ext}"
+
+# how many new connections the render service lets wait to be accepted, bursts of clients past it are reset
+SERVER_BACKLOG = 256
+
+# the widest and tallest tile the render service builds from a request, larger specs are answered with 400 instead of
+# allocating their pixels
+SERVER_MAX_TILE_SIDE = 4096
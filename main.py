@@ -1,8 +1,26 @@
+import argparse
+import json
+import os
+import queue
+import sys
+from classes import config
+from classes.AtlasBuilder import AtlasBuilder
+from classes.BatchRenderer import BatchRenderer
+from classes.Instrumentation import Instrumentation
+from classes.NoiseFill import NoiseFill
 from classes.PixelShape import PixelShape
+from classes.PrimitiveShape import PrimitiveShape
+from classes.RenderCache import RenderCache
+from classes.RenderServer import RenderServer
+from classes.ResidencyManager import ResidencyManager
+from classes.SaveQueue import SaveQueue
+from classes.Session import Session
 from classes.TileGenerator import TileGenerator
+from classes.Tileset import Tileset
 
 TILE_GENERATORS = {}
 SHAPES = {}
+FINISHED_SAVES = queue.SimpleQueue()
 
 def main():
     """
@@ -10,8 +28,10 @@ def main():
     """
 
     while True:
-        cmd = input("Welcome to the DersEngine, 2D image creation. Please enter a command (create, edit, save, delete, list or end):\n").strip().lower()
+        reportSaves()
+        cmd = input("Welcome to the DersEngine, 2D image creation. Please enter a command (create, edit, save, delete, list, stats, save-session, load-session or end):\n").strip().lower()
         if cmd == "end":
+            finishSaves()
             break
         elif cmd == "create":
             while True:
@@ -44,6 +64,12 @@ def main():
             saveTile()
         elif cmd == "delete":
             deleteTile()
+        elif cmd == "stats":
+            showStats()
+        elif cmd == "save-session":
+            saveSession()
+        elif cmd == "load-session":
+            loadSession()
         else:
             print(f"{cmd} is an invalid command please input a valid command.")
 
@@ -62,6 +88,7 @@ def createTileGenerator(name):
         line_c = input("Line color?: please type as x, x, x or x, x, x, x where x is an integer greater than 0 and less than 256:\n")
         output_file = input("Output file name? Please ensure it ends with .png, .jpg, .jpeg, .bmp, or .gif\n")
         output_directory = input("What will the directory the file is saved in be called?\n")
+        indexed = input("Keep pixels as palette indices of up to 256 colors for fast recoloring? y/n:\n").strip().lower() == 'y'
 
         try:
             height = int(height)
@@ -71,7 +98,8 @@ def createTileGenerator(name):
         except ValueError:
             print(f"{height} and {width} must be integers. {back_c} and {line_c} must be 3 or 4 integers.")
             continue
-        TILE_GENERATORS[name] = TileGenerator(array = [["."]*width for _ in range(height)], background_color = back_c, line_color = line_c, output_file = output_file, output_directory = output_directory)
+        TILE_GENERATORS[name] = TileGenerator(array = (width, height), background_color = back_c, line_color = line_c, output_file = output_file, output_directory = output_directory, indexed = indexed)
+        ResidencyManager.default().add(TILE_GENERATORS[name])
         break
 
 def createPixelShape(name):
@@ -89,18 +117,26 @@ def createPixelShape(name):
         else:
             print("Tile Generator does not exist.")
             break
-        coords = input("What are the coordinates of this shape? EX: (1, 0), (1, 1), (1, 2)\n")
-        color = input("What color will this shape be? Enter as x, x, x or x, x, x, x where x is integer between 0 and 255:\n")
-        try:
-            coords = coords.strip('()').split('), (')
-            coords = [tuple(map(int, coord.split(','))) for coord in coords]
-            color = tuple(map(int, color.split(',')))
-            if len(color) not in (3, 4):
-                raise ValueError
-        except ValueError:
-            print("Invalid input for coordinates or color.")
-            continue
-        SHAPES[name] = PixelShape(tile_generator, coords, color = color)
+        kind = input(f"What kind of shape is this? points, {', '.join(PrimitiveShape.KINDS)}:\n").strip().lower() or "points"
+        if kind != "points":
+            try:
+                SHAPES[name] = createPrimitive(tile_generator, kind)
+            except ValueError:
+                print("Invalid input for the shape.")
+                continue
+        else:
+            coords = input("What are the coordinates of this shape? EX: (1, 0), (1, 1), (1, 2)\n")
+            color = input("What color will this shape be? Enter as x, x, x or x, x, x, x where x is integer between 0 and 255:\n")
+            try:
+                coords = coords.strip('()').split('), (')
+                coords = [tuple(map(int, coord.split(','))) for coord in coords]
+                color = tuple(map(int, color.split(',')))
+                if len(color) not in (3, 4):
+                    raise ValueError
+            except ValueError:
+                print("Invalid input for coordinates or color.")
+                continue
+            SHAPES[name] = PixelShape(tile_generator, coords, color = color)
         repeat = input("Will this shape be repeating? y/n?\n").lower()
         if repeat == 'y':
             try:
@@ -112,7 +148,9 @@ def createPixelShape(name):
                 if random:
                     cut_chance = float(input("What chance would you like there to be for the pixel to cut, between 0 and 1. EX: 0.5\n"))
                     cut_color = tuple(map(int, input("What color would you like to replace each cut pixel with? EX: 0, 0, 0 or 0, 0, 0, 0?\n").split(',')))
-                    SHAPES[name].repeat(count_x, count_y, spacing, starting, random, cut_chance, cut_color)
+                    seed = input("What seed should the cut use? The same seed always gives the same cut, leave blank for a new cut every time.\n").strip()
+                    seed = int(seed) if seed else None
+                    SHAPES[name].repeat(count_x, count_y, spacing, starting, random, cut_chance, cut_color, seed)
                     drawShape(name)
                     break
                 else:
@@ -129,6 +167,41 @@ def createPixelShape(name):
             print("Please enter y or n for repeat.")
             continue
 
+def createPrimitive(tile_generator, kind):
+    """
+    Asks for the parameters of a primitive shape and creates it.
+
+    Args:
+        tile_generator (TileGenerator): The TileGenerator to put the shape on.
+        kind (str): The kind of primitive, one of PrimitiveShape.KINDS.
+
+    Returns:
+        PrimitiveShape: the new shape.
+    """
+
+    if kind not in PrimitiveShape.KINDS:
+        raise ValueError(f"{kind} is not a primitive")
+    if kind in ("rect", "ellipse"):
+        box = tuple(map(int, input("What box will it fill? Enter left, top, right, bottom, right and bottom not included. EX: 0, 0, 8, 8\n").split(',')))
+    elif kind == "fill":
+        seed = tuple(map(int, input("Which pixel does the fill start from? EX: 4, 4\n").split(',')))
+    else:
+        corners = input("What points does it go through? EX: (0, 0), (8, 0), (4, 6)\n").strip().strip('()').split('), (')
+        corners = [tuple(map(int, corner.split(','))) for corner in corners]
+    color = input("What color will this shape be? Enter as x, x, x or x, x, x, x where x is integer between 0 and 255" + (", leave blank for the tile's line color" if kind == "line" else "") + ":\n").strip()
+    color = tuple(map(int, color.split(','))) if color else None
+    if color is not None and len(color) not in (3, 4):
+        raise ValueError(f"{color} is not a color")
+    if kind == "fill":
+        return PrimitiveShape.floodFill(tile_generator, seed, color)
+    width = int(input("How wide are its lines? EX: 1\n") or 1)
+    if kind == "line":
+        return PrimitiveShape.line(tile_generator, corners, color, width)
+    filled = input("Is it filled? y/n?\n").strip().lower() != 'n'
+    if kind == "polygon":
+        return PrimitiveShape.polygon(tile_generator, corners, color, filled, width)
+    return getattr(PrimitiveShape, kind)(tile_generator, box, color, filled, width)
+
 def drawShape(name):
     """
     Draws the shape identified by 'name' using its PixelShape instance.
@@ -144,24 +217,135 @@ def drawShape(name):
 
 def saveTile():
     """
-    Saves the tile specified by the user, either as a single image or multiple copies.
+    Saves the tile specified by the user, either as a single image, multiple copies or an animation.
     """
 
     while True:
         tile = input("What tile will we be saving?\n")
-        mult = input("Will there be more than one copy saved? y/n:\n").strip()
+        mult = input("Will there be more than one copy saved? y/n, a for an animated .gif or .png of randomly cut frames, r for recolored copies of an indexed tile, s for scaled copies and mipmaps, or d for rotated and flipped copies:\n").strip()
         if tile in TILE_GENERATORS and mult == 'y':
             count = int(input("How many copies?\n"))
-            TILE_GENERATORS[tile].saveImage(multiples = True, count = count)
-            print(f"{count} {tile}s have succesfully been saved to {TILE_GENERATORS[tile].output_directory}.")
+            variants = input("Should every copy get its own random cut? y/n:\n").strip().lower() == 'y'
+            seed = input("What seed should the copies use? leave blank for new copies every time.\n").strip() if variants else ""
+            try:
+                TILE_GENERATORS[tile].saveImage(multiples = True, count = count, variants = variants, seed = int(seed) if seed else None)
+                print(f"{count} {tile}s have succesfully been saved to {TILE_GENERATORS[tile].output_directory}.")
+            except (RuntimeError, ValueError) as error:
+                print(error)
+            break
+        elif tile in TILE_GENERATORS and mult == 'a':
+            count = int(input("How many frames?\n"))
+            duration = int(input("How many milliseconds is every frame shown?\n"))
+            seed = input("What seed should the frames use? leave blank for new frames every time.\n").strip()
+            try:
+                animation = TILE_GENERATORS[tile].saveAnimation(count = count, seed = int(seed) if seed else None, duration = duration)
+                print(f"{tile} has succesfully been saved to {TILE_GENERATORS[tile].output_directory} as {len(animation)} distinct frames.")
+            except ValueError as error:
+                print(error)
+            break
+        elif tile in TILE_GENERATORS and mult == 'r':
+            count = int(input("How many recolored copies?\n"))
+            try:
+                mappings = [parseRecolor(input(f"Colors to replace in copy {i}? enter as x, x, x > x, x, x with each swap split by ;:\n")) for i in range(1, count + 1)]
+                paths = TILE_GENERATORS[tile].saveRecolors(mappings)
+                print(f"{len(paths)} recolored {tile}s have succesfully been saved to {TILE_GENERATORS[tile].output_directory}.")
+            except ValueError as error:
+                print(error)
+            break
+        elif tile in TILE_GENERATORS and mult == 's':
+            scales = input("What scales should be saved? enter as x, x, x with 1 being the tile itself:\n")
+            mips = input("Should the mip chain be saved too? y/n:\n").strip().lower() == 'y'
+            try:
+                TILE_GENERATORS[tile].saveImage(scales = [int(scale) for scale in scales.split(',') if scale.strip()], mips = mips)
+                print(f"{tile} has succesfully been saved to {TILE_GENERATORS[tile].output_directory} at every scale.")
+            except ValueError as error:
+                print(error)
+            break
+        elif tile in TILE_GENERATORS and mult == 'd':
+            transforms = input(f"Which copies? enter any of {', '.join(TileGenerator.DIHEDRAL_TRANSFORMS)} split by commas, leave blank for all:\n")
+            try:
+                paths = TILE_GENERATORS[tile].saveDihedral([name.strip() for name in transforms.split(',') if name.strip()] or None)
+                print(f"{len(set(paths.values()))} distinct copies of {tile} have succesfully been saved to {TILE_GENERATORS[tile].output_directory}, {len(paths) - len(set(paths.values()))} were duplicates.")
+            except ValueError as error:
+                print(error)
             break
         elif tile in TILE_GENERATORS and mult == 'n':
-            TILE_GENERATORS[tile].saveImage()
-            print(f"{tile} succesfully saved to {TILE_GENERATORS[tile].output_directory}.")
+            future = TILE_GENERATORS[tile].saveImageAsync()
+            future.add_done_callback(lambda done, tile = tile: FINISHED_SAVES.put((tile, done)))
+            print(f"{tile} is being saved to {TILE_GENERATORS[tile].output_directory}.")
             break
         else:
             print("Tile doesn't exist and/or improper input for mult")
 
+def parseRecolor(text):
+    """
+    Turns a recolor typed as x, x, x > x, x, x; x, x, x > x, x, x into a mapping.
+
+    Args:
+        text (str): the typed swaps.
+
+    Returns:
+        dict: the new color tuples by the old color tuples.
+    """
+
+    mapping = {}
+    for swap in filter(str.strip, text.split(';')):
+        old, new = swap.split('>')
+        mapping[tuple(map(int, old.split(',')))] = tuple(map(int, new.split(',')))
+    return mapping
+
+def reportSaves():
+    """
+    Reports the background saves that failed since the last call. The save threads only queue their finished saves,
+    they are reported here on the main thread so a prompt is never interrupted, successful saves stay quiet.
+    """
+
+    while not FINISHED_SAVES.empty():
+        tile, future = FINISHED_SAVES.get()
+        if future.exception() is not None:
+            print(f"Saving {tile} failed: {future.exception()}")
+
+def finishSaves():
+    """
+    Waits for the background saves still being written before exiting.
+    """
+
+    pending = SaveQueue.default().pending
+    if pending:
+        print(f"Waiting for {pending} saves to finish.")
+    SaveQueue.default().flush()
+    reportSaves()
+
+def saveSession():
+    """
+    Saves every tile generator and shape, pixels included, to a session file.
+    """
+
+    path = input("What file should the session be saved to? leave blank for session.ders\n").strip() or "session.ders"
+    try:
+        Session(TILE_GENERATORS, SHAPES).save(path)
+    except OSError as error:
+        print(f"Could not save the session: {error}")
+        return
+    print(f"{len(TILE_GENERATORS)} tile generators and {len(SHAPES)} shapes saved to {path}.")
+
+def loadSession():
+    """
+    Loads the tile generators and shapes of a session file, replacing any with the same names.
+    """
+
+    path = input("What session file should be loaded? leave blank for session.ders\n").strip() or "session.ders"
+    try:
+        session = Session.load(path)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Could not load {path}: {error}")
+        return
+    TILE_GENERATORS.update(session.tile_generators)
+    for tile_generator in session.tile_generators.values():
+        ResidencyManager.default().add(tile_generator)
+    SHAPES.update(session.shapes)
+    print(f"{len(session.tile_generators)} tile generators and {len(session.shapes)} shapes loaded from {path}.")
+
 def deleteTile():
     """
     deletes a specified tile from its file directory
@@ -200,6 +384,35 @@ def deleteTile():
             continue
 
 
+def createNoiseFill():
+    """
+    Asks the user for the settings of a NoiseFill.
+
+    Returns:
+        NoiseFill: the new fill.
+    """
+
+    while True:
+        kind = input(f"What kind of fill? {', '.join(NoiseFill.KINDS)}:\n").strip().lower()
+        palette = input("What colors should it use? enter as x, x, x; x, x, x with each color split by ; where x is an integer between 0 and 255:\n")
+        try:
+            palette = [tuple(map(int, color.split(','))) for color in palette.split(';')]
+            if kind == "gradient":
+                start = tuple(map(int, input("Where does the gradient start? enter as x, y:\n").split(',')))
+                end = tuple(map(int, input("Where does the gradient end? enter as x, y:\n").split(',')))
+                radial = input("Is it radial? y or n:\n").strip().lower() == 'y'
+                return NoiseFill(kind, palette, start = start, end = end, radial = radial,
+                                 dither = input("Dither between the colors? y or n:\n").strip().lower() == 'y')
+            scale = float(input("How many pixels wide is a noise cell?\n"))
+            octaves = int(input("How many octaves?\n"))
+            seed = int(input("What seed?\n"))
+            smooth = input("Blend between the colors? y or n:\n").strip().lower() == 'y'
+            dither = not smooth and input("Dither between the colors? y or n:\n").strip().lower() == 'y'
+            return NoiseFill(kind, palette, scale = scale, octaves = octaves, seed = seed, smooth = smooth, dither = dither)
+        except ValueError as error:
+            print(f"{error}, try again.")
+
+
 def editTile():
     """
     Allows the user to edit the properties of an existing TileGenerator.
@@ -209,15 +422,19 @@ def editTile():
         tile = input("What tile generator will we be editing? end to quit:\n")
         if tile in TILE_GENERATORS:
             while True:
-                cmd = input("What will we be editing? array(a), background color(bc), line color(lc), output file(of), output directory(od), or end to go back.\n")
+                cmd = input("What will we be editing? array(a), background color(bc), background noise fill(bf), line color(lc), output file(of), output directory(od), encoding profile(ep), or end to go back.\n")
                 if cmd == 'a':
                     width = int(input("What width would you like?\n"))
                     height = int(input("What height would you like?\n"))
-                    TILE_GENERATORS[tile].array = [["."]*width for _ in range(height)]
+                    TILE_GENERATORS[tile].array = (width, height)
                 elif cmd == 'bc':
                     color = input("What will the new color be? enter as x, x, x or x, x, x, x where x is an integer between 0 and 255:\n")
-                    color = tuple(map(int, color.split(',')))
-                    TILE_GENERATORS[tile].background_color = color
+                    try:
+                        TILE_GENERATORS[tile].background_color = tuple(map(int, color.split(',')))
+                    except ValueError as error:
+                        print(error)
+                elif cmd == 'bf':
+                    TILE_GENERATORS[tile].background_color = createNoiseFill()
                 elif cmd == 'lc':
                     color = input("What will the new color be? enter as x, x, x or x, x, x, x where x is an integer between 0 and 255:\n")
                     color = tuple(map(int, color.split(',')))
@@ -228,11 +445,14 @@ def editTile():
                 elif cmd == 'od':
                     output_directory = input("What will the new directory name be?\n")
                     TILE_GENERATORS[tile].output_directory = output_directory
+                elif cmd == 'ep':
+                    profile = input(f"What encoding profile should be used? {', '.join(config.ENCODING_PROFILES)}. fast encodes quickest, small makes the smallest files.\n").strip().lower()
+                    TILE_GENERATORS[tile].profile = profile
                 elif cmd == 'end':
                     print("Returning to generator selection.")
                     break
                 else:
-                    print("Invalid command use a, bc, lc, of, od, or end")
+                    print("Invalid command use a, bc, bf, lc, of, od, ep, or end")
                     continue
         elif tile.lower() == 'end':
             print("Returning to shape/tile selection.")
@@ -247,28 +467,30 @@ def editShape():
     """
 
     while True:
-        shape = input("What shape will we be editing? end to quit\n")
-        if shape in SHAPES:
-            cmd = input("What will we be editing? Coords(cr) or color(co)? end to go back.\n")
+        shape = input("What shape will we be editing? find to look one up by pixel, end to quit\n")
+        if shape.lower() == "find":
+            findShapes()
+        elif shape in SHAPES:
+            cmd = input("What will we be editing? Coords(cr), color(co) or erase(er)? end to go back.\n")
             if cmd == "cr":
                 coords = input("What will the new coordinates be? EX: (x, x), (x, x), (x, x)\n")
                 try:
-                    SHAPES[shape].tile_generator._applyBackground()
                     coords = coords.strip('()').split('), (')
                     coords = [tuple(map(int, coord.split(','))) for coord in coords]
-                    SHAPES[shape].coords = coords
-                    drawShape(shape)
+                    SHAPES[shape].edit(coords = coords)
                 except (ValueError, IndexError):
                     print("Invalid Coords.")
             elif cmd == "co":
                 color = input("What will the new color be? please enter in x, x, x or x, x, x, x format where x is between 0 and 255.\n")
                 try:
-                    SHAPES[shape].tile_generator._applyBackground()
                     color = tuple(map(int, color.split(',')))
-                    SHAPES[shape].color = color
-                    drawShape(shape)
+                    SHAPES[shape].edit(color = color)
                 except ValueError:
                     print("Invalid Color")
+            elif cmd == "er":
+                SHAPES.pop(shape).erase()
+                print(f"{shape} erased.")
+                break
             elif cmd.lower() == "end":
                 print("Returning to shape selection.")
                 break
@@ -278,6 +500,220 @@ def editShape():
         else:
             print(f"{shape} not found.")
 
+def findShapes():
+    """
+    Lists the named shapes painting a pixel of a tile, or the nearest one if none do.
+    """
+
+    tile = input("What tile is the pixel on?\n").strip()
+    if tile not in TILE_GENERATORS:
+        print("Tile Generator does not exist.")
+        return
+    try:
+        x, y = map(int, input("Which pixel? EX: 4, 4\n").split(','))
+    except ValueError:
+        print("Invalid pixel.")
+        return
+    names = {shape: name for name, shape in SHAPES.items()}
+    found = [names.get(shape, "an unnamed shape") for shape in TILE_GENERATORS[tile].shapesAt(x, y, exact = True)]
+    if found:
+        print(f"Painting ({x}, {y}), bottom to top: {', '.join(found)}")
+    else:
+        nearest = TILE_GENERATORS[tile].nearestShape(x, y)
+        print(f"Nothing paints ({x}, {y}), the nearest shape is {names.get(nearest, 'an unnamed shape')}." if nearest else f"Nothing paints ({x}, {y}).")
+
+def showStats():
+    """
+    Turns the hot path instrumentation on or off, shows or resets what it recorded, or exports it to JSON. memory shows
+    how many tiles have their pixels in memory and how many are spilled to disk.
+    """
+
+    while True:
+        state = "on" if Instrumentation.enabled else "off"
+        cmd = input(f"Instrumentation is {state}. Enter on, off, show, reset, export, memory or end to go back:\n").strip().lower()
+        if cmd == "on":
+            Instrumentation.enable()
+        elif cmd == "off":
+            Instrumentation.disable()
+        elif cmd == "show":
+            print(Instrumentation.format())
+        elif cmd == "reset":
+            Instrumentation.reset()
+            print("Stats reset.")
+        elif cmd == "export":
+            path = input("What file should the stats be written to? EX: stats.json\n").strip()
+            try:
+                Instrumentation.exportJSON(path)
+                print(f"Stats written to {path}.")
+            except OSError as error:
+                print(f"Could not write {path}: {error}")
+        elif cmd == "memory":
+            print(ResidencyManager.default())
+        elif cmd == "end":
+            break
+        else:
+            print(f"{cmd} is not on, off, show, reset, export, memory or end.")
+
+def runCommand(argv):
+    """
+    Runs a non-interactive command given on the command line, i.e. python main.py render manifest.json --jobs 8
+
+    Args:
+        argv (list of str): the command line arguments after the script name.
+
+    Returns:
+        int: the exit status, 0 when every job succeeded.
+    """
+
+    parser = argparse.ArgumentParser(prog = "main.py", description = "DersEngine, 2D image creation. Run without arguments for the interactive menu.")
+    commands = parser.add_subparsers(dest = "command", required = True)
+    render = commands.add_parser("render", help = "render every tile in a JSON manifest")
+    render.add_argument("manifest", help = "path of the JSON manifest")
+    render.add_argument("--jobs", type = int, default = None, help = "worker processes to use, defaults to one per core")
+    render.add_argument("--cache", default = None, help = "directory of a render cache, unchanged tiles are copied from it instead of rendered")
+    render.add_argument("--cache-size", type = int, default = 256, help = "size cap of the render cache in megabytes")
+    render.add_argument("--profile", choices = list(config.ENCODING_PROFILES), default = None, help = "encoding profile of every tile, overrides the manifest")
+    serve = commands.add_parser("serve", help = "run a local render service that keeps generators resident between requests")
+    serve.add_argument("--host", default = "127.0.0.1", help = "address to listen on, localhost by default")
+    serve.add_argument("--port", type = int, default = 8765, help = "port to listen on")
+    serve.add_argument("--jobs", type = int, default = None, help = "worker threads to render with, defaults to one per core")
+    serve.add_argument("--cache", default = None, help = "directory of a render cache used for spec renders")
+    serve.add_argument("--cache-size", type = int, default = 256, help = "size cap of the render cache in megabytes")
+    serve.add_argument("--root", default = None, help = "directory saved tiles are kept in, defaults to the working directory")
+    atlas = commands.add_parser("atlas", help = "pack every image in a directory into power of two texture atlases")
+    atlas.add_argument("directory", help = "directory of rendered tiles")
+    atlas.add_argument("--output", default = "atlas", help = "directory the sheets and JSON index are written to")
+    atlas.add_argument("--name", default = "atlas", help = "base name of the sheet and index files")
+    atlas.add_argument("--max-size", type = int, default = 4096, help = "largest sheet width or height, a power of two")
+    atlas.add_argument("--padding", type = int, default = 0, help = "transparent pixels around every tile")
+    atlas.add_argument("--extrude", type = int, default = 0, help = "pixels of edge extrusion around every tile")
+    tileset = commands.add_parser("tileset", help = "build a 47 tile blob or 16 tile Wang autotile set from a JSON definition")
+    tileset.add_argument("definition", help = "path of the JSON definition, a base tile spec and edge and corner shape specs")
+    tileset.add_argument("--output", default = None, help = "directory the tiles and JSON index are written to, defaults to the base tile's")
+    tileset.add_argument("--jobs", type = int, default = None, help = "worker threads to encode with, defaults to one per core")
+    args = parser.parse_args(argv)
+
+    if args.command == "render":
+        cache = RenderCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+        return renderManifest(args.manifest, args.jobs, cache, args.profile)
+    elif args.command == "serve":
+        cache = RenderCache(args.cache, args.cache_size * 1024 * 1024) if args.cache else None
+        return serveRenders(args.host, args.port, args.jobs, cache, args.root)
+    elif args.command == "atlas":
+        return buildAtlas(args.directory, args.output, args.name, args.max_size, args.padding, args.extrude)
+    elif args.command == "tileset":
+        return buildTileset(args.definition, args.output, args.jobs)
+    return 1
+
+def renderManifest(manifest, jobs = None, cache = None, profile = None):
+    """
+    Renders every tile of a manifest with a BatchRenderer and reports the timing and any failure of each job.
+
+    Args:
+        manifest (str): path of the JSON manifest.
+        jobs (int): worker processes to use, if None one per core is used.
+        cache (RenderCache): cache of encoded tiles, or None to render everything.
+        profile (str): encoding profile of every tile, or None to use the one in the manifest.
+
+    Returns:
+        int: the exit status, 0 when every job succeeded.
+    """
+
+    try:
+        renderer = BatchRenderer.fromManifest(manifest, jobs, cache, profile)
+    except (OSError, ValueError) as error:
+        print(f"Could not read {manifest}: {error}")
+        return 1
+    results = renderer.run()
+    failures = 0
+    for result in results:
+        if result["error"]:
+            failures += 1
+            print(f"FAIL {result['name']} {result['seconds']:.3f}s {result['error']}")
+        else:
+            print(f"ok   {result['name']} {result['seconds']:.3f}s {'(cached) ' if result['cache'] == 'hit' else ''}{', '.join(result['files'])}")
+    total = sum(result["seconds"] for result in results)
+    print(f"{len(results) - failures} of {len(results)} tiles rendered with {renderer.jobs} jobs, {total:.3f}s of render time.")
+    if cache:
+        print(f"Render cache: {cache.hits} hits, {cache.misses} misses, {cache.size} bytes in {cache.directory}.")
+    return 1 if failures else 0
+
+def serveRenders(host, port, jobs = None, cache = None, root = None):
+    """
+    Runs a RenderServer until the process is interrupted.
+
+    Args:
+        host (str): address to listen on.
+        port (int): port to listen on.
+        jobs (int): worker threads to render with, if None one per core is used.
+        cache (RenderCache): cache of encoded tiles, or None.
+        root (str): directory the output directories of requests are kept in, if None the working directory.
+
+    Returns:
+        int: the exit status, 1 when the server could not start.
+    """
+
+    try:
+        server = RenderServer(host, port, jobs, cache = cache, root = root)
+    except OSError as error:
+        print(f"Could not listen on {host}:{port}: {error}")
+        return 1
+    print(f"Rendering on http://{server.address[0]}:{server.address[1]} with {server.jobs} workers, press Ctrl+C to stop.")
+    try:
+        server.serveForever()
+    except KeyboardInterrupt:
+        print("Stopped.")
+    return 0
+
+def buildAtlas(directory, output, name, max_size, padding, extrude):
+    """
+    Packs every image in a directory into texture atlases and reports where they were written.
+
+    Args:
+        directory (str): directory of rendered tiles.
+        output (str): directory the sheets and JSON index are written to.
+        name (str): base name of the sheet and index files.
+        max_size (int): largest sheet width or height.
+        padding (int): transparent pixels around every tile.
+        extrude (int): pixels of edge extrusion around every tile.
+
+    Returns:
+        int: the exit status, 0 on success.
+    """
+
+    try:
+        builder = AtlasBuilder(max_size, padding, extrude)
+        builder.addDirectory(directory)
+        index = builder.build(output, name)
+    except (OSError, ValueError) as error:
+        print(f"Could not build the atlas: {error}")
+        return 1
+    print(f"{len(index['tiles'])} tiles packed into {len(index['sheets'])} sheets, index written to {os.path.join(output, name)}.json")
+    return 0
+
+def buildTileset(definition, output = None, jobs = None):
+    """
+    Builds the autotile set of a JSON definition and reports where it was written.
+
+    Args:
+        definition (str): path of the JSON definition.
+        output (str): directory the tiles and JSON index are written to, None uses the base tile's.
+        jobs (int): worker threads to encode with.
+
+    Returns:
+        int: the exit status, 0 on success.
+    """
+
+    try:
+        with open(definition) as source:
+            tileset = Tileset.fromSpec(json.load(source))
+        index = tileset.save(output, jobs = jobs)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Could not build the tileset: {error}")
+        return 1
+    print(f"{len(index['tiles'])} {tileset.layout} tiles written to {output or tileset.base.output_directory}.")
+    return 0
+
 def displayTiles():
     for key in TILE_GENERATORS.keys():
         print(f"{key}, ")
@@ -288,5 +724,7 @@ def displayShapes():
 
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(runCommand(sys.argv[1:]))
     main()
 
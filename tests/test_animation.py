@@ -0,0 +1,111 @@
+"""
+Checks that an Animation keeps only the rectangles that change between frames, and that its GIF and APNG files decode
+back to every frame that was added, for how long it was added.
+
+Run from the project root with: python -m pytest
+"""
+import io
+import numpy as np
+import pytest
+from PIL import Image, ImageSequence
+from classes.Animation import Animation
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def frames(count = 6, seed = 2):
+    """
+    Makes frames of a few colors where a small square moves, the third frame repeats the second and the last clears a
+    pixel to transparent.
+
+    Args:
+        count (int): how many frames.
+        seed (int): the seed of the background.
+
+    Returns:
+        list of numpy.ndarray: the (12, 16, 4) RGBA frames.
+    """
+
+    rng = np.random.default_rng(seed)
+    palette = np.array([[30, 60, 90, 255], [200, 40, 40, 255], [10, 220, 130, 255]], dtype = np.uint8)
+    background = palette[rng.integers(0, 2, (12, 16))]
+    sequence = []
+    for index in range(count):
+        frame = background.copy()
+        x = 2 * index if index != 2 else 2
+        frame[3:6, x:x + 3] = palette[2]
+        sequence.append(frame)
+    sequence[-1][0, 0] = 0
+    return sequence
+
+def decoded(data):
+    """
+    Decodes every frame of an animated file, as it is shown.
+
+    Args:
+        data (bytes): the encoded animation.
+
+    Returns:
+        tuple: the list of RGBA frames and the list of their durations.
+    """
+
+    with Image.open(io.BytesIO(data)) as img:
+        shown = [(np.array(frame.convert("RGBA")), frame.info.get("duration")) for frame in ImageSequence.Iterator(img)]
+    return [pixels for pixels, _ in shown], [duration for _, duration in shown]
+
+def test_frames_keep_the_changed_rectangles():
+    animation = Animation((16, 12), duration = 50)
+    boxes = [animation.addFrame(frame) for frame in frames()]
+    assert boxes == [(0, 0, 16, 12), (0, 3, 5, 6), None, (2, 3, 9, 6), (6, 3, 11, 6), (0, 0, 13, 6)]
+    assert [duration for _, duration in animation.frames] == [50, 100, 50, 50, 50]
+
+@pytest.mark.parametrize("ext", [".gif", ".png"])
+def test_files_decode_to_every_frame(ext):
+    sequence = frames()
+    animation = Animation((16, 12), duration = 40)
+    for index, frame in enumerate(sequence):
+        animation.addFrame(frame, 40 + index * 10)
+    pixels, durations = decoded(animation.encode(ext))
+    shown = [frame for index, frame in enumerate(sequence) if index != 2]
+    assert len(pixels) == len(shown)
+    for got, expected in zip(pixels, shown):
+        if ext == ".gif":
+            got, expected = got.copy(), expected.copy()
+            got[got[..., 3] == 0] = 0
+            expected[expected[..., 3] == 0] = 0
+        assert np.array_equal(got, expected)
+    assert durations == [40, 50 + 60, 70, 80, 90]
+
+def test_tiles_animate_their_updates(tmp_path):
+    tile = TileGenerator(array = (16, 12), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path), canvas = True)
+    shape = PixelShape(tile, [(0, 0)], (200, 40, 40))
+    shape.draw()
+    expected = []
+
+    def update(tile_generator, index):
+        shape.edit(coords = [(index, index)])
+        expected.append(np.array(tile_generator.getImage().convert("RGBA")))
+
+    pixels, _ = decoded(tile.animate(4, update = update).encode(".png"))
+    assert len(pixels) == 4
+    for got, want in zip(pixels, expected):
+        assert np.array_equal(got, want)
+
+def test_seeded_animations_repeat(tmp_path):
+    def animated():
+        tile = TileGenerator(array = (16, 12), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                             output_directory = str(tmp_path), canvas = True)
+        PixelShape(tile, [(0, 0), (1, 0)], (200, 40, 40)).repeat(6, 4, (3, 3), (0, 0), True, 0.5, (0, 0, 0), seed = 1)
+        return tile.animate(5, seed = 8).encode(".gif")
+
+    assert animated() == animated()
+
+def test_bad_frames_are_rejected():
+    animation = Animation((16, 12))
+    with pytest.raises(ValueError):
+        animation.encode(".gif")
+    with pytest.raises(ValueError):
+        animation.addFrame(np.zeros((16, 12, 4), dtype = np.uint8))
+    animation.addFrame(frames()[0])
+    with pytest.raises(ValueError):
+        animation.encode(".webp")
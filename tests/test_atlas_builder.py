@@ -0,0 +1,100 @@
+"""
+Checks that AtlasBuilder places every tile inside a power of two sheet without overlap, and that the written sheets hold
+each tile's pixels at the rect its index gives.
+
+Run from the project root with: python -m pytest
+"""
+import json
+import numpy as np
+import pytest
+from PIL import Image
+from classes.AtlasBuilder import AtlasBuilder
+from classes.TileGenerator import TileGenerator
+
+def tiles(count = 30, seed = 5):
+    """
+    Makes tiles of random sizes and random pixels.
+
+    Args:
+        count (int): how many tiles.
+        seed (int): the seed of their sizes and pixels.
+
+    Returns:
+        dict: the RGBA pixels of every tile by name.
+    """
+
+    rng = np.random.default_rng(seed)
+    return {f"tile_{index}": rng.integers(0, 256, (int(rng.integers(1, 40)), int(rng.integers(1, 40)), 4), dtype = np.uint8)
+            for index in range(count)}
+
+def builder(pixels, **options):
+    """
+    Makes an AtlasBuilder holding the tiles.
+
+    Args:
+        pixels (dict): the RGBA pixels of every tile by name.
+        options (dict): max_size, padding and extrude.
+
+    Returns:
+        AtlasBuilder: the builder.
+    """
+
+    atlas_builder = AtlasBuilder(**options)
+    for name, tile in pixels.items():
+        atlas_builder.addImage(name, Image.fromarray(tile))
+    return atlas_builder
+
+@pytest.mark.parametrize("options", [{}, {"padding": 2}, {"padding": 1, "extrude": 2}, {"max_size": 64, "padding": 1}])
+def test_placements_fit_and_do_not_overlap(options):
+    pixels = tiles()
+    sizes, placements = builder(pixels, **options).pack()
+    border = options.get("padding", 0) + options.get("extrude", 0)
+    assert set(placements) == set(pixels)
+    for width, height in sizes:
+        assert width & (width - 1) == 0 and height & (height - 1) == 0
+        assert width <= options.get("max_size", 4096) and height <= options.get("max_size", 4096)
+    used = [np.zeros((height, width), dtype = bool) for width, height in sizes]
+    for name, (sheet, x, y, width, height) in placements.items():
+        assert pixels[name].shape[:2] == (height, width)
+        assert x >= border and y >= border
+        assert x + width + border <= sizes[sheet][0] and y + height + border <= sizes[sheet][1]
+        cell = used[sheet][y - border:y + height + border, x - border:x + width + border]
+        assert not cell.any()
+        cell[...] = True
+
+def test_small_sheets_spill_onto_more_sheets():
+    assert len(builder(tiles(), max_size = 64).pack()[0]) > 1
+
+def test_sheets_hold_the_tiles(tmp_path):
+    pixels = tiles()
+    index = builder(pixels, max_size = 128, padding = 1, extrude = 1).build(str(tmp_path), "sprites")
+    with open(tmp_path / "sprites.json") as written:
+        assert json.load(written) == json.loads(json.dumps(index))
+    sheets = []
+    for sheet in index["sheets"]:
+        with Image.open(tmp_path / sheet["file"]) as img:
+            sheets.append(np.asarray(img))
+    for name, rect in index["tiles"].items():
+        sheet, x, y, width, height = sheets[rect["sheet"]], rect["x"], rect["y"], rect["width"], rect["height"]
+        assert np.array_equal(sheet[y:y + height, x:x + width], pixels[name])
+        assert np.array_equal(sheet[y - 1, x:x + width], pixels[name][0])
+        assert np.array_equal(sheet[y:y + height, x - 1], pixels[name][:, 0])
+        assert rect["uv"] == [x / sheet.shape[1], y / sheet.shape[0], (x + width) / sheet.shape[1], (y + height) / sheet.shape[0]]
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_generators_are_added_by_their_pixels(tmp_path, canvas):
+    tile = TileGenerator(array = (5, 3), background_color = (1, 2, 3), output_file = "tile.png", output_directory = str(tmp_path), canvas = canvas)
+    atlas_builder = AtlasBuilder()
+    atlas_builder.addGenerator("tile", tile)
+    index = atlas_builder.build(str(tmp_path), "one")
+    with Image.open(tmp_path / "one_0.png") as img:
+        rect = index["tiles"]["tile"]
+        assert np.array_equal(np.asarray(img)[rect["y"]:rect["y"] + 3, rect["x"]:rect["x"] + 5], np.asarray(tile.getImage().convert("RGBA")))
+
+def test_bad_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        AtlasBuilder(max_size = 100)
+    with pytest.raises(ValueError):
+        AtlasBuilder(padding = -1)
+    with pytest.raises(ValueError):
+        builder({"big": np.zeros((60, 10, 4), dtype = np.uint8)}, max_size = 64, padding = 4).pack()
@@ -0,0 +1,85 @@
+"""
+Checks that a BatchRenderer renders every tile of a manifest as the interactive path would, in manifest order, on one
+or many processes, and that a failing tile does not stop the others.
+
+Run from the project root with: python -m pytest
+"""
+import json
+from pathlib import Path
+import numpy as np
+import pytest
+from PIL import Image
+from classes.BatchRenderer import BatchRenderer
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+SHAPE = {"coords": [[1, 0], [1, 1]], "color": [20, 90, 20],
+         "repeat": {"count_x": 4, "count_y": 4, "spacing": [4, 4], "starting": [0, 0], "random_cut": True, "cut_chance": 0.5,
+                    "cut_color": [0, 0, 0], "seed": 7}}
+
+def manifest(tmp_path, directory):
+    """
+    Writes a manifest of two good tiles and one with a bad width.
+
+    Args:
+        tmp_path (Path): where the manifest is written.
+        directory (str): the output directory of the tiles.
+
+    Returns:
+        str: the path of the manifest.
+    """
+
+    tiles = [{"name": "grass", "width": 16, "height": 16, "background_color": [30, 120, 30], "line_color": [0, 0, 0],
+              "output_file": "grass.png", "output_directory": directory, "shapes": [SHAPE]},
+             {"name": "broken", "width": "16", "height": 16, "output_file": "broken.png", "output_directory": directory},
+             {"name": "sand", "width": 8, "height": 12, "background_color": [200, 180, 90], "line_color": [0, 0, 0],
+              "output_file": "sand.bmp", "output_directory": directory, "copies": 2}]
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"tiles": tiles}))
+    return str(path)
+
+def pixels(path):
+    """
+    Gets the RGBA pixels of an image file.
+
+    Args:
+        path (str): the image file.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGBA"))
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_manifest_renders_in_order(tmp_path, jobs):
+    results = BatchRenderer.fromManifest(manifest(tmp_path, str(tmp_path / "out")), jobs = jobs).run()
+    assert [result["name"] for result in results] == ["grass", "broken", "sand"]
+    assert [result["error"] is None for result in results] == [True, False, True]
+    assert results[2]["files"] == [str(tmp_path / "out" / "1_sand.bmp"), str(tmp_path / "out" / "2_sand.bmp")]
+    tile = TileGenerator(array = (16, 16), background_color = (30, 120, 30), line_color = (0, 0, 0), output_file = "grass.png",
+                         output_directory = str(tmp_path / "interactive"))
+    PixelShape.fromSpec(tile, SHAPE, draw = True)
+    assert np.array_equal(pixels(results[0]["files"][0]), np.asarray(tile.getImage().convert("RGBA")))
+
+def test_jobs_render_the_same_bytes(tmp_path):
+    one = BatchRenderer.fromManifest(manifest(tmp_path, str(tmp_path / "one")), jobs = 1).run()
+    many = BatchRenderer.fromManifest(manifest(tmp_path, str(tmp_path / "many")), jobs = 2).run()
+    for first, second in zip(one, many):
+        for first_file, second_file in zip(first["files"], second["files"]):
+            assert Path(first_file).read_bytes() == Path(second_file).read_bytes()
+
+def test_manifest_defaults(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps({"profile": "small", "tiles": [{"width": 4, "height": 4}, {"width": 4, "height": 4, "profile": "fast"}]}))
+    tiles = BatchRenderer.fromManifest(str(path)).tiles
+    assert [tile["name"] for tile in tiles] == ["tile_0", "tile_1"]
+    assert [tile["profile"] for tile in tiles] == ["small", "fast"]
+    assert all(tile["canvas"] for tile in tiles)
+
+def test_manifest_without_tiles_is_rejected(tmp_path):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps([{"width": 4, "height": 4}]))
+    with pytest.raises(ValueError):
+        BatchRenderer.fromManifest(str(path))
@@ -0,0 +1,91 @@
+"""
+Checks that the dihedral variants of a tile are its pixels rotated and flipped, the same as drawing the turned shapes,
+that symmetric tiles leave duplicates out, and that saveDihedral writes each distinct variant once.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from PIL import Image
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+WIDTH, HEIGHT = 12, 7
+POINTS = [(0, 0), (1, 0), (11, 2), (5, 6), (3, 4)]
+
+# where each transform takes the pixel at (x, y) of a WIDTH by HEIGHT tile, and the size it gives
+MOVES = {"identity": (lambda x, y: (x, y), (WIDTH, HEIGHT)),
+         "rot90": (lambda x, y: (y, WIDTH - 1 - x), (HEIGHT, WIDTH)),
+         "rot180": (lambda x, y: (WIDTH - 1 - x, HEIGHT - 1 - y), (WIDTH, HEIGHT)),
+         "rot270": (lambda x, y: (HEIGHT - 1 - y, x), (HEIGHT, WIDTH)),
+         "flipH": (lambda x, y: (WIDTH - 1 - x, y), (WIDTH, HEIGHT)),
+         "flipV": (lambda x, y: (x, HEIGHT - 1 - y), (WIDTH, HEIGHT)),
+         "transpose": (lambda x, y: (y, x), (HEIGHT, WIDTH)),
+         "transverse": (lambda x, y: (HEIGHT - 1 - y, WIDTH - 1 - x), (HEIGHT, WIDTH))}
+
+def tile(tmp_path, points = POINTS, size = (WIDTH, HEIGHT), **options):
+    """
+    Makes a tile with the points drawn on it.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        points (list of tuples): the points to draw.
+        size (tuple): the (width, height) of the tile.
+        options (dict): flags for the TileGenerator, such as canvas or indexed.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = size, background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile_generator, points, (200, 40, 40)).draw()
+    return tile_generator
+
+def rgba(img):
+    """
+    Gets the RGBA pixels of an image.
+
+    Args:
+        img (Image): any image.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    return np.asarray(img.convert("RGBA"))
+
+@pytest.mark.parametrize("options", [{}, {"canvas": True}, {"indexed": True}])
+def test_variants_match_the_turned_shapes(tmp_path, options):
+    variants = tile(tmp_path, **options).dihedralVariants()
+    assert list(variants) == list(TileGenerator.DIHEDRAL_TRANSFORMS)
+    for name, (move, size) in MOVES.items():
+        turned = tile(tmp_path, [move(x, y) for x, y in POINTS], size, **options)
+        assert np.array_equal(rgba(variants[name]), rgba(turned.getImage()))
+
+def test_symmetric_tiles_leave_duplicates_out(tmp_path):
+    variants = tile(tmp_path, [(0, 0), (5, 5)], (6, 6)).dihedralVariants()
+    distinct = [name for name, img in variants.items() if not isinstance(img, str)]
+    assert distinct == ["identity", "rot90"]
+    assert variants["rot180"] == variants["transpose"] == variants["transverse"] == "identity"
+    assert variants["rot270"] == variants["flipH"] == variants["flipV"] == "rot90"
+
+def test_saved_variants_are_written_once(tmp_path):
+    paths = tile(tmp_path, [(0, 0), (5, 5)], (6, 6)).saveDihedral(["identity", "rot90", "rot180", "flipH"], jobs = 2)
+    out = tmp_path / "out"
+    assert paths == {"identity": str(out / "tile.png"), "rot90": str(out / "tile_rot90.png"),
+                     "rot180": str(out / "tile.png"), "flipH": str(out / "tile_rot90.png")}
+    assert sorted(path.name for path in out.iterdir()) == ["tile.png", "tile_rot90.png"]
+
+def test_indexed_variants_stay_palette_images(tmp_path):
+    tile_generator = tile(tmp_path, indexed = True)
+    tile_generator.saveDihedral(["rot90"])
+    with Image.open(tmp_path / "out" / "tile_rot90.png") as saved:
+        assert saved.mode == "P"
+        assert np.array_equal(rgba(saved), rgba(tile_generator.dihedralVariants(["rot90"])["rot90"]))
+
+def test_unknown_transforms_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        tile(tmp_path).dihedralVariants(["rot45"])
+    with pytest.raises(ValueError):
+        tile(tmp_path, large = True).dihedralVariants()
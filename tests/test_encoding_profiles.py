@@ -0,0 +1,87 @@
+"""
+Checks that every encoding profile keeps the pixels of a tile in the lossless formats, and that the small profile writes
+pixel art as an exact palette image, GIF included, when the format can hold it.
+
+Run from the project root with: python -m pytest
+"""
+import io
+import numpy as np
+import pytest
+from PIL import Image
+from classes import config
+from classes.TileGenerator import TileGenerator
+
+def art(colors = 6, alpha = 255, size = 32):
+    """
+    Makes a pixel art image of a few colors.
+
+    Args:
+        colors (int): how many distinct colors, above 256 it is no longer pixel art.
+        alpha (int): the alpha of every other color, 255 for an opaque image.
+        size (int): the width and height.
+
+    Returns:
+        Image: the RGBA image.
+    """
+
+    rng = np.random.default_rng(colors)
+    palette = rng.integers(0, 256, (colors, 4), dtype = np.uint8)
+    palette[:, 3] = 255
+    palette[1::2, 3] = alpha
+    palette[:, 0] = np.arange(colors) % 256
+    palette[:, 1] = np.arange(colors) // 256
+    return Image.fromarray(palette[rng.integers(0, colors, (size, size))], "RGBA")
+
+def decoded(data):
+    """
+    Decodes an encoded image.
+
+    Args:
+        data (bytes): the encoded image.
+
+    Returns:
+        tuple: the mode of the file and its RGBA pixels.
+    """
+
+    with Image.open(io.BytesIO(data)) as img:
+        return img.mode, np.asarray(img.convert("RGBA"))
+
+@pytest.mark.parametrize("profile", config.ENCODING_PROFILES)
+@pytest.mark.parametrize("ext", [".png", ".bmp"])
+def test_profiles_keep_opaque_pixel_art(profile, ext):
+    img = art()
+    _, pixels = decoded(TileGenerator.encodeAs(img, "tile" + ext, profile))
+    assert np.array_equal(pixels, np.asarray(img))
+
+@pytest.mark.parametrize("ext", [".png", ".bmp", ".gif"])
+def test_small_profile_writes_palette_images(ext):
+    img = art()
+    mode, pixels = decoded(TileGenerator.encodeAs(img, "tile" + ext, "small"))
+    assert mode == "P"
+    assert np.array_equal(pixels, np.asarray(img))
+
+def test_small_png_keeps_translucent_palettes():
+    img = art(alpha = 128)
+    mode, pixels = decoded(TileGenerator.encodeAs(img, "tile.png", "small"))
+    assert mode == "P"
+    assert np.array_equal(pixels, np.asarray(img))
+
+def test_small_keeps_many_colors_as_they_are():
+    img = art(colors = 300)
+    mode, pixels = decoded(TileGenerator.encodeAs(img, "tile.png", "small"))
+    assert mode == "RGBA"
+    assert np.array_equal(pixels, np.asarray(img))
+
+@pytest.mark.parametrize("ext", [".gif", ".bmp"])
+def test_palette_is_skipped_for_alpha_the_format_can_not_hold(ext):
+    assert TileGenerator.toPalette(art(alpha = 128), ext) is None
+
+def test_small_pixel_art_is_not_larger():
+    img = art(size = 128)
+    assert len(TileGenerator.encodeAs(img, "tile.png", "small")) <= len(TileGenerator.encodeAs(img, "tile.png", "default"))
+
+def test_unknown_profile_falls_back_to_default(tmp_path):
+    tile = TileGenerator(array = (4, 4), output_file = "tile.png", output_directory = str(tmp_path), profile = "fast")
+    assert tile.profile == "fast"
+    tile.profile = "tiny"
+    assert tile.profile == "default"
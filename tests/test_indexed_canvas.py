@@ -0,0 +1,77 @@
+"""
+Checks that an indexed tile paints what the putpixel path paints, is saved as a palette PNG by every save path, and
+recolors by changing its palette.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from PIL import Image
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+BACKGROUND = (30, 60, 90)
+RED = (200, 40, 40)
+
+def tile(tmp_path, indexed = True, output_directory = "out"):
+    """
+    Makes a tile with a plain shape, a rounded shape and a seeded randomly cut repeat.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        indexed (bool): whether the tile keeps palette indices.
+        output_directory (str): the name of the output directory under tmp_path.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (24, 24), background_color = BACKGROUND, line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / output_directory), indexed = indexed)
+    PixelShape(tile_generator, [(1, 1), (5, 7), (23, 23)], RED).draw()
+    PixelShape(tile_generator, [(12, 12)], (10, 220, 130, 128), rounded_edges = True).draw(3)
+    cut = PixelShape(tile_generator, [(0, 0), (1, 0)], (250, 250, 0))
+    cut.repeat(6, 6, (4, 4), (0, 0), True, 0.5, (0, 0, 0), seed = 7)
+    cut.draw()
+    return tile_generator
+
+def test_indexed_pixels_match_putpixel_path(tmp_path):
+    assert np.array_equal(np.asarray(tile(tmp_path).getImage()), np.asarray(tile(tmp_path, indexed = False).getImage()))
+
+def test_indexed_tile_is_saved_as_palette_png(tmp_path):
+    tile_generator = tile(tmp_path)
+    tile_generator.saveImage()
+    with Image.open(tmp_path / "out" / "tile.png") as saved:
+        assert saved.mode == "P"
+        assert np.array_equal(np.asarray(saved.convert("RGBA")), np.asarray(tile_generator.getImage()))
+
+def test_async_save_matches_save_image(tmp_path):
+    tile_generator = tile(tmp_path)
+    tile_generator.saveImage()
+    tile_generator.output_directory = str(tmp_path / "async")
+    tile_generator.saveImageAsync().result()
+    assert (tmp_path / "out" / "tile.png").read_bytes() == (tmp_path / "async" / "tile.png").read_bytes()
+
+def test_recolor_only_changes_the_palette(tmp_path):
+    tile_generator = tile(tmp_path)
+    indices = tile_generator._canvas.indices.copy()
+    tile_generator.recolor({RED: (40, 40, 200)})
+    assert np.array_equal(tile_generator._canvas.indices, indices)
+    assert tile_generator.getImage().getpixel((5, 7)) == (40, 40, 200, 255)
+
+def test_recolored_copies_match_recoloring_the_tile(tmp_path):
+    tile_generator = tile(tmp_path)
+    paths = tile_generator.saveRecolors([{RED: (40, 40, 200)}, {BACKGROUND: (0, 0, 0)}])
+    plain = tile(tmp_path, indexed = False, output_directory = "plain")
+    plain.recolor({RED: (40, 40, 200)})
+    with Image.open(paths[0]) as first:
+        assert np.array_equal(np.asarray(first.convert("RGBA")), np.asarray(plain.getImage()))
+
+def test_background_must_be_a_color(tmp_path):
+    tile_generator = tile(tmp_path)
+    pixels = np.asarray(tile_generator.getImage()).copy()
+    for value in (None, (300, 0, 0), "red"):
+        with pytest.raises(ValueError):
+            tile_generator.background_color = value
+    assert tile_generator.background_color == BACKGROUND
+    assert np.array_equal(np.asarray(tile_generator.getImage()), pixels)
@@ -0,0 +1,93 @@
+"""
+Checks that instrumentation records the calls, pixels and bytes of the paths a tile actually takes, and nothing while off.
+
+Run from the project root with: python -m pytest
+"""
+import json
+import threading
+import pytest
+from classes.Instrumentation import Instrumentation
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+@pytest.fixture(autouse = True)
+def recording():
+    Instrumentation.reset()
+    Instrumentation.enable()
+    yield
+    Instrumentation.disable()
+    Instrumentation.reset()
+
+def tile(tmp_path):
+    """
+    Makes a 16 by 8 tile with a background.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    return TileGenerator(array = (16, 8), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path / "out"))
+
+def test_nothing_is_recorded_while_off(tmp_path):
+    Instrumentation.disable()
+    PixelShape(tile(tmp_path), [(1, 1)], (200, 40, 40)).draw()
+    assert Instrumentation.snapshot() == {}
+
+def test_draws_and_saves_are_counted(tmp_path):
+    tile_generator = tile(tmp_path)
+    PixelShape(tile_generator, [(1, 1), (2, 2), (3, 3)], (200, 40, 40)).draw()
+    tile_generator.saveImage()
+    stats = Instrumentation.snapshot()
+    assert stats["PixelShape.draw"]["calls"] == 1
+    assert stats["PixelShape.draw"]["pixels"] == 3
+    assert stats["TileGenerator._applyBackground"]["pixels"] == 16 * 8
+    assert stats["TileGenerator.saveImage"]["bytes"] == (tmp_path / "out" / "tile.png").stat().st_size
+
+def test_async_saves_are_counted_as_saves(tmp_path):
+    tile_generator = tile(tmp_path)
+    tile_generator.saveImageAsync(multiples = True, count = 2).result()
+    stats = Instrumentation.snapshot()["TileGenerator.saveImage"]
+    assert stats["calls"] == 1
+    assert stats["bytes"] == 2 * (tmp_path / "out" / "1_tile.png").stat().st_size
+
+def test_background_change_with_shapes_is_counted_as_a_repaint(tmp_path):
+    tile_generator = tile(tmp_path)
+    PixelShape(tile_generator, [(1, 1)], (200, 40, 40)).draw()
+    Instrumentation.reset()
+    tile_generator.background_color = (90, 60, 30)
+    stats = Instrumentation.snapshot()
+    assert stats["TileGenerator.redrawRegion"]["calls"] == 1
+    assert stats["TileGenerator.redrawRegion"]["pixels"] == 16 * 8
+
+def test_reset_while_other_threads_record():
+    errors = []
+
+    def work():
+        try:
+            for _ in range(2000):
+                Instrumentation._record("work", 0.001)
+                Instrumentation.count("work", pixels = 1)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target = work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(200):
+        Instrumentation.reset()
+        Instrumentation.snapshot()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    Instrumentation.reset()
+    assert Instrumentation.snapshot() == {}
+
+def test_export_writes_the_snapshot(tmp_path):
+    PixelShape(tile(tmp_path), [(1, 1)], (200, 40, 40)).draw()
+    Instrumentation.exportJSON(str(tmp_path / "stats.json"))
+    with open(tmp_path / "stats.json") as exported:
+        assert json.load(exported) == json.loads(json.dumps(Instrumentation.snapshot()))
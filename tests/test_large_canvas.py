@@ -0,0 +1,74 @@
+"""
+Checks that a large tile, kept in a memory mapped LargeCanvas and worked on in strips, renders and streams to disk
+exactly what an in memory tile does, and that its scratch file goes away with it.
+
+Run from the project root with: python -m pytest
+"""
+import gc
+import os
+import numpy as np
+import pytest
+from PIL import Image
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+@pytest.fixture(autouse = True)
+def small_strips(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "STRIP_BYTES", 40 * 4 * 3)
+    monkeypatch.setattr(config, "SCRATCH_DIRECTORY", str(tmp_path))
+
+def render(tmp_path, output_file, **options):
+    """
+    Renders points, rounded points, a seeded repeat and a background change on a 40 by 30 tile.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        output_file (str): the file name the tile is saved as.
+        options (dict): flags for the TileGenerator, such as large.
+
+    Returns:
+        TileGenerator: the rendered tile.
+    """
+
+    tile = TileGenerator(array = (40, 30), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = output_file,
+                         output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile, [(0, 0), (39, 29), (12, 3)], (200, 40, 40)).draw()
+    PixelShape(tile, [(6, 16), (30, 9)], (10, 220, 130), rounded_edges = True).draw(3)
+    shape = PixelShape(tile, [(0, 0), (1, 0)], (5, 5, 5))
+    shape.repeat(10, 8, (4, 4), (0, 0), True, 0.5, (250, 250, 0), seed = 3)
+    shape.draw()
+    return tile
+
+def pixels(path):
+    """
+    Gets the RGBA pixels of an image file.
+
+    Args:
+        path (Path): the image file.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGBA"))
+
+def test_large_tile_matches_an_in_memory_tile(tmp_path):
+    large = render(tmp_path, "tile.png", large = True)
+    assert large.large
+    assert np.array_equal(np.asarray(large.getImage().convert("RGBA")), np.asarray(render(tmp_path, "tile.png").getImage().convert("RGBA")))
+
+@pytest.mark.parametrize("output_file", ["tile.png", "tile.bmp"])
+def test_streamed_files_match_an_in_memory_save(tmp_path, output_file):
+    render(tmp_path, "large_" + output_file, large = True).saveImage()
+    render(tmp_path, output_file).saveImage()
+    assert np.array_equal(pixels(tmp_path / "out" / ("large_" + output_file)), pixels(tmp_path / "out" / output_file))
+
+def test_scratch_file_is_removed_with_the_tile(tmp_path):
+    tile = render(tmp_path, "tile.png", large = True)
+    scratch = [name for name in os.listdir(tmp_path) if name.startswith("large_canvas_")]
+    assert scratch
+    del tile
+    gc.collect()
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("large_canvas_")]
@@ -0,0 +1,76 @@
+"""
+Checks that a NoiseFill gives the same colors for the same seed wherever and however they are asked for, a rectangle,
+part of one, single pixels or a tile, and stays within its palette.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from classes import config
+from classes.NoiseFill import NoiseFill
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+PALETTE = [(0, 0, 0), (90, 140, 40), (200, 200, 120, 128), (255, 255, 255)]
+FILLS = [{"fill": "value"}, {"fill": "perlin", "octaves": 3}, {"fill": "simplex", "dither": True},
+         {"fill": "perlin", "smooth": True}, {"fill": "gradient", "start": [2, 3], "end": [40, 20]},
+         {"fill": "gradient", "start": [20, 20], "end": [30, 20], "radial": True, "dither": True}]
+
+def fill(spec, seed = 4):
+    """
+    Makes a NoiseFill over PALETTE.
+
+    Args:
+        spec (dict): the kind and options of the fill.
+        seed (int): the seed of the fill.
+
+    Returns:
+        NoiseFill: the fill.
+    """
+
+    return NoiseFill.fromSpec(dict(spec, palette = PALETTE, scale = 8, seed = seed))
+
+@pytest.mark.parametrize("spec", FILLS)
+def test_same_seed_same_colors(spec):
+    assert np.array_equal(fill(spec).render((0, 0, 48, 40)), fill(spec).render((0, 0, 48, 40)))
+    assert fill(NoiseFill.fromSpec(fill(spec).toSpec()).toSpec()) == fill(spec)
+
+@pytest.mark.parametrize("spec", FILLS[:4])
+def test_seeds_differ(spec):
+    assert not np.array_equal(fill(spec, 4).render((0, 0, 48, 40)), fill(spec, 5).render((0, 0, 48, 40)))
+
+@pytest.mark.parametrize("spec", FILLS)
+def test_colors_do_not_depend_on_how_they_are_asked_for(spec, monkeypatch):
+    whole = fill(spec).render((-8, -6, 56, 44))
+    assert np.array_equal(fill(spec).render((5, 7, 29, 33)), whole[13:39, 13:37])
+    ys, xs = np.mgrid[-6:44, -8:56]
+    assert np.array_equal(fill(spec).colorsAt(xs, ys).reshape(whole.shape), whole)
+    monkeypatch.setattr(config, "NOISE_BAND_ROWS", 3)
+    assert np.array_equal(fill(spec).render((-8, -6, 56, 44)), whole)
+
+@pytest.mark.parametrize("spec", [spec for spec in FILLS if not spec.get("smooth")])
+def test_colors_stay_in_the_palette(spec):
+    colors = {tuple(color) for color in fill(spec).render((0, 0, 48, 40)).reshape(-1, 4)}
+    assert colors <= {color if len(color) == 4 else color + (255,) for color in PALETTE}
+    assert len(colors) > 1
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_tiles_paint_the_fill(tmp_path, canvas):
+    background, shape_fill = fill(FILLS[1]), fill(FILLS[2], seed = 9)
+    tile = TileGenerator(array = (24, 16), background_color = background, line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path), canvas = canvas)
+    coords = [(1, 1), (5, 9), (23, 15)]
+    PixelShape(tile, coords, shape_fill).draw()
+    pixels = np.asarray(tile.getImage().convert("RGBA"))
+    expected = background.render((0, 0, 24, 16))
+    for (x, y), color in zip(coords, shape_fill.colorsAt([x for x, _ in coords], [y for _, y in coords])):
+        expected[y, x] = color
+    assert np.array_equal(pixels, expected)
+
+def test_bad_fills_are_rejected():
+    with pytest.raises(ValueError):
+        NoiseFill("plasma")
+    with pytest.raises(ValueError):
+        NoiseFill(palette = [])
+    with pytest.raises(ValueError):
+        NoiseFill(scale = 0)
@@ -0,0 +1,104 @@
+"""
+Checks that primitive shapes paint what PIL draws for them, that their masks only cover the part of them on the tile,
+and that a mask is rasterized once until the shape or the tile changes.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+from PIL import Image, ImageDraw
+from classes.PrimitiveShape import PrimitiveShape
+from classes.TileGenerator import TileGenerator
+
+BACKGROUND = (30, 60, 90)
+COLOR = (200, 40, 40)
+
+def tile(tmp_path, size = (32, 24)):
+    """
+    Makes an empty tile with a background.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        size (tuple): the (width, height) of the tile.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    return TileGenerator(array = size, background_color = BACKGROUND, line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path / "out"))
+
+def reference(size, paint):
+    """
+    Draws the expected tile with PIL alone.
+
+    Args:
+        size (tuple): the (width, height) of the tile.
+        paint (callable): called with an ImageDraw to draw the shape in COLOR.
+
+    Returns:
+        numpy.ndarray: the RGBA pixels.
+    """
+
+    img = Image.new("RGBA", size, BACKGROUND)
+    paint(ImageDraw.Draw(img))
+    return np.asarray(img)
+
+def test_rect_matches_pil(tmp_path):
+    tile_generator = tile(tmp_path)
+    PrimitiveShape.rect(tile_generator, (3, 4, 20, 15), COLOR).draw()
+    PrimitiveShape.rect(tile_generator, (22, 2, 30, 22), COLOR, filled = False, width = 2).draw()
+    expected = reference((32, 24), lambda draw: (draw.rectangle((3, 4, 19, 14), fill = COLOR), draw.rectangle((22, 2, 29, 21), outline = COLOR, width = 2)))
+    assert np.array_equal(np.asarray(tile_generator.getImage()), expected)
+
+def test_circle_and_line_match_pil(tmp_path):
+    tile_generator = tile(tmp_path)
+    PrimitiveShape.circle(tile_generator, (10, 10), 6, COLOR).draw()
+    PrimitiveShape.line(tile_generator, [(2, 20), (30, 20)], COLOR, width = 1).draw()
+    expected = reference((32, 24), lambda draw: (draw.ellipse((4, 4, 16, 16), fill = COLOR, outline = COLOR), draw.line([(2, 20), (30, 20)], fill = COLOR)))
+    assert np.array_equal(np.asarray(tile_generator.getImage()), expected)
+
+def test_shapes_hanging_off_the_tile_are_clipped(tmp_path):
+    tile_generator = tile(tmp_path)
+    PrimitiveShape.rect(tile_generator, (-10, -10, 5, 5), COLOR, filled = False, width = 3).draw()
+    PrimitiveShape.ellipse(tile_generator, (20, 12, 44, 36), COLOR).draw()
+    big = Image.new("RGBA", (80, 80), BACKGROUND)
+    draw = ImageDraw.Draw(big)
+    draw.rectangle((10, 10, 24, 24), outline = COLOR, width = 3)
+    draw.ellipse((40, 32, 63, 55), fill = COLOR, outline = COLOR)
+    assert np.array_equal(np.asarray(tile_generator.getImage()), np.asarray(big)[20:44, 20:52])
+
+def test_huge_shapes_only_rasterize_the_tile(tmp_path):
+    tile_generator = tile(tmp_path, (64, 64))
+    rect = PrimitiveShape.rect(tile_generator, (-20000, -20000, 20000, 20000), COLOR)
+    ellipse = PrimitiveShape.ellipse(tile_generator, (-8000, -8000, 8000, 8000), COLOR, filled = False)
+    for shape in (rect, ellipse):
+        left, top, mask = shape._mask()
+        assert (left, top) == (0, 0)
+        assert mask.shape[0] <= 64 + 2 and mask.shape[1] <= 64 + 2
+    rect.draw()
+    assert rect.getBounds() == (0, 0, 64, 64)
+
+def test_mask_is_kept_until_the_shape_or_tile_changes(tmp_path, monkeypatch):
+    tile_generator = tile(tmp_path)
+    shape = PrimitiveShape.ellipse(tile_generator, (4, 4, 20, 20), COLOR)
+    calls = []
+    raster = PrimitiveShape._rasterMask
+    monkeypatch.setattr(PrimitiveShape, "_rasterMask", lambda self, width, height: calls.append((width, height)) or raster(self, width, height))
+    shape.draw()
+    shape.getBounds()
+    shape.paints(10, 10)
+    tile_generator.redrawRegion((0, 0, 32, 24))
+    assert calls == [(32, 24)]
+    tile_generator.array = (16, 16)
+    shape.getBounds()
+    assert calls[-1] == (16, 16)
+    assert shape.getBounds() == (4, 4, 16, 16)
+
+def test_flood_fill_stops_at_other_colors(tmp_path):
+    tile_generator = tile(tmp_path)
+    PrimitiveShape.rect(tile_generator, (4, 4, 12, 12), COLOR, filled = False).draw()
+    PrimitiveShape.floodFill(tile_generator, (7, 7), (0, 255, 0)).draw()
+    pixels = np.asarray(tile_generator.getImage())
+    assert (pixels[5:11, 5:11] == (0, 255, 0, 255)).all()
+    assert (pixels[4, 4:12] == COLOR + (255,)).all()
+    assert (pixels[0, 0] == BACKGROUND + (255,)).all()
@@ -0,0 +1,102 @@
+"""
+Checks that the RenderCache key follows everything that changes the encoded bytes of a tile, and that the cached bytes
+are the ones a fresh render of the tile's spec gives, also when the cache is shared by threads.
+
+Run from the project root with: python -m pytest
+"""
+import threading
+import numpy as np
+from PIL import Image
+from classes.BatchRenderer import renderTile
+from classes.PixelShape import PixelShape
+from classes.RenderCache import RenderCache
+from classes.TileGenerator import TileGenerator
+
+def tile(tmp_path, radius = 2, drawn = True, indexed = False):
+    """
+    Makes a tile with one rounded shape.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        radius (int): the radius the shape is drawn with.
+        drawn (bool): whether the shape is drawn at all.
+        indexed (bool): whether the tile keeps palette indices.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (16, 16), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), indexed = indexed)
+    shape = PixelShape(tile_generator, [(8, 8)], (200, 40, 40), rounded_edges = True)
+    if drawn:
+        shape.draw(radius)
+    return tile_generator
+
+def test_key_is_stable(tmp_path):
+    assert tile(tmp_path).cacheKey() == tile(tmp_path).cacheKey()
+
+def test_key_follows_radius(tmp_path):
+    assert tile(tmp_path, radius = 1).cacheKey() != tile(tmp_path, radius = 3).cacheKey()
+
+def test_key_follows_drawn_state(tmp_path):
+    assert tile(tmp_path).cacheKey() != tile(tmp_path, drawn = False).cacheKey()
+
+def test_key_follows_indexed_mode(tmp_path):
+    assert tile(tmp_path).cacheKey() != tile(tmp_path, indexed = True).cacheKey()
+
+def test_key_follows_palette(tmp_path):
+    def ordered(reverse):
+        tile_generator = TileGenerator(array = (16, 16), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                       output_directory = str(tmp_path / "out"), indexed = True)
+        shapes = [PixelShape(tile_generator, [(1, 1)], (200, 40, 40)), PixelShape(tile_generator, [(2, 2)], (40, 40, 200))]
+        for shape in reversed(shapes) if reverse else shapes:
+            shape.draw()
+        return tile_generator
+
+    first, second = ordered(False), ordered(True)
+    assert RenderCache.keyFor(first.toSpec()) == RenderCache.keyFor(second.toSpec())
+    assert first.cacheKey() != second.cacheKey()
+
+def test_unseeded_random_cut_is_not_cached(tmp_path):
+    tile_generator = tile(tmp_path)
+    PixelShape(tile_generator, [(0, 0)], (0, 0, 0)).repeat(4, 4, (4, 4), (0, 0), True, 0.5)
+    assert tile_generator.cacheKey() is None
+
+def test_cached_bytes_match_a_render_after_the_image_is_made_again(tmp_path):
+    tile_generator = TileGenerator(array = (8, 8), output_file = "tile.png", output_directory = str(tmp_path / "out"))
+    PixelShape(tile_generator, [(0, 0)], (255, 0, 0)).draw()
+    tile_generator.output_file = "again.png"
+    tile_generator.array = (10, 6)
+    cache = RenderCache(str(tmp_path / "cache"))
+    tile_generator.saveImage(cache = cache)
+    spec = dict(tile_generator.toSpec(), name = "again", output_directory = str(tmp_path / "batch"))
+    cached = renderTile(spec, (cache.directory, cache.max_bytes))
+    rendered = renderTile(dict(spec, output_directory = str(tmp_path / "fresh")), None)
+    assert cached["cache"] == "hit"
+    with Image.open(cached["files"][0]) as hit, Image.open(rendered["files"][0]) as fresh:
+        assert np.array_equal(np.asarray(hit), np.asarray(fresh))
+        assert hit.getpixel((0, 0)) == (255, 0, 0, 255)
+
+def test_threads_share_a_cache(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"), max_bytes = 16 * 1024)
+    errors = []
+
+    def work(worker):
+        try:
+            for i in range(200):
+                key = f"{worker:02d}{i % 40:062d}"
+                if cache.get(key) is None:
+                    cache.put(key, bytes([worker]) * 1024)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target = work, args = (worker,)) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert cache.hits + cache.misses == 8 * 200
+    cache.evict()
+    assert cache.size <= cache.max_bytes
@@ -0,0 +1,88 @@
+"""
+Checks that the NumPy canvas path of TileGenerator renders and saves exactly what the original PIL putpixel path does.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+SIZE = 24
+BACKGROUND = (30, 60, 90)
+POINTS = [(0, 0), (1, 0), (0, 1), (5, 7), (23, 23), (12, 3)]
+POINT_COLOR = (200, 40, 40)
+CENTERS = [(6, 16), (18, 9)]
+ELLIPSE_COLOR = (10, 220, 130, 255)
+RADIUS = 3
+
+def baseline():
+    """
+    Renders the reference tile with nothing but PIL, a filled background, putpixel per point and one ellipse per center.
+
+    Returns:
+        Image: the RGBA reference image.
+    """
+
+    img = Image.new("RGBA", (SIZE, SIZE), BACKGROUND)
+    for point in POINTS:
+        img.putpixel(point, POINT_COLOR)
+    draw = ImageDraw.Draw(img)
+    for x, y in CENTERS:
+        draw.ellipse([x - RADIUS, y - RADIUS, x + RADIUS, y + RADIUS], fill = ELLIPSE_COLOR)
+    return img
+
+def render(tmp_path, **options):
+    """
+    Renders the reference shapes on a TileGenerator.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        options (dict): flags for the TileGenerator, such as canvas.
+
+    Returns:
+        TileGenerator: the rendered tile.
+    """
+
+    tile = TileGenerator(array = (SIZE, SIZE), background_color = BACKGROUND, line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile, POINTS, POINT_COLOR).draw()
+    PixelShape(tile, CENTERS, ELLIPSE_COLOR, rounded_edges = True).draw(RADIUS)
+    return tile
+
+def pixels(img):
+    """
+    Gets the RGBA pixels of an image as an array.
+
+    Args:
+        img (Image): any image.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    return np.asarray(img.convert("RGBA"))
+
+def test_pil_path_matches_baseline(tmp_path):
+    assert np.array_equal(pixels(render(tmp_path).getImage()), pixels(baseline()))
+
+def test_canvas_path_matches_baseline(tmp_path):
+    assert np.array_equal(pixels(render(tmp_path, canvas = True).getImage()), pixels(baseline()))
+
+@pytest.mark.parametrize("canvas", [False, True])
+@pytest.mark.parametrize("ext", [".png", ".bmp"])
+def test_saved_file_matches_baseline(tmp_path, canvas, ext):
+    tile = render(tmp_path, canvas = canvas)
+    tile.output_file = "tile" + ext
+    tile.saveImage()
+    with Image.open(tmp_path / "out" / ("tile" + ext)) as saved:
+        assert np.array_equal(pixels(saved), pixels(baseline()))
+
+def test_canvas_image_is_built_once_per_write(tmp_path):
+    tile = render(tmp_path, canvas = True)
+    image = tile.getImage()
+    assert tile.getImage() is image
+    PixelShape(tile, [(2, 2)], (0, 0, 255)).draw()
+    assert tile.getImage() is not image
+    assert tile.getImage().getpixel((2, 2)) == (0, 0, 255, 255)
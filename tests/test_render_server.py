@@ -0,0 +1,99 @@
+"""
+Checks that the render service answers renders over HTTP, keeps saved tiles under its root, and tells a bad request
+(400) apart from an unknown generator or path (404).
+
+Run from the project root with: python -m pytest
+"""
+import http.client
+import io
+import json
+import os
+import pytest
+from PIL import Image
+from classes import config
+from classes.RenderServer import RenderServer
+
+SPEC = {"width": 8, "height": 4, "background_color": [30, 60, 90], "output_file": "tile.png",
+        "shapes": [{"coords": [[1, 1]], "color": [200, 40, 40]}]}
+
+@pytest.fixture
+def server(tmp_path):
+    render_server = RenderServer(port = 0, jobs = 2, root = str(tmp_path / "root"))
+    render_server.start()
+    yield render_server
+    render_server.stop()
+
+def request(render_server, method, path, body = None):
+    """
+    Sends one request to the server.
+
+    Args:
+        render_server (RenderServer): the running server.
+        method (str): the HTTP method.
+        path (str): the path.
+        body (object): encoded as JSON when given.
+
+    Returns:
+        tuple: the status and the body bytes.
+    """
+
+    connection = http.client.HTTPConnection(*render_server.address, timeout = 30)
+    try:
+        connection.request(method, path, json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+def test_health(server):
+    assert request(server, "GET", "/health") == (200, b'{"ok": true}')
+
+def test_spec_render_returns_the_image(server):
+    status, data = request(server, "POST", "/render", {"spec": SPEC})
+    assert status == 200
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.size == (8, 4)
+        assert image.convert("RGBA").getpixel((1, 1)) == (200, 40, 40, 255)
+        assert image.convert("RGBA").getpixel((0, 0)) == (30, 60, 90, 255)
+
+def test_named_generator_keeps_its_shapes(server):
+    assert request(server, "POST", "/render", {"name": "grass", "spec": SPEC})[0] == 200
+    status, data = request(server, "POST", "/render", {"name": "grass", "shapes": [{"coords": [[2, 2]], "color": [0, 255, 0]}]})
+    assert status == 200
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.convert("RGBA").getpixel((1, 1)) == (200, 40, 40, 255)
+        assert image.convert("RGBA").getpixel((2, 2)) == (0, 255, 0, 255)
+    assert request(server, "DELETE", "/generators/grass")[0] == 200
+    assert request(server, "DELETE", "/generators/grass")[0] == 404
+
+def test_unknown_generator_and_path_are_404(server):
+    assert request(server, "POST", "/render", {"name": "missing"})[0] == 404
+    assert request(server, "GET", "/nothing")[0] == 404
+    assert request(server, "POST", "/nothing", {"spec": SPEC})[0] == 404
+
+@pytest.mark.parametrize("body", [
+    None,
+    {"spec": dict(SPEC, width = "8")},
+    {"spec": dict(SPEC, shapes = [{"primitive": "rect", "params": {}, "color": [1, 2, 3]}])},
+    {"name": "grass", "spec": dict(SPEC, shapes = [{"primitive": "rect", "params": {}, "color": [1, 2, 3]}])},
+])
+def test_bad_specs_are_400(server, body):
+    assert request(server, "POST", "/render", body)[0] == 400
+
+def test_oversized_specs_are_400(server):
+    side = config.SERVER_MAX_TILE_SIDE + 1
+    assert request(server, "POST", "/render", {"spec": dict(SPEC, width = side)})[0] == 400
+    assert request(server, "POST", "/render", {"name": "big", "spec": dict(SPEC, height = side)})[0] == 400
+    assert "big" not in server.generators
+
+def test_saves_stay_under_root(server, tmp_path):
+    status, data = request(server, "POST", "/render", {"spec": dict(SPEC, output_directory = "tiles"), "save": True})
+    assert status == 200
+    files = json.loads(data)["files"]
+    assert files == [os.path.join(server.root, "tiles", "tile.png")]
+    assert os.path.isfile(files[0])
+    for spec in (dict(SPEC, output_directory = "../outside"), dict(SPEC, output_directory = str(tmp_path)),
+                 dict(SPEC, output_file = "../tile.png")):
+        assert request(server, "POST", "/render", {"spec": spec, "save": True})[0] == 400
+    assert not (tmp_path / "outside").exists()
+    assert not (tmp_path / "tile.png").exists()
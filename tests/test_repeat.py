@@ -0,0 +1,114 @@
+"""
+Checks that PixelShape.repeat builds the lattice of the original nested loops, and that a seeded random cut is the same
+on every run, every pixel path and every chunk size.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from PIL import Image
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+SIZE = 24
+BACKGROUND = (30, 60, 90)
+BASE = [(0, 0), (1, 0), (0, 1)]
+COLOR = (200, 40, 40)
+CUT_COLOR = (0, 0, 0)
+
+def tile(tmp_path, **options):
+    """
+    Makes an empty tile.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        options (dict): flags for the TileGenerator, such as canvas.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    return TileGenerator(array = (SIZE, SIZE), background_color = BACKGROUND, line_color = (0, 0, 0), output_file = "tile.png",
+                         output_directory = str(tmp_path / "out"), **options)
+
+def reference(count_x, count_y, spacing, start_pixel, cut_chance, seed):
+    """
+    Repeats and draws BASE with the nested loops and putpixel of the original repeat, drawing the cut from a Generator
+    one on grid pixel at a time.
+
+    Args:
+        count_x (int): horizontal repeats.
+        count_y (int): vertical repeats.
+        spacing (tuple of int): the x and y spacing.
+        start_pixel (tuple of int): the origin of the cut grid.
+        cut_chance (float): the chance a grid pixel keeps COLOR.
+        seed (int): the seed of the random cut, None for no cut.
+
+    Returns:
+        tuple: the RGBA pixels and the list of coords left for draw.
+    """
+
+    img = Image.new("RGBA", (SIZE, SIZE), BACKGROUND)
+    rng = np.random.default_rng(seed)
+    coords = []
+    for i in range(count_x):
+        for j in range(count_y):
+            for x, y in BASE:
+                new_x, new_y = x + i * spacing[0], y + j * spacing[1]
+                if new_x < SIZE and new_y < SIZE:
+                    if seed is not None and (new_x - start_pixel[0]) % spacing[0] == 0 and (new_y - start_pixel[1]) % spacing[1] == 0:
+                        img.putpixel((new_x, new_y), CUT_COLOR if rng.random() > cut_chance else COLOR)
+                    else:
+                        coords.append((new_x, new_y))
+    for coord in coords:
+        img.putpixel(coord, COLOR)
+    return np.asarray(img), coords
+
+def repeated(tmp_path, seed = None, **options):
+    """
+    Repeats and draws BASE on a tile.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        seed (int): the seed of the random cut, None for no cut.
+        options (dict): flags for the TileGenerator, such as canvas.
+
+    Returns:
+        tuple: the RGBA pixels and the list of coords left for draw.
+    """
+
+    shape = PixelShape(tile(tmp_path, **options), BASE, COLOR)
+    shape.repeat(7, 6, (4, 5), (0, 0), seed is not None, 0.5, CUT_COLOR, seed = seed)
+    shape.draw()
+    return np.asarray(shape.tile_generator.getImage().convert("RGBA")), [tuple(coord) for coord in shape.coords]
+
+def test_lattice_keeps_the_loop_order(tmp_path):
+    pixels, coords = repeated(tmp_path)
+    expected_pixels, expected_coords = reference(7, 6, (4, 5), (0, 0), 0.5, None)
+    assert coords == expected_coords
+    assert np.array_equal(pixels, expected_pixels)
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_seeded_cut_matches_the_loop(tmp_path, canvas):
+    pixels, coords = repeated(tmp_path, seed = 7, canvas = canvas)
+    expected_pixels, expected_coords = reference(7, 6, (4, 5), (0, 0), 0.5, 7)
+    assert coords == expected_coords
+    assert np.array_equal(pixels, expected_pixels)
+
+def test_seeded_cut_repeats_and_seeds_differ(tmp_path):
+    assert np.array_equal(repeated(tmp_path, seed = 3)[0], repeated(tmp_path, seed = 3)[0])
+    assert not np.array_equal(repeated(tmp_path, seed = 3)[0], repeated(tmp_path, seed = 4)[0])
+
+def test_chunk_size_does_not_change_the_result(tmp_path, monkeypatch):
+    whole = repeated(tmp_path, seed = 11)
+    monkeypatch.setattr(config, "REPEAT_CHUNK_SIZE", 5)
+    chunked = repeated(tmp_path, seed = 11)
+    assert whole[1] == chunked[1]
+    assert np.array_equal(whole[0], chunked[0])
+
+def test_repeat_is_recorded_in_the_spec(tmp_path):
+    shape = PixelShape(tile(tmp_path), BASE, COLOR)
+    shape.repeat(7, 6, (4, 5), (0, 0), True, 0.5, CUT_COLOR, seed = 7)
+    rebuilt = PixelShape.fromSpec(tile(tmp_path), shape.toSpec())
+    assert [tuple(coord) for coord in rebuilt.coords] == [tuple(coord) for coord in shape.coords]
@@ -0,0 +1,99 @@
+"""
+Checks that a ResidencyManager keeps the resident pixels of its tiles within budget by spilling the least recently
+used, and that a spilled tile reads back, draws and saves exactly as a tile that was never spilled.
+
+Run from the project root with: python -m pytest
+"""
+import gc
+import os
+import numpy as np
+import pytest
+from classes.PixelShape import PixelShape
+from classes.ResidencyManager import ResidencyManager
+from classes.TileGenerator import TileGenerator
+
+OPTIONS = [{}, {"canvas": True}, {"indexed": True}]
+
+def tile(tmp_path, index, **options):
+    """
+    Makes a 16 by 16 tile with a shape whose place depends on index.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        index (int): which tile this is.
+        options (dict): flags for the TileGenerator, such as canvas or indexed.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (16, 16), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = f"tile_{index}.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile_generator, [(index, index), (15 - index, 3)], (200, 40, 40), rounded_edges = True).draw(2)
+    return tile_generator
+
+def rgba(tile_generator):
+    """
+    Gets the RGBA pixels of a tile.
+
+    Args:
+        tile_generator (TileGenerator): the tile.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    return np.array(tile_generator.getImage().convert("RGBA"))
+
+@pytest.fixture
+def manager(tmp_path):
+    return ResidencyManager(max_bytes = 2 * 16 * 16 * 4, directory = str(tmp_path))
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_least_recently_used_tiles_are_spilled(tmp_path, manager, options):
+    tiles = [tile(tmp_path, index, **options) for index in range(5)]
+    for tile_generator in tiles:
+        manager.add(tile_generator)
+    assert manager.resident_bytes <= manager.max_bytes
+    assert manager.resident + manager.spilled == 5
+    assert manager.spilled >= 2
+    assert manager.stats()["spills"] == manager.spilled
+
+@pytest.mark.parametrize("options", OPTIONS)
+def test_spilled_tiles_draw_and_save_as_before(tmp_path, manager, options):
+    tiles = [tile(tmp_path, index, **options) for index in range(5)]
+    for tile_generator in tiles:
+        manager.add(tile_generator)
+    for index, tile_generator in enumerate(tiles):
+        PixelShape(tile_generator, [(8, 8)], (0, 0, 255)).draw()
+        tile_generator.saveImage()
+        expected = tile(tmp_path, index, **options)
+        PixelShape(expected, [(8, 8)], (0, 0, 255)).draw()
+        assert np.array_equal(rgba(tile_generator), rgba(expected))
+        expected.output_file = f"expected_{index}.png"
+        expected.saveImage()
+        assert (tmp_path / "out" / f"tile_{index}.png").read_bytes() == (tmp_path / "out" / f"expected_{index}.png").read_bytes()
+        assert manager.resident_bytes <= manager.max_bytes
+    assert manager.stats()["rehydrations"] >= 3
+
+def test_spill_space_is_reused(tmp_path, manager):
+    tiles = [tile(tmp_path, index, canvas = True) for index in range(5)]
+    for tile_generator in tiles:
+        manager.add(tile_generator)
+    size = os.path.getsize(manager.path)
+    for _ in range(4):
+        for tile_generator in tiles:
+            tile_generator.getImage()
+    assert os.path.getsize(manager.path) == size
+
+def test_tiles_are_forgotten_and_removed(tmp_path, manager):
+    tiles = [tile(tmp_path, index, canvas = True) for index in range(5)]
+    for tile_generator in tiles:
+        manager.add(tile_generator)
+    expected = rgba(tile(tmp_path, 0, canvas = True))
+    manager.remove(tiles[0])
+    assert tiles[0]._residency is None
+    assert np.array_equal(rgba(tiles[0]), expected)
+    del tiles[1:], tile_generator
+    gc.collect()
+    assert manager.resident + manager.spilled == 0
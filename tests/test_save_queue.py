@@ -0,0 +1,109 @@
+"""
+Checks that a SaveQueue writes the same bytes a blocking save does from a snapshot taken at submit, holds submits back
+while it is over its byte budget, and keeps errors on their futures.
+
+Run from the project root with: python -m pytest
+"""
+import threading
+import pytest
+from classes.PixelShape import PixelShape
+from classes.SaveQueue import SaveQueue
+from classes.TileGenerator import TileGenerator
+
+def tile(tmp_path, **options):
+    """
+    Makes an 8 by 8 tile with one drawn pixel.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        options (dict): flags for the TileGenerator, such as canvas.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (8, 8), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile_generator, [(1, 1)], (200, 40, 40)).draw()
+    return tile_generator
+
+@pytest.fixture
+def queue():
+    save_queue = SaveQueue(workers = 1, max_bytes = 8 * 8 * 4)
+    yield save_queue
+    save_queue.shutdown()
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_async_save_writes_the_bytes_of_a_blocking_save(tmp_path, queue, canvas):
+    tile_generator = tile(tmp_path, canvas = canvas)
+    tile_generator.saveImage()
+    blocking = (tmp_path / "out" / "tile.png").read_bytes()
+    tile_generator.output_file = "queued.png"
+    assert tile_generator.saveImageAsync(multiples = True, count = 2, queue = queue).result() == [
+        str(tmp_path / "out" / "1_queued.png"), str(tmp_path / "out" / "2_queued.png")]
+    assert (tmp_path / "out" / "1_queued.png").read_bytes() == (tmp_path / "out" / "2_queued.png").read_bytes() == blocking
+
+def held(release):
+    """
+    Wraps the writer of SaveQueue so every write waits for release.
+
+    Args:
+        release (threading.Event): set to let the writes through.
+
+    Returns:
+        staticmethod: the waiting writer.
+    """
+
+    write = SaveQueue._write
+
+    def wait(*args):
+        release.wait()
+        return write(*args)
+
+    return staticmethod(wait)
+
+def test_snapshot_is_taken_at_submit(tmp_path, queue, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(SaveQueue, "_write", held(release))
+    tile_generator = tile(tmp_path)
+    tile_generator.saveImage()
+    blocking = (tmp_path / "out" / "tile.png").read_bytes()
+    future = tile_generator.saveImageAsync(queue = queue)
+    PixelShape(tile_generator, [(2, 2)], (0, 0, 255)).draw()
+    release.set()
+    future.result()
+    assert (tmp_path / "out" / "tile.png").read_bytes() == blocking
+
+def test_submit_waits_for_room(tmp_path, queue, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(SaveQueue, "_write", held(release))
+    tile_generator = tile(tmp_path)
+    first = tile_generator.saveImageAsync(queue = queue)
+    submitted = []
+    waiting = threading.Thread(target = lambda: submitted.append(tile_generator.saveImageAsync(queue = queue)))
+    waiting.start()
+    waiting.join(0.3)
+    assert waiting.is_alive() and not submitted
+    assert queue.pending == 1
+    release.set()
+    waiting.join(30)
+    assert not waiting.is_alive()
+    queue.flush()
+    assert first.done() and submitted[0].done()
+    assert queue.pending == 0
+
+def test_errors_stay_on_their_futures(tmp_path, queue, monkeypatch):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(SaveQueue, "_write", staticmethod(fail))
+    future = tile(tmp_path).saveImageAsync(queue = queue)
+    queue.flush()
+    assert isinstance(future.exception(), OSError)
+    assert queue.pending == 0
+
+def test_large_tiles_are_not_queued(tmp_path, queue):
+    with pytest.raises(ValueError):
+        tile(tmp_path, large = True).saveImageAsync(queue = queue)
+    with pytest.raises(ValueError):
+        queue.submit(tile(tmp_path), count = 0)
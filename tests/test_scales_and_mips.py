@@ -0,0 +1,97 @@
+"""
+Checks that saveImage derives every display scale and mip level from the one rendered image, scales by repeating
+pixels and mips by averaging each 2x2 block of the level above, down to a single pixel.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from PIL import Image
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def tile(tmp_path, **options):
+    """
+    Makes a 16 by 8 opaque tile of random pixels.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        options (dict): flags for the TileGenerator, such as canvas or indexed.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (16, 8), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    rng = np.random.default_rng(6)
+    for color in ((200, 40, 40), (10, 220, 130), (250, 250, 0)):
+        PixelShape(tile_generator, [tuple(int(value) for value in coord) for coord in rng.integers(0, 8, (20, 2)) * (2, 1)], color).draw()
+    return tile_generator
+
+def read(tmp_path, name):
+    """
+    Reads a saved file.
+
+    Args:
+        tmp_path (Path): the root of the output directory.
+        name (str): the file name.
+
+    Returns:
+        tuple: the mode of the file and its RGBA pixels as int arrays.
+    """
+
+    with Image.open(tmp_path / "out" / name) as img:
+        return img.mode, np.asarray(img.convert("RGBA")).astype(np.int64)
+
+def halved(pixels):
+    """
+    Averages every 2x2 block of pixels, or 2x1 block once a side is down to one pixel.
+
+    Args:
+        pixels (numpy.ndarray): the (height, width, 4) pixels of a level.
+
+    Returns:
+        numpy.ndarray: the float pixels of the level below it.
+    """
+
+    height, width = pixels.shape[:2]
+    rows, columns = max(1, height // 2), max(1, width // 2)
+    return pixels.reshape(rows, height // rows, columns, width // columns, 4).mean(axis = (1, 3))
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_scales_and_mips_are_derived_from_the_image(tmp_path, canvas):
+    tile_generator = tile(tmp_path, canvas = canvas)
+    tile_generator.saveImage(scales = [1, 2, 3], mips = True, jobs = 2)
+    _, pixels = read(tmp_path, "tile.png")
+    assert np.array_equal(pixels, np.asarray(tile_generator.getImage().convert("RGBA")))
+    for scale in (2, 3):
+        assert np.array_equal(read(tmp_path, f"tile@{scale}x.png")[1], pixels.repeat(scale, axis = 0).repeat(scale, axis = 1))
+    above = pixels
+    for level, size in enumerate([(8, 4), (4, 2), (2, 1), (1, 1)], start = 1):
+        _, mip = read(tmp_path, f"tile_mip{level}.png")
+        assert mip.shape[:2] == (size[1], size[0])
+        assert np.abs(mip - halved(above)).max() <= 1
+        above = mip
+    assert not (tmp_path / "out" / "tile_mip5.png").exists()
+
+def test_copies_are_saved_for_every_size(tmp_path):
+    tile(tmp_path).saveImage(multiples = True, count = 2, scales = [2])
+    names = sorted(path.name for path in (tmp_path / "out").iterdir())
+    assert names == ["1_tile@2x.png", "2_tile@2x.png"]
+    assert (tmp_path / "out" / names[0]).read_bytes() == (tmp_path / "out" / names[1]).read_bytes()
+
+def test_indexed_scales_stay_palette_images(tmp_path):
+    tile(tmp_path, indexed = True).saveImage(scales = [1, 4])
+    assert read(tmp_path, "tile.png")[0] == read(tmp_path, "tile@4x.png")[0] == "P"
+
+def test_bad_scales_are_rejected(tmp_path):
+    for scales in ([0], [1.5], [True], 2):
+        with pytest.raises(ValueError):
+            tile(tmp_path).saveImage(scales = scales)
+    with pytest.raises(ValueError):
+        tile(tmp_path, large = True).saveImage(scales = [2])
+    randomized = tile(tmp_path)
+    PixelShape(randomized, [(0, 0)], (0, 0, 0)).repeat(4, 4, (4, 4), (0, 0), True, 0.5, seed = 1)
+    with pytest.raises(ValueError):
+        randomized.saveImage(multiples = True, count = 2, variants = True, scales = [2])
@@ -0,0 +1,88 @@
+"""
+Checks that a Session file brings back every generator and shape as it was saved, pixels, coords, cuts and drawing
+order included, and that changes to a loaded tile never reach the file.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from classes.PixelShape import PixelShape
+from classes.PrimitiveShape import PrimitiveShape
+from classes.Session import Session
+from classes.TileGenerator import TileGenerator
+
+def tile(tmp_path, **options):
+    """
+    Makes a tile with plain, rounded, repeated and primitive shapes.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        options (dict): flags for the TileGenerator, such as canvas or indexed.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (20, 14), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    PixelShape(tile_generator, [(1, 1), (2, 2)], (200, 40, 40)).draw()
+    PixelShape(tile_generator, [(10, 7)], (10, 220, 130), rounded_edges = True).draw(3)
+    shape = PixelShape(tile_generator, [(0, 0), (1, 0)], (5, 5, 5))
+    shape.repeat(5, 4, (4, 4), (0, 0), True, 0.5, (250, 250, 0), seed = 3)
+    shape.draw()
+    PrimitiveShape(tile_generator, "rect", {"box": [12, 2, 18, 6]}, (40, 40, 200)).draw()
+    return tile_generator
+
+def rgba(tile_generator):
+    """
+    Gets the RGBA pixels of a tile.
+
+    Args:
+        tile_generator (TileGenerator): the tile.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    return np.array(tile_generator.getImage().convert("RGBA"))
+
+@pytest.mark.parametrize("options", [{}, {"canvas": True}, {"indexed": True}])
+def test_round_trip_keeps_tiles_and_shapes(tmp_path, options):
+    tile_generator = tile(tmp_path, **options)
+    path = str(tmp_path / "work.session")
+    Session({"grass": tile_generator}, {"rect": tile_generator.shapes[-1]}).save(path)
+    loaded = Session.load(path)
+    restored = loaded.tile_generators["grass"]
+    assert restored.toSpec() == tile_generator.toSpec()
+    assert np.array_equal(rgba(restored), rgba(tile_generator))
+    assert loaded.shapes["rect"] is restored.shapes[-1]
+    for saved, shape in zip(tile_generator.shapes, restored.shapes):
+        assert type(shape) is type(saved)
+        assert np.array_equal(np.asarray(shape.coords), np.asarray(saved.coords))
+
+def test_loaded_tiles_keep_drawing_without_touching_the_file(tmp_path):
+    path = tmp_path / "work.session"
+    Session({"grass": tile(tmp_path, canvas = True)}).save(str(path))
+    stored = path.read_bytes()
+    restored = Session.load(str(path)).tile_generators["grass"]
+    PixelShape(restored, [(19, 13)], (0, 0, 0)).draw()
+    restored.background_color = (90, 60, 30)
+    expected = tile(tmp_path, canvas = True)
+    PixelShape(expected, [(19, 13)], (0, 0, 0)).draw()
+    expected.background_color = (90, 60, 30)
+    assert np.array_equal(rgba(restored), rgba(expected))
+    assert path.read_bytes() == stored
+
+def test_shapes_off_the_session_tiles_are_kept(tmp_path):
+    tile_generator = tile(tmp_path)
+    path = str(tmp_path / "work.session")
+    Session({}, {"loose": tile_generator.shapes[0]}).save(path)
+    shape = Session.load(path).shapes["loose"]
+    assert shape.tile_generator is None
+    assert shape.toSpec() == tile_generator.shapes[0].toSpec()
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "work.session"
+    path.write_bytes(b"not a session at all")
+    with pytest.raises(ValueError):
+        Session.load(str(path))
@@ -0,0 +1,118 @@
+"""
+Checks the spatial index of a TileGenerator against a scan of every shape, for point, rectangle and nearest queries,
+and that erasing or editing a shape repaints the tile as if it had been drawn that way from the start.
+
+Run from the project root with: python -m pytest
+"""
+import numpy as np
+import pytest
+from classes import config
+from classes.PixelShape import PixelShape
+from classes.SpatialIndex import SpatialIndex
+from classes.TileGenerator import TileGenerator
+
+SIZE = 48
+
+@pytest.fixture(autouse = True)
+def small_cells(monkeypatch):
+    monkeypatch.setattr(config, "SPATIAL_CELL_SIZE", 4)
+    monkeypatch.setattr(config, "SPATIAL_MAX_CELLS", 6)
+
+def specs(count = 40, seed = 9):
+    """
+    Makes random shape specs, some rounded and some spanning most of the tile.
+
+    Args:
+        count (int): how many shapes.
+        seed (int): the seed of their coords and colors.
+
+    Returns:
+        list of dict: the shape specs.
+    """
+
+    rng = np.random.default_rng(seed)
+    shapes = []
+    for index in range(count):
+        spread = 40 if index % 7 == 0 else 6
+        x, y = rng.integers(0, SIZE - spread, 2)
+        coords = [[int(x + dx), int(y + dy)] for dx, dy in rng.integers(0, spread, (int(rng.integers(1, 5)), 2))]
+        shapes.append({"coords": coords, "color": [int(value) for value in rng.integers(0, 256, 3)],
+                       "rounded_edges": bool(index % 3 == 0), "radius": 2})
+    return shapes
+
+def tile(tmp_path, shapes, **options):
+    """
+    Draws shape specs on a tile in order.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        shapes (list of dict): the shape specs.
+        options (dict): flags for the TileGenerator, such as canvas.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (SIZE, SIZE), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "tile.png",
+                                   output_directory = str(tmp_path / "out"), **options)
+    for spec in shapes:
+        PixelShape.fromSpec(tile_generator, spec, draw = True)
+    return tile_generator
+
+def rgba(tile_generator):
+    """
+    Gets the RGBA pixels of a tile.
+
+    Args:
+        tile_generator (TileGenerator): the tile.
+
+    Returns:
+        numpy.ndarray: the (height, width, 4) pixels.
+    """
+
+    return np.asarray(tile_generator.getImage().convert("RGBA"))
+
+def test_queries_match_a_scan(tmp_path):
+    tile_generator = tile(tmp_path, specs())
+    shapes = tile_generator.shapes
+    rng = np.random.default_rng(1)
+    for x, y in rng.integers(-4, SIZE + 4, (200, 2)):
+        x, y = int(x), int(y)
+        inside = [shape for shape in shapes if SpatialIndex._hits(shape.getBounds(), (x, y, x + 1, y + 1))]
+        assert tile_generator.shapesAt(x, y) == inside
+        assert tile_generator.shapesAt(x, y, exact = True) == [shape for shape in inside if shape.paints(x, y)]
+        distance = min(SpatialIndex._distance(shape.getBounds(), x, y) for shape in shapes)
+        nearest = [shape for shape in shapes if SpatialIndex._distance(shape.getBounds(), x, y) == distance][-1]
+        assert tile_generator.nearestShape(x, y) is nearest
+    for left, top, width, height in rng.integers(-4, SIZE, (100, 4)):
+        box = (int(left), int(top), int(left + width % 20), int(top + height % 20))
+        assert tile_generator.shapesIn(box) == [shape for shape in shapes if box[0] < box[2] and box[1] < box[3]
+                                                and SpatialIndex._hits(shape.getBounds(), box)]
+
+def test_exact_hits_follow_the_painted_pixels(tmp_path):
+    tile_generator = tile(tmp_path, [{"coords": [[10, 10]], "color": [1, 2, 3], "rounded_edges": True, "radius": 3}])
+    shape = tile_generator.shapes[0]
+    assert tile_generator.shapesAt(12, 12) == [shape]
+    assert tile_generator.shapesAt(10, 10, exact = True) == [shape]
+    assert tile_generator.nearestShape(30, 10) is shape
+    assert tile_generator.shapesAt(30, 30) == []
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_erase_repaints_what_is_left(tmp_path, canvas):
+    shapes = specs()
+    tile_generator = tile(tmp_path, shapes, canvas = canvas)
+    for index in (5, 0, 20):
+        tile_generator.shapes[index].erase()
+        del shapes[index]
+        assert np.array_equal(rgba(tile_generator), rgba(tile(tmp_path, shapes, canvas = canvas)))
+    assert len(tile_generator.shapes) == len(shapes)
+
+@pytest.mark.parametrize("canvas", [False, True])
+def test_edit_moves_the_shape_in_the_index(tmp_path, canvas):
+    shapes = specs()
+    tile_generator = tile(tmp_path, shapes, canvas = canvas)
+    shape = tile_generator.shapes[4]
+    shape.edit(coords = [(44, 44)], color = (255, 255, 255))
+    shapes[4] = dict(shapes[4], coords = [[44, 44]], color = [255, 255, 255])
+    assert shape in tile_generator.shapesAt(44, 44, exact = True)
+    assert np.array_equal(rgba(tile_generator), rgba(tile(tmp_path, shapes, canvas = canvas)))
@@ -0,0 +1,102 @@
+"""
+Checks that a Tileset builds the 47 blob and 16 Wang tiles, every tile distinct and turning with its neighbor mask,
+and that the saved set indexes a tile for every mask a map can read.
+
+Run from the project root with: python -m pytest
+"""
+import json
+import numpy as np
+import pytest
+from PIL import Image
+from classes.Tileset import Tileset
+from classes.TileGenerator import TileGenerator
+
+SIZE = 8
+EDGE = (200, 40, 40, 255)
+OUTER = (10, 220, 130, 255)
+INNER = (250, 250, 0, 255)
+
+# the neighbors a quarter turn counterclockwise, the way np.rot90 turns a tile, moves every neighbor to
+TURN = {"n": "w", "ne": "nw", "e": "n", "se": "ne", "s": "e", "sw": "se", "w": "s", "nw": "sw"}
+
+def tileset(tmp_path, layout):
+    """
+    Makes a tileset with a one pixel edge and one pixel corners, each in its own color.
+
+    Args:
+        tmp_path (Path): where the base TileGenerator makes its output directory.
+        layout (str): "blob" or "wang".
+
+    Returns:
+        Tileset: the tileset.
+    """
+
+    base = TileGenerator(array = (SIZE, SIZE), background_color = (30, 60, 90), output_file = "grass.png",
+                         output_directory = str(tmp_path / "out"), canvas = True)
+    edge = [{"coords": [[x, 0] for x in range(SIZE)], "color": list(EDGE)}]
+    return Tileset(base, edge, [{"coords": [[0, 0]], "color": list(OUTER)}], [{"coords": [[0, 0]], "color": list(INNER)}], layout)
+
+def turned(mask):
+    """
+    Turns a neighbor mask a quarter counterclockwise.
+
+    Args:
+        mask (int): the neighbor mask.
+
+    Returns:
+        int: the turned mask.
+    """
+
+    return sum(Tileset.NEIGHBORS[TURN[name]] for name, bit in Tileset.NEIGHBORS.items() if mask & bit)
+
+@pytest.mark.parametrize("layout, count", [("blob", 47), ("wang", 16)])
+def test_every_tile_is_distinct(tmp_path, layout, count):
+    tiles = tileset(tmp_path, layout).build()
+    assert len(tiles) == count
+    assert len({pixels.tobytes() for pixels in tiles.values()}) == count
+
+@pytest.mark.parametrize("layout", ["blob", "wang"])
+def test_every_mask_looks_up_a_tile(tmp_path, layout):
+    autotiles = tileset(tmp_path, layout)
+    masks = set(autotiles.masks())
+    for mask in range(256):
+        assert autotiles.lookup(mask) in masks
+        assert np.array_equal(autotiles.render(mask), autotiles.render(autotiles.lookup(mask)))
+
+@pytest.mark.parametrize("layout", ["blob", "wang"])
+def test_tiles_turn_with_their_mask(tmp_path, layout):
+    autotiles = tileset(tmp_path, layout)
+    for mask in range(256):
+        assert np.array_equal(autotiles.render(turned(mask)), np.rot90(autotiles.render(mask)))
+
+def test_layers_show_where_neighbors_are_missing(tmp_path):
+    autotiles = tileset(tmp_path, "blob")
+    base = np.asarray(autotiles.base.getImage().convert("RGBA"))
+    assert np.array_equal(autotiles.render(255), base)
+    alone = autotiles.render(0)
+    assert tuple(alone[0, 0]) == tuple(alone[0, -1]) == tuple(alone[-1, 0]) == tuple(alone[-1, -1]) == OUTER
+    assert np.array_equal(alone[1:-1, 1:-1], base[1:-1, 1:-1])
+    open_north = autotiles.render(255 & ~Tileset.NEIGHBORS["n"])
+    assert all(tuple(pixel) == EDGE for pixel in open_north[0])
+    assert np.array_equal(open_north[1:], base[1:])
+    open_corner = autotiles.render(255 & ~Tileset.NEIGHBORS["nw"])
+    assert tuple(open_corner[0, 0]) == INNER
+    assert np.array_equal(open_corner[1:], base[1:])
+
+def test_saved_set_indexes_every_mask(tmp_path):
+    index = tileset(tmp_path, "blob").save(jobs = 2)
+    with open(tmp_path / "out" / "grass.json") as written:
+        assert json.load(written) == index
+    files = {tile["mask"]: tile["file"] for tile in index["tiles"]}
+    assert len(index["lookup"]) == 256 and set(index["lookup"]) == set(files)
+    autotiles = tileset(tmp_path, "blob")
+    for mask, file_name in files.items():
+        with Image.open(tmp_path / "out" / file_name) as img:
+            assert np.array_equal(np.asarray(img.convert("RGBA")), autotiles.render(mask))
+
+def test_bad_tilesets_are_rejected(tmp_path):
+    base = TileGenerator(array = (8, 6), output_file = "grass.png", output_directory = str(tmp_path))
+    with pytest.raises(ValueError):
+        Tileset(base, [])
+    with pytest.raises(ValueError):
+        tileset(tmp_path, "hex")
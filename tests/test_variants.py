@@ -0,0 +1,85 @@
+"""
+Checks that shapes rebuilt from a spec, as variants, animation frames and batch renders are, are drawn with the radius
+and drawn state they had on the original tile, and still match it after its image is made again.
+
+Run from the project root with: python -m pytest
+"""
+import builtins
+import numpy as np
+from PIL import Image
+import main
+from classes.PixelShape import PixelShape
+from classes.TileGenerator import TileGenerator
+
+def tile(tmp_path, output_file = "tile.png"):
+    """
+    Makes a tile with a rounded shape drawn with radius 1, a shape left undrawn and a seeded randomly cut repeat.
+
+    Args:
+        tmp_path (Path): where the TileGenerator makes its output directory.
+        output_file (str): the output file name.
+
+    Returns:
+        TileGenerator: the tile.
+    """
+
+    tile_generator = TileGenerator(array = (16, 16), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = output_file,
+                                   output_directory = str(tmp_path / "out"))
+    PixelShape(tile_generator, [(4, 4), (11, 11)], (200, 40, 40), rounded_edges = True).draw(1)
+    PixelShape(tile_generator, [(8, 2), (2, 8)], (10, 220, 130))
+    cut = PixelShape(tile_generator, [(0, 0)], (250, 250, 0))
+    cut.repeat(4, 4, (4, 4), (1, 1), True, 0.0, (0, 0, 0), seed = 3)
+    cut.draw()
+    return tile_generator
+
+def test_from_spec_replays_radius_and_drawn_state(tmp_path):
+    source = tile(tmp_path)
+    rebuilt = TileGenerator(array = (16, 16), background_color = (30, 60, 90), line_color = (0, 0, 0), output_file = "rebuilt.png",
+                            output_directory = str(tmp_path / "out"))
+    for spec in source.toSpec()["shapes"]:
+        PixelShape.fromSpec(rebuilt, spec, draw = True)
+    assert np.array_equal(np.asarray(rebuilt.getImage()), np.asarray(source.getImage()))
+
+def test_variants_keep_radius_and_drawn_state(tmp_path):
+    source = tile(tmp_path)
+    source.saveImage(multiples = True, count = 2, variants = True, seed = 5, jobs = 1)
+    for i in (1, 2):
+        with Image.open(tmp_path / "out" / f"{i}_tile.png") as variant:
+            assert np.array_equal(np.asarray(variant.convert("RGBA")), np.asarray(source.getImage()))
+
+def test_variants_follow_the_shapes_after_the_image_is_made_again(tmp_path):
+    source = tile(tmp_path)
+    source.output_file = "again.png"
+    source.saveImage(multiples = True, count = 2, variants = True, seed = 5, jobs = 1)
+    for i in (1, 2):
+        with Image.open(tmp_path / "out" / f"{i}_again.png") as variant:
+            assert np.array_equal(np.asarray(variant.convert("RGBA")), np.asarray(source.getImage()))
+
+def test_animation_frames_follow_the_shapes_after_the_image_is_made_again(tmp_path):
+    source = tile(tmp_path)
+    source.array = (12, 12)
+    animation = source.animate(count = 2, seed = 5)
+    for _, _, frame in animation._replay():
+        assert np.array_equal(frame, np.asarray(source.getImage()))
+
+def test_background_change_after_the_image_is_made_again_matches_a_render(tmp_path):
+    source = tile(tmp_path)
+    source.output_file = "again.png"
+    source.background_color = (90, 60, 30)
+    rebuilt = TileGenerator.fromSpec(source.toSpec())
+    for spec in source.toSpec()["shapes"]:
+        PixelShape.fromSpec(rebuilt, spec, draw = True)
+    assert np.array_equal(np.asarray(rebuilt.getImage()), np.asarray(source.getImage()))
+
+def test_save_prompt_reports_failed_variants(tmp_path, monkeypatch, capsys):
+    source = tile(tmp_path)
+
+    def fail(**options):
+        raise RuntimeError("2 variants failed")
+
+    monkeypatch.setattr(source, "saveImage", fail)
+    monkeypatch.setitem(main.TILE_GENERATORS, "tile", source)
+    answers = iter(["tile", "y", "2", "y", "5"])
+    monkeypatch.setattr(builtins, "input", lambda prompt = "": next(answers))
+    main.saveTile()
+    assert "2 variants failed" in capsys.readouterr().out